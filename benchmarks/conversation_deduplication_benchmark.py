@@ -0,0 +1,64 @@
+import time
+
+import pyarrow as pa
+
+from prmreportsgenerator.domain.conversation_deduplication import (
+    StreamingConversationDeduplicator,
+    deduplicate_conversations,
+)
+
+NUMBER_OF_DAYS = 10
+ROWS_PER_DAY = 500_000
+# each day re-delivers this share of the previous day's conversations
+REDELIVERED_FRACTION = 0.1
+
+
+def _daily_tables():
+    redelivered_rows = int(ROWS_PER_DAY * REDELIVERED_FRACTION)
+    tables = []
+    for day in range(NUMBER_OF_DAYS):
+        first_row = day * (ROWS_PER_DAY - redelivered_rows)
+        tables.append(
+            pa.table(
+                {
+                    "conversation_id": [
+                        f"{i:08d}-0000-0000-0000-000000000000"
+                        for i in range(first_row, first_row + ROWS_PER_DAY)
+                    ],
+                    "status": ["Integrated on time", "Technical failure"] * (ROWS_PER_DAY // 2),
+                }
+            )
+        )
+    return tables
+
+
+def _deduplicate_in_memory(tables):
+    _, duplicates = deduplicate_conversations(pa.concat_tables(tables))
+    return duplicates
+
+
+def _deduplicate_streaming(tables):
+    deduplicator = StreamingConversationDeduplicator()
+    for table in reversed(tables):
+        deduplicator.deduplicate(table)
+    return deduplicator.duplicates
+
+
+def main():
+    tables = _daily_tables()
+    rows = NUMBER_OF_DAYS * ROWS_PER_DAY
+    for name, deduplicate in [
+        ("in memory", _deduplicate_in_memory),
+        ("streaming", _deduplicate_streaming),
+    ]:
+        start = time.perf_counter()
+        duplicates = deduplicate(tables)
+        seconds = time.perf_counter() - start
+        print(
+            f"{name:>9}: {duplicates} duplicates in {rows} rows,"
+            f" {seconds / rows * 1_000_000:.3f} s per million rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
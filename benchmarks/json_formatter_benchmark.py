@@ -0,0 +1,64 @@
+import json
+import logging
+import timeit
+from datetime import datetime
+from logging import Formatter, LogRecord
+from typing import Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+from prmreportsgenerator.io.json_formatter import DEFAULT_LOG_RECORD_ATTRS, JsonFormatter
+
+NUMBER_OF_RECORDS = 100_000
+
+
+class UncachedJsonFormatter(Formatter):
+    # JsonFormatter before attribute filtering and timestamps were cached
+    def format(self, record: LogRecord) -> str:
+        return json.dumps(
+            {
+                name: value
+                for (name, value) in vars(record).items()
+                if name not in DEFAULT_LOG_RECORD_ATTRS
+            }
+            | {
+                "level": record.levelname,
+                "message": record.msg,
+                "module": record.module,
+                "time": datetime.utcfromtimestamp(record.created).isoformat(),
+            }
+        )
+
+
+def _a_record() -> LogRecord:
+    object_uri = "s3://bucket/v11/cutoff-14/2019/12/01/2019-12-01-transfers.parquet"
+    return logging.getLogger("benchmark").makeRecord(
+        name="benchmark",
+        level=logging.INFO,
+        fn="s3.py",
+        lno=1,
+        msg="Reading file from: " + object_uri,
+        args=None,
+        exc_info=None,
+        extra={"event": "READING_FILE_FROM_S3", "object_uri": object_uri},
+    )
+
+
+def main():
+    record = _a_record()
+    formatters: Dict[str, Formatter] = {
+        "uncached json": UncachedJsonFormatter(),
+        "cached json": JsonFormatter(use_orjson=False),
+    }
+    if orjson is not None:
+        formatters["cached orjson"] = JsonFormatter(use_orjson=True)
+    for name, formatter in formatters.items():
+        seconds = timeit.timeit(lambda: formatter.format(record), number=NUMBER_OF_RECORDS)
+        print(f"{name:>14}: {seconds / NUMBER_OF_RECORDS * 1_000_000:.2f} us per record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import time
+
+import pyarrow as pa
+
+from prmreportsgenerator.io.output_encoder import write_outputs
+from prmreportsgenerator.output_format import OutputFormat
+
+NUMBER_OF_ROWS = 1_000_000
+CHUNK_SIZE_BYTES = 4 * 1024 * 1024
+
+
+class ByteCountingSink:
+    def __init__(self):
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        size = len(memoryview(data).cast("B"))
+        self.bytes_written += size
+        return size
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    @property
+    def closed(self) -> bool:
+        return False
+
+
+def _a_report_table() -> pa.Table:
+    return pa.table(
+        {
+            "Sub ICB Location ODS": [f"{i % 106:05d}" for i in range(NUMBER_OF_ROWS)],
+            "Requesting Practice ODS": [f"A{i % 6500:05d}" for i in range(NUMBER_OF_ROWS)],
+            "Requesting Supplier": ["EMIS", "SystmOne"] * (NUMBER_OF_ROWS // 2),
+            "Number of transfers": [i % 50 for i in range(NUMBER_OF_ROWS)],
+        }
+    )
+
+
+def main():
+    table = _a_report_table()
+    for output_format in OutputFormat:
+        sink = ByteCountingSink()
+        start = time.perf_counter()
+        write_outputs(table, {output_format: sink}, chunk_size_bytes=CHUNK_SIZE_BYTES)  # type: ignore
+        seconds = time.perf_counter() - start
+        print(
+            f"{output_format.value:>8}: {sink.bytes_written / 1024 / 1024:8.2f} MiB"
+            f" in {seconds:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
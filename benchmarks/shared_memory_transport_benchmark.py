@@ -0,0 +1,57 @@
+import pickle
+import time
+from tempfile import TemporaryDirectory
+
+import pyarrow as pa
+
+from prmreportsgenerator.io.shared_memory_tables import (
+    SharedTableSegments,
+    read_shared_table,
+    write_shared_table,
+)
+
+NUMBER_OF_ROWS = 1_000_000
+REPEATS = 5
+
+
+def _a_table() -> pa.Table:
+    return pa.table(
+        {
+            "conversation_id": [
+                f"{i:08d}-0000-0000-0000-000000000000" for i in range(NUMBER_OF_ROWS)
+            ],
+            "requesting_practice_ods_code": [f"A{i % 6500:05d}" for i in range(NUMBER_OF_ROWS)],
+            "status": ["Integrated on time", "Technical failure"] * (NUMBER_OF_ROWS // 2),
+            "sla_duration": list(range(NUMBER_OF_ROWS)),
+        }
+    )
+
+
+def _pickled(table: pa.Table, _: str) -> pa.Table:
+    # what a ProcessPoolExecutor does with a table returned from a worker
+    return pickle.loads(pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _shared(table: pa.Table, directory: str) -> pa.Table:
+    return read_shared_table(write_shared_table(table, directory))
+
+
+def main():
+    table = _a_table()
+    with TemporaryDirectory() as temp_directory, SharedTableSegments() as segments:
+        transports = [
+            ("pickle", _pickled, ""),
+            ("shared memory", _shared, segments.directory),
+            ("temp directory", _shared, temp_directory),
+        ]
+        for name, transport, directory in transports:
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                received = transport(table, directory)
+            seconds = (time.perf_counter() - start) / REPEATS
+            assert received.num_rows == NUMBER_OF_ROWS
+            print(f"{name:>14}: {seconds * 1000:.1f} ms per {NUMBER_OF_ROWS} row table")
+
+
+if __name__ == "__main__":
+    main()
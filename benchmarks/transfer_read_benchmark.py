@@ -0,0 +1,51 @@
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow.fs import LocalFileSystem
+
+from prmreportsgenerator.io.parquet_dataset import read_parquet_dataset
+
+NUMBER_OF_DAYS = 30
+ROWS_PER_DAY = 200_000
+
+
+def _write_daily_files(directory: Path):
+    paths = []
+    for day in range(NUMBER_OF_DAYS):
+        table = pa.table(
+            {
+                "conversation_id": [f"{day}-{i}" for i in range(ROWS_PER_DAY)],
+                "requesting_practice_ods_code": [f"A{i % 6500:05d}" for i in range(ROWS_PER_DAY)],
+                "status": ["Integrated on time", "Technical failure"] * (ROWS_PER_DAY // 2),
+                "sla_duration": list(range(ROWS_PER_DAY)),
+            }
+        )
+        path = directory / f"{day:02d}-transfers.parquet"
+        pq.write_table(table, str(path))
+        paths.append(str(path))
+    return paths
+
+
+def _read_file_by_file(paths):
+    return pa.concat_tables([pq.read_table(path) for path in paths])
+
+
+def _read_as_dataset(paths):
+    return read_parquet_dataset(paths, LocalFileSystem())
+
+
+def main():
+    with TemporaryDirectory() as directory:
+        paths = _write_daily_files(Path(directory))
+        for name, read in [("file by file", _read_file_by_file), ("dataset", _read_as_dataset)]:
+            start = time.perf_counter()
+            table = read(paths)
+            seconds = time.perf_counter() - start
+            print(f"{name:>12}: {table.num_rows} rows in {seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
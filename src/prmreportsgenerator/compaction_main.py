@@ -0,0 +1,33 @@
+import logging
+import sys
+from os import environ
+
+from prmreportsgenerator.config import CompactionConfig
+from prmreportsgenerator.main import _setup_logger, _teardown_logger
+
+logger = logging.getLogger("prmreportsgenerator")
+
+
+def _run_compaction(config: CompactionConfig):
+    from prmreportsgenerator.transfer_data_compactor import TransferDataCompactor
+
+    TransferDataCompactor(config).run()
+
+
+def main():
+    config = {}
+    queue_handler, listener = _setup_logger()
+    try:
+        config = CompactionConfig.from_environment_variables(environ)
+        _run_compaction(config)
+    except Exception as ex:
+        logger.error(
+            str(ex), extra={"event": "FAILED_TO_RUN_COMPACTION", "config": config.__str__()}
+        )
+        sys.exit("Failed to run compaction, exiting...")
+    finally:
+        _teardown_logger(queue_handler, listener)
+
+
+if __name__ == "__main__":
+    main()
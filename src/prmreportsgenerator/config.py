@@ -1,14 +1,29 @@
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from dateutil.parser import isoparse
 
+from prmreportsgenerator.missing_transfer_data import (
+    DEFAULT_MISSING_TRANSFER_DATA_POLL_SECONDS,
+    DEFAULT_MISSING_TRANSFER_DATA_WAIT_SECONDS,
+    MissingTransferDataPolicy,
+)
+from prmreportsgenerator.output_format import OutputFormat
 from prmreportsgenerator.report_name import ReportName
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_METRICS_NAMESPACE = "PrmReportsGenerator"
+DEFAULT_OUTPUT_PARTITION_UPLOAD_THREADS = 4
+DEFAULT_TRANSFER_FOOTER_READ_THREADS = 8
+DEFAULT_COMPACTION_SORT_COLUMN = "date_requested"
+DEFAULT_COMPACTION_ROW_GROUP_SIZE = 128 * 1024
+DEFAULT_S3_READ_MAX_ATTEMPTS = 5
+DEFAULT_S3_READ_HEDGE_PERCENTILE = 95
+DEFAULT_S3_READ_PART_THREADS = 8
+
 
 class MissingEnvironmentVariable(Exception):
     pass
@@ -59,6 +74,28 @@ class EnvConfig:
     def read_report_name(self, report_name: str) -> ReportName:
         return ReportName(self._env_vars[report_name])
 
+    def read_optional_output_formats(
+        self, name: str, default: List[OutputFormat]
+    ) -> List[OutputFormat]:
+        return self._read_env(
+            name,
+            optional=True,
+            converter=lambda string: [
+                OutputFormat(output_format.strip().upper()) for output_format in string.split(",")
+            ],
+            default=default,
+        )
+
+    def read_optional_missing_transfer_data_policy(
+        self, name: str, default: MissingTransferDataPolicy
+    ) -> MissingTransferDataPolicy:
+        return self._read_env(
+            name,
+            optional=True,
+            converter=lambda string: MissingTransferDataPolicy(string.strip().upper()),
+            default=default,
+        )
+
     def read_optional_bool(self, name: str, default: bool) -> bool:
         return self._read_env(
             name, optional=True, converter=lambda string: string.lower() == "true", default=default
@@ -79,6 +116,38 @@ class PipelineConfig:
     report_name: ReportName
     alert_enabled: Optional[bool]
     send_email_notification: Optional[bool]
+    metrics_exporters: Optional[str] = None
+    metrics_namespace: str = DEFAULT_METRICS_NAMESPACE
+    prometheus_textfile_path: Optional[str] = None
+    local_data_directory: Optional[str] = None
+    s3_upload_part_size_bytes: Optional[int] = None
+    csv_encoding_threads: int = 1
+    output_formats: List[OutputFormat] = field(default_factory=lambda: [OutputFormat.CSV])
+    output_partition_column: Optional[str] = None
+    output_partition_upload_threads: int = DEFAULT_OUTPUT_PARTITION_UPLOAD_THREADS
+    read_compacted_transfer_data: bool = False
+    read_transfers_as_dataset: bool = False
+    validate_transfer_data: bool = False
+    transfer_footer_read_threads: int = DEFAULT_TRANSFER_FOOTER_READ_THREADS
+    dry_run: bool = False
+    memory_budget_bytes: Optional[int] = None
+    spill_directory: Optional[str] = None
+    metrics_only: bool = False
+    transfer_read_concurrency: Optional[int] = None
+    s3_read_max_attempts: int = DEFAULT_S3_READ_MAX_ATTEMPTS
+    hedge_s3_reads: bool = False
+    s3_read_hedge_percentile: int = DEFAULT_S3_READ_HEDGE_PERCENTILE
+    s3_read_part_size_bytes: Optional[int] = None
+    s3_read_part_threads: int = DEFAULT_S3_READ_PART_THREADS
+    missing_transfer_data_policy: MissingTransferDataPolicy = MissingTransferDataPolicy.FAIL
+    missing_transfer_data_wait_seconds: int = DEFAULT_MISSING_TRANSFER_DATA_WAIT_SECONDS
+    missing_transfer_data_poll_seconds: int = DEFAULT_MISSING_TRANSFER_DATA_POLL_SECONDS
+    discover_transfer_data_by_listing: bool = False
+    deduplicate_conversations: bool = False
+    aggregation_processes: int = 1
+    cpu_count: Optional[int] = None
+    arrow_io_threads: Optional[int] = None
+    shared_tables_directory: Optional[str] = None
 
     @classmethod
     def from_environment_variables(cls, env_vars):
@@ -96,4 +165,90 @@ class PipelineConfig:
             report_name=env.read_report_name("REPORT_NAME"),
             alert_enabled=env.read_optional_bool("ALERT_ENABLED", default=False),
             send_email_notification=env.read_optional_bool("SEND_EMAIL_NOTIFICATION", default=True),
+            metrics_exporters=env.read_optional_str("METRICS_EXPORTERS"),
+            metrics_namespace=env.read_optional_str("METRICS_NAMESPACE")
+            or DEFAULT_METRICS_NAMESPACE,
+            prometheus_textfile_path=env.read_optional_str("PROMETHEUS_TEXTFILE_PATH"),
+            local_data_directory=env.read_optional_str("LOCAL_DATA_DIRECTORY"),
+            s3_upload_part_size_bytes=env.read_optional_int("S3_UPLOAD_PART_SIZE_BYTES"),
+            csv_encoding_threads=env.read_optional_int("CSV_ENCODING_THREADS") or 1,
+            output_formats=env.read_optional_output_formats(
+                "OUTPUT_FORMATS", default=[OutputFormat.CSV]
+            ),
+            output_partition_column=env.read_optional_str("OUTPUT_PARTITION_COLUMN"),
+            output_partition_upload_threads=env.read_optional_int("OUTPUT_PARTITION_UPLOAD_THREADS")
+            or DEFAULT_OUTPUT_PARTITION_UPLOAD_THREADS,
+            read_compacted_transfer_data=env.read_optional_bool(
+                "READ_COMPACTED_TRANSFER_DATA", default=False
+            ),
+            read_transfers_as_dataset=env.read_optional_bool(
+                "READ_TRANSFERS_AS_DATASET", default=False
+            ),
+            validate_transfer_data=env.read_optional_bool("VALIDATE_TRANSFER_DATA", default=False),
+            transfer_footer_read_threads=env.read_optional_int("TRANSFER_FOOTER_READ_THREADS")
+            or DEFAULT_TRANSFER_FOOTER_READ_THREADS,
+            dry_run=env.read_optional_bool("DRY_RUN", default=False),
+            memory_budget_bytes=env.read_optional_int("MEMORY_BUDGET"),
+            spill_directory=env.read_optional_str("SPILL_DIRECTORY"),
+            metrics_only=env.read_optional_bool("METRICS_ONLY", default=False),
+            transfer_read_concurrency=env.read_optional_int("TRANSFER_READ_CONCURRENCY"),
+            s3_read_max_attempts=env.read_optional_int("S3_READ_MAX_ATTEMPTS")
+            or DEFAULT_S3_READ_MAX_ATTEMPTS,
+            hedge_s3_reads=env.read_optional_bool("HEDGE_S3_READS", default=False),
+            s3_read_hedge_percentile=env.read_optional_int("S3_READ_HEDGE_PERCENTILE")
+            or DEFAULT_S3_READ_HEDGE_PERCENTILE,
+            s3_read_part_size_bytes=env.read_optional_int("S3_READ_PART_SIZE_BYTES"),
+            s3_read_part_threads=env.read_optional_int("S3_READ_PART_THREADS")
+            or DEFAULT_S3_READ_PART_THREADS,
+            missing_transfer_data_policy=env.read_optional_missing_transfer_data_policy(
+                "MISSING_TRANSFER_DATA_POLICY", default=MissingTransferDataPolicy.FAIL
+            ),
+            missing_transfer_data_wait_seconds=env.read_optional_int(
+                "MISSING_TRANSFER_DATA_WAIT_SECONDS"
+            )
+            or DEFAULT_MISSING_TRANSFER_DATA_WAIT_SECONDS,
+            missing_transfer_data_poll_seconds=env.read_optional_int(
+                "MISSING_TRANSFER_DATA_POLL_SECONDS"
+            )
+            or DEFAULT_MISSING_TRANSFER_DATA_POLL_SECONDS,
+            discover_transfer_data_by_listing=env.read_optional_bool(
+                "DISCOVER_TRANSFER_DATA_BY_LISTING", default=False
+            ),
+            deduplicate_conversations=env.read_optional_bool(
+                "DEDUPLICATE_CONVERSATIONS", default=False
+            ),
+            aggregation_processes=env.read_optional_int("AGGREGATION_PROCESSES") or 1,
+            cpu_count=env.read_optional_int("CPU_COUNT"),
+            arrow_io_threads=env.read_optional_int("ARROW_IO_THREADS"),
+            shared_tables_directory=env.read_optional_str("SHARED_TABLES_DIRECTORY"),
+        )
+
+
+@dataclass
+class CompactionConfig:
+    build_tag: str
+    input_transfer_data_bucket: str
+    cutoff_days: int
+    month: Optional[datetime]
+    s3_endpoint_url: Optional[str]
+    sort_column: str = DEFAULT_COMPACTION_SORT_COLUMN
+    row_group_size: int = DEFAULT_COMPACTION_ROW_GROUP_SIZE
+    local_data_directory: Optional[str] = None
+    s3_upload_part_size_bytes: Optional[int] = None
+
+    @classmethod
+    def from_environment_variables(cls, env_vars):
+        env = EnvConfig(env_vars)
+        return cls(
+            build_tag=env.read_str("BUILD_TAG"),
+            input_transfer_data_bucket=env.read_str("INPUT_TRANSFER_DATA_BUCKET"),
+            cutoff_days=env.read_int("CONVERSATION_CUTOFF_DAYS"),
+            month=env.read_optional_datetime("COMPACTION_MONTH"),
+            s3_endpoint_url=env.read_optional_str("S3_ENDPOINT_URL"),
+            sort_column=env.read_optional_str("COMPACTION_SORT_COLUMN")
+            or DEFAULT_COMPACTION_SORT_COLUMN,
+            row_group_size=env.read_optional_int("COMPACTION_ROW_GROUP_SIZE")
+            or DEFAULT_COMPACTION_ROW_GROUP_SIZE,
+            local_data_directory=env.read_optional_str("LOCAL_DATA_DIRECTORY"),
+            s3_upload_part_size_bytes=env.read_optional_int("S3_UPLOAD_PART_SIZE_BYTES"),
         )
@@ -0,0 +1,69 @@
+from typing import List, Tuple
+
+import polars as pl
+import pyarrow as pa
+
+CONVERSATION_ID_COLUMN = "conversation_id"
+_HASH_SEED = 0
+
+
+def deduplicate_conversations(transfers: pa.Table) -> Tuple[pa.Table, int]:
+    # keeps the last row of each conversation, so a later input file wins over an earlier one.
+    # Rows without a conversation id are not duplicates of each other, so they are all kept.
+    rows = pl.DataFrame(transfers.select([CONVERSATION_ID_COLUMN])).with_row_index("row")
+    last_rows = (
+        rows.drop_nulls(CONVERSATION_ID_COLUMN)
+        .group_by(CONVERSATION_ID_COLUMN)
+        .agg(pl.col("row").max())
+        .get_column("row")
+    )
+    null_rows = rows.filter(pl.col(CONVERSATION_ID_COLUMN).is_null()).get_column("row")
+    rows_to_keep = pl.concat([last_rows, null_rows]).sort()
+    return transfers.take(rows_to_keep.to_arrow()), transfers.num_rows - len(rows_to_keep)
+
+
+def _merge_sorted(first: pl.Series, second: pl.Series) -> pl.Series:
+    return pl.concat([first, second]).sort()
+
+
+class StreamingConversationDeduplicator:
+    # For transfer data read file by file, newest file first. Only a 64 bit hash of each
+    # conversation already kept is held, so a rare hash collision can drop a distinct conversation.
+    # The hashes are held in sorted runs, each at least twice the size of the next, so a file's
+    # hashes are merged into runs of similar size rather than re-sorting every hash kept.
+    def __init__(self):
+        self._kept_hash_runs: List[pl.Series] = []
+        self.duplicates = 0
+
+    def _is_kept(self, hashes: pl.Series) -> pl.Series:
+        is_kept = pl.repeat(False, len(hashes), eager=True)
+        for run in self._kept_hash_runs:
+            positions = run.search_sorted(hashes).clip(upper_bound=len(run) - 1)
+            is_kept = is_kept | (run.gather(positions) == hashes)
+        return is_kept
+
+    def _keep(self, sorted_hashes: pl.Series):
+        if len(sorted_hashes) == 0:
+            return
+        run = sorted_hashes
+        while self._kept_hash_runs and len(self._kept_hash_runs[-1]) <= 2 * len(run):
+            run = _merge_sorted(self._kept_hash_runs.pop(), run)
+        self._kept_hash_runs.append(run)
+
+    def deduplicate(self, transfers: pa.Table) -> pa.Table:
+        conversation_ids = pl.Series(transfers[CONVERSATION_ID_COLUMN])
+        rows = pl.DataFrame(
+            {
+                "hash": conversation_ids.hash(seed=_HASH_SEED),
+                "has_id": conversation_ids.is_not_null(),
+            }
+        ).with_row_index("row")
+        last_rows = (
+            rows.filter(pl.col("has_id")).group_by("hash").agg(pl.col("row").max()).sort("hash")
+        )
+        new_rows = last_rows.filter(~self._is_kept(last_rows.get_column("hash")))
+        null_rows = rows.filter(~pl.col("has_id")).get_column("row")
+        rows_to_keep = pl.concat([new_rows.get_column("row"), null_rows]).sort()
+        self._keep(new_rows.get_column("hash"))
+        self.duplicates += transfers.num_rows - len(rows_to_keep)
+        return transfers.take(rows_to_keep.to_arrow())
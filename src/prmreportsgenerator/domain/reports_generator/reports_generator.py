@@ -2,12 +2,14 @@ from abc import ABC, abstractmethod
 from functools import reduce
 from typing import List, Optional
 
+import pyarrow as pa
+
 from prmreportsgenerator.domain.reports_generator.error_code_mapping import error_code_mapping
 
 
 class ReportsGenerator(ABC):
-    def __init__(self):
-        pass
+    def __init__(self, transfers: pa.Table):
+        self._transfers = transfers
 
     def _error_description(self, error_code: int) -> str:
         try:
@@ -21,9 +23,25 @@ class ReportsGenerator(ABC):
             [f"{e} - {self._error_description(e)}" for e in sorted(unique_error_codes)]
         )
 
-    def _process(self, data, *function_chain):
+    @staticmethod
+    def _process(data, *function_chain):
         return reduce(lambda d, func: func(d), list(function_chain), data)
 
+    @staticmethod
+    def _concat_partials(partials: List[pa.Table]) -> pa.Table:
+        return pa.concat_tables(partials, promote_options="permissive")
+
     @abstractmethod
     def generate(self):
         pass
+
+    # Reports over many transfer files can be generated by aggregating each file's transfers
+    # into a partial table, then merging the partials, instead of concatenating the transfers
+    @abstractmethod
+    def aggregate(self) -> pa.Table:
+        pass
+
+    @classmethod
+    @abstractmethod
+    def merge(cls, partials: List[pa.Table]) -> pa.Table:
+        pass
@@ -0,0 +1,33 @@
+from importlib import import_module
+from typing import Dict, Tuple, Type
+
+from prmreportsgenerator.domain.reports_generator.reports_generator import ReportsGenerator
+from prmreportsgenerator.report_name import ReportName
+
+_REPORTS_GENERATOR_MODULE = "prmreportsgenerator.domain.reports_generator"
+
+# Generators are imported on demand, so a run only pays to import the one it produces
+_REPORTS_GENERATORS: Dict[ReportName, Tuple[str, str]] = {
+    ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY: (
+        "transfer_outcomes_per_supplier_pathway",
+        "TransferOutcomesPerSupplierPathwayReportsGenerator",
+    ),
+    ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES: (
+        "transfer_level_technical_failures",
+        "TransferLevelTechnicalFailuresReportsGenerator",
+    ),
+    ReportName.SUB_ICB_LOCATION_LEVEL_INTEGRATION_TIMES: (
+        "sub_icb_location_level_integration_times",
+        "SICBLLevelIntegrationTimesReportsGenerator",
+    ),
+    ReportName.TRANSFER_DETAILS_BY_HOUR: (
+        "transfer_details_per_hour",
+        "TransferDetailsPerHourReportsGenerator",
+    ),
+}
+
+
+def load_reports_generator(report_name: ReportName) -> Type[ReportsGenerator]:
+    module_name, class_name = _REPORTS_GENERATORS[report_name]
+    module = import_module(f"{_REPORTS_GENERATOR_MODULE}.{module_name}")
+    return getattr(module, class_name)
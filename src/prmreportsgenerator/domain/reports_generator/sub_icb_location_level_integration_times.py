@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List
 
 import polars as pl
 import pyarrow as pa
@@ -11,6 +12,16 @@ THREE_DAYS_IN_SECONDS = 259200
 EIGHT_DAYS_IN_SECONDS = 691200
 
 
+SICBL_LEVEL_TOTAL_COLUMNS = [
+    "Integrated within 3 days",
+    "Integrated within 8 days",
+    "Not integrated within 8 days (integrated late + not integrated)",
+    "Integrated late",
+    "Not integrated within 14 days",
+    "GP2GP Transfers received",
+]
+
+
 class SlaDuration(Enum):
     WITHIN_3_DAYS = "WITHIN_3_DAYS"
     WITHIN_8_DAYS = "WITHIN_8_DAYS"
@@ -28,10 +39,6 @@ def assign_to_sla_band(sla_duration) -> str:
 
 
 class SICBLLevelIntegrationTimesReportsGenerator(ReportsGenerator):
-    def __init__(self, transfers: pa.Table):
-        super().__init__()
-        self._transfers = transfers
-
     def _filter_received_transfers(self, transfer_dataframe: DataFrame) -> DataFrame:
         received_transfers = (col("status") == TransferStatus.INTEGRATED_ON_TIME.value) | (
             col("status") == TransferStatus.PROCESS_FAILURE.value
@@ -41,9 +48,7 @@ class SICBLLevelIntegrationTimesReportsGenerator(ReportsGenerator):
 
     def _calculate_sla_band(self, transfer_dataframe: DataFrame) -> DataFrame:
         return transfer_dataframe.with_columns(
-            col("sla_duration")
-            .apply(assign_to_sla_band, return_dtype=pl.Utf8)
-            .alias("sla_band")
+            col("sla_duration").apply(assign_to_sla_band, return_dtype=pl.Utf8).alias("sla_band")
         )
 
     def _calculate_integrated_within_3_days(self, transfer_dataframe: DataFrame) -> DataFrame:
@@ -124,8 +129,20 @@ class SICBLLevelIntegrationTimesReportsGenerator(ReportsGenerator):
             ]
         )
 
+    @staticmethod
+    def _sum_sicbl_level_integration_times_totals(transfer_dataframe: DataFrame) -> DataFrame:
+        return transfer_dataframe.groupby(["requesting_practice_ods_code"]).agg(
+            [
+                col("requesting_practice_sicbl_name").first().keep_name(),
+                col("requesting_practice_sicbl_ods_code").first().keep_name(),
+                col("requesting_practice_name").first().keep_name(),
+            ]
+            + [col(total_column).sum().keep_name() for total_column in SICBL_LEVEL_TOTAL_COLUMNS]
+        )
+
+    @staticmethod
     def _generate_sicbl_level_integration_times_percentages(
-        self, transfer_dataframe: DataFrame
+        transfer_dataframe: DataFrame,
     ) -> DataFrame:
         return transfer_dataframe.with_columns(
             [
@@ -149,7 +166,8 @@ class SICBLLevelIntegrationTimesReportsGenerator(ReportsGenerator):
             ]
         )
 
-    def _generate_output(self, transfer_dataframe: DataFrame) -> DataFrame:
+    @staticmethod
+    def _generate_output(transfer_dataframe: DataFrame) -> DataFrame:
         return transfer_dataframe.select(
             [
                 col("requesting_practice_sicbl_name").alias("Sub ICB Location name"),
@@ -170,9 +188,9 @@ class SICBLLevelIntegrationTimesReportsGenerator(ReportsGenerator):
             ]
         ).sort(["Sub ICB Location name", "Requesting practice name"])
 
-    def generate(self) -> pa.Table:
+    def _sicbl_level_integration_times_totals(self) -> DataFrame:
         transfers_frame = pl.from_arrow(self._transfers)
-        processed_transfers = self._process(
+        return self._process(
             transfers_frame,
             self._filter_received_transfers,
             self._calculate_sla_band,
@@ -182,7 +200,25 @@ class SICBLLevelIntegrationTimesReportsGenerator(ReportsGenerator):
             self._calculate_integrated_late,
             self._calculate_not_integrated_within_14_days,
             self._generate_sicbl_level_integration_times_totals,
+        )
+
+    def generate(self) -> pa.Table:
+        processed_transfers = self._process(
+            self._sicbl_level_integration_times_totals(),
             self._generate_sicbl_level_integration_times_percentages,
             self._generate_output,
         ).to_dict()
         return pa.table(processed_transfers)
+
+    def aggregate(self) -> pa.Table:
+        return self._sicbl_level_integration_times_totals().to_arrow()
+
+    @classmethod
+    def merge(cls, partials: List[pa.Table]) -> pa.Table:
+        processed_transfers = cls._process(
+            pl.from_arrow(cls._concat_partials(partials)),
+            cls._sum_sicbl_level_integration_times_totals,
+            cls._generate_sicbl_level_integration_times_percentages,
+            cls._generate_output,
+        ).to_dict()
+        return pa.table(processed_transfers)
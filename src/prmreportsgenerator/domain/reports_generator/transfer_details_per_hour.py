@@ -1,3 +1,5 @@
+from typing import List
+
 import polars as pl
 import pyarrow as pa
 from polars import DataFrame, col, count
@@ -7,10 +9,6 @@ from prmreportsgenerator.domain.transfer import TransferStatus
 
 
 class TransferDetailsPerHourReportsGenerator(ReportsGenerator):
-    def __init__(self, transfers: pa.Table):
-        super().__init__()
-        self._transfers = transfers
-
     def _create_hour_column(self, transfer_dataframe: DataFrame) -> DataFrame:
         date_requested_by_hour = col("date_requested").dt.strftime("%Y-%m-%d %H:00")
 
@@ -29,25 +27,50 @@ class TransferDetailsPerHourReportsGenerator(ReportsGenerator):
         )
 
     def _group_by_date_requested_hourly(self, transfer_dataframe: DataFrame) -> DataFrame:
-        return (
-            transfer_dataframe.groupby(["Date/Time"])
-            .agg(
-                [
-                    count("conversation_id").alias("Total number of transfers"),
-                    col("is_technical_failure").sum().alias("Total technical failures"),
-                    col("is_unclassified_failure").sum().alias("Total unclassified failures"),
-                ]
-            )
-            .sort("Date/Time")
+        return transfer_dataframe.groupby(["Date/Time"]).agg(
+            [
+                count("conversation_id").alias("Total number of transfers"),
+                col("is_technical_failure").sum().alias("Total technical failures"),
+                col("is_unclassified_failure").sum().alias("Total unclassified failures"),
+            ]
         )
 
-    def generate(self) -> pa.Table:
+    @staticmethod
+    def _sum_hourly_totals(transfer_dataframe: DataFrame) -> DataFrame:
+        return transfer_dataframe.groupby(["Date/Time"]).agg(
+            [
+                col("Total number of transfers").sum(),
+                col("Total technical failures").sum(),
+                col("Total unclassified failures").sum(),
+            ]
+        )
+
+    @staticmethod
+    def _sorted_by_date_requested_hourly(transfer_dataframe: DataFrame) -> DataFrame:
+        return transfer_dataframe.sort("Date/Time")
+
+    def _hourly_totals(self) -> DataFrame:
         transfers_frame = pl.from_arrow(self._transfers)
-        processed_transfers = self._process(
+        return self._process(
             transfers_frame,
             self._create_hour_column,
             self._create_technical_failure_column,
             self._create_unclassified_failure_column,
             self._group_by_date_requested_hourly,
+        )
+
+    def generate(self) -> pa.Table:
+        processed_transfers = self._sorted_by_date_requested_hourly(self._hourly_totals()).to_dict()
+        return pa.table(processed_transfers)
+
+    def aggregate(self) -> pa.Table:
+        return self._hourly_totals().to_arrow()
+
+    @classmethod
+    def merge(cls, partials: List[pa.Table]) -> pa.Table:
+        processed_transfers = cls._process(
+            pl.from_arrow(cls._concat_partials(partials)),
+            cls._sum_hourly_totals,
+            cls._sorted_by_date_requested_hourly,
         ).to_dict()
         return pa.table(processed_transfers)
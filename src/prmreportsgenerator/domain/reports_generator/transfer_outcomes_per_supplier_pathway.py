@@ -7,12 +7,18 @@ from polars import DataFrame, Expr, col, count, lit, when
 from prmreportsgenerator.domain.reports_generator.reports_generator import ReportsGenerator
 from prmreportsgenerator.domain.transfer import TransferStatus
 
+OUTCOME_COLUMNS = [
+    "requesting supplier",
+    "sending supplier",
+    "status",
+    "failure reason",
+    "unique final errors",
+    "unique sender errors",
+    "unique intermediate errors",
+]
 
-class TransferOutcomesPerSupplierPathwayReportsGenerator(ReportsGenerator):
-    def __init__(self, transfers: pa.Table):
-        super().__init__()
-        self._transfers = transfers
 
+class TransferOutcomesPerSupplierPathwayReportsGenerator(ReportsGenerator):
     def _counted_by_supplier_pathway_and_outcome(self, transfer_dataframe: DataFrame) -> DataFrame:
         return (
             transfer_dataframe.with_columns(
@@ -31,28 +37,24 @@ class TransferOutcomesPerSupplierPathwayReportsGenerator(ReportsGenerator):
                     .alias("unique intermediate errors"),
                 ]
             )
-            .groupby(
-                [
-                    "requesting supplier",
-                    "sending supplier",
-                    "status",
-                    "failure reason",
-                    "unique final errors",
-                    "unique sender errors",
-                    "unique intermediate errors",
-                ]
-            )
+            .groupby(OUTCOME_COLUMNS)
             .agg([count("conversation_id").alias("number of transfers")])
         )
 
-    def _with_percentage_of_all_transfers(self, transfer_dataframe: DataFrame) -> DataFrame:
+    @staticmethod
+    def _summed_by_supplier_pathway_and_outcome(transfer_dataframe: DataFrame) -> DataFrame:
+        return transfer_dataframe.groupby(OUTCOME_COLUMNS).agg([col("number of transfers").sum()])
+
+    @staticmethod
+    def _with_percentage_of_all_transfers(transfer_dataframe: DataFrame) -> DataFrame:
         total_transfers = col("number of transfers").sum()
         percentage_of_total_transfers = (col("number of transfers") / total_transfers) * 100
         return transfer_dataframe.with_columns(
             percentage_of_total_transfers.alias("% of transfers")
         )
 
-    def _with_percentage_of_supplier_pathway(self, transfer_dataframe: DataFrame) -> DataFrame:
+    @staticmethod
+    def _with_percentage_of_supplier_pathway(transfer_dataframe: DataFrame) -> DataFrame:
         supplier_pathway: List[Union[Expr, str]] = [
             col("requesting supplier"),
             col("sending supplier"),
@@ -61,7 +63,8 @@ class TransferOutcomesPerSupplierPathwayReportsGenerator(ReportsGenerator):
         percentage_of_pathway = (col("number of transfers") / count_per_pathway) * 100
         return transfer_dataframe.with_columns(percentage_of_pathway.alias("% of supplier pathway"))
 
-    def _with_percentage_of_technical_failures(self, transfer_dataframe: DataFrame) -> DataFrame:
+    @staticmethod
+    def _with_percentage_of_technical_failures(transfer_dataframe: DataFrame) -> DataFrame:
         is_technical_failure = col("status") == TransferStatus.TECHNICAL_FAILURE.value
         total_technical_failures = col("number of transfers").filter(is_technical_failure).sum()
         percentage_of_tech_failures = (col("number of transfers") / total_technical_failures) * 100
@@ -72,7 +75,8 @@ class TransferOutcomesPerSupplierPathwayReportsGenerator(ReportsGenerator):
             .alias("% of technical failures"),
         )
 
-    def _sorted_by_pathway_and_status(self, transfer_dataframe: DataFrame) -> DataFrame:
+    @staticmethod
+    def _sorted_by_pathway_and_status(transfer_dataframe: DataFrame) -> DataFrame:
         return transfer_dataframe.sort(
             [
                 col("number of transfers"),
@@ -83,15 +87,34 @@ class TransferOutcomesPerSupplierPathwayReportsGenerator(ReportsGenerator):
             descending=[True, False, False, False],
         )
 
-    def generate(self) -> pa.Table:
+    @classmethod
+    def _with_percentages_sorted(cls, transfer_dataframe: DataFrame) -> DataFrame:
+        return cls._process(
+            transfer_dataframe,
+            cls._with_percentage_of_all_transfers,
+            cls._with_percentage_of_technical_failures,
+            cls._with_percentage_of_supplier_pathway,
+            cls._sorted_by_pathway_and_status,
+        )
+
+    def _outcome_counts(self) -> DataFrame:
         transfers_frame = pl.from_arrow(self._transfers)
-        processed_transfers = self._process(
-            transfers_frame,
-            self._counted_by_supplier_pathway_and_outcome,
-            self._with_percentage_of_all_transfers,
-            self._with_percentage_of_technical_failures,
-            self._with_percentage_of_supplier_pathway,
-            self._sorted_by_pathway_and_status,
+        return self._process(transfers_frame, self._counted_by_supplier_pathway_and_outcome)
+
+    def generate(self) -> pa.Table:
+        processed_transfers = self._with_percentages_sorted(self._outcome_counts()).to_dict()
+
+        return pa.table(processed_transfers)
+
+    def aggregate(self) -> pa.Table:
+        return self._outcome_counts().to_arrow()
+
+    @classmethod
+    def merge(cls, partials: List[pa.Table]) -> pa.Table:
+        processed_transfers = cls._process(
+            pl.from_arrow(cls._concat_partials(partials)),
+            cls._summed_by_supplier_pathway_and_outcome,
+            cls._with_percentages_sorted,
         ).to_dict()
 
         return pa.table(processed_transfers)
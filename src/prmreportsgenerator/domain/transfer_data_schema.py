@@ -0,0 +1,67 @@
+from typing import List
+
+import pyarrow as pa
+
+from prmreportsgenerator.utils.unify_tables import unify_table_schemas
+
+
+class TransferDataSchemaError(Exception):
+    pass
+
+
+# columns every report depends on are not nullable, other columns missing from a file are read
+# as nulls, as they are when files with different schemas are unified
+TRANSFER_DATA_V11_SCHEMA = pa.schema(
+    [
+        pa.field("conversation_id", pa.string(), nullable=False),
+        pa.field("date_requested", pa.timestamp("us"), nullable=False),
+        ("last_sender_message_timestamp", pa.timestamp("us")),
+        ("requesting_practice_asid", pa.string()),
+        ("requesting_practice_name", pa.string()),
+        ("requesting_supplier", pa.string()),
+        ("requesting_practice_ods_code", pa.string()),
+        ("requesting_practice_sicbl_ods_code", pa.string()),
+        ("requesting_practice_sicbl_name", pa.string()),
+        ("sending_practice_asid", pa.string()),
+        ("sending_practice_name", pa.string()),
+        ("sending_supplier", pa.string()),
+        ("sending_practice_ods_code", pa.string()),
+        ("sending_practice_sicbl_ods_code", pa.string()),
+        ("sending_practice_sicbl_name", pa.string()),
+        ("sla_duration", pa.uint64()),
+        pa.field("status", pa.string(), nullable=False),
+        ("failure_reason", pa.string()),
+        ("final_error_codes", pa.list_(pa.int64())),
+        ("sender_error_codes", pa.list_(pa.int64())),
+        ("intermediate_error_codes", pa.list_(pa.int64())),
+    ]
+)
+
+
+def _is_unifiable(data_type: pa.DataType, expected_type: pa.DataType) -> bool:
+    # null typed columns and types that widen to the expected one, e.g. int32 to int64
+    try:
+        unified = unify_table_schemas(
+            [pa.schema([("column", data_type)]), pa.schema([("column", expected_type)])]
+        )
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return False
+    return unified.field("column").type.equals(expected_type)
+
+
+def transfer_data_schema_errors(
+    schema: pa.Schema, expected_schema: pa.Schema = TRANSFER_DATA_V11_SCHEMA
+) -> List[str]:
+    # columns beyond the expected ones are allowed, the reports never read them
+    errors = []
+    for expected_field in expected_schema:
+        index = schema.get_field_index(expected_field.name)
+        if index == -1:
+            if not expected_field.nullable:
+                errors.append(f"missing column {expected_field.name}")
+        elif not _is_unifiable(schema.field(index).type, expected_field.type):
+            errors.append(
+                f"column {expected_field.name} has type {schema.field(index).type},"
+                f" expected {expected_field.type}"
+            )
+    return errors
@@ -0,0 +1,200 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from threading import Condition
+from typing import Callable, Iterator, Optional, TypeVar
+
+from botocore.exceptions import (
+    BotoCoreError,
+    ClientError,
+    ConnectionError,
+    HTTPClientError,
+    IncompleteReadError,
+)
+
+from prmreportsgenerator.metrics.pipeline_metrics import MetricUnit, PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+THROTTLING_ERROR_CODES = frozenset(
+    {
+        "503",
+        "SlowDown",
+        "ServiceUnavailable",
+        "Throttling",
+        "ThrottlingException",
+        "RequestLimitExceeded",
+    }
+)
+# failures S3 documents as safe to retry, which say nothing about the request rate
+TRANSIENT_ERROR_CODES = frozenset({"500", "InternalError", "RequestTimeout"})
+# connections refused, dropped or timed out, which botocore retries for clients that retry
+TRANSIENT_BOTOCORE_ERRORS = (ConnectionError, HTTPClientError, IncompleteReadError)
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    if not isinstance(error, ClientError):
+        return None
+    return error.response.get("Error", {}).get("Code")
+
+
+def is_throttling_error(error: Exception) -> bool:
+    return _error_code(error) in THROTTLING_ERROR_CODES
+
+
+def is_transient_error(error: Exception) -> bool:
+    return (
+        isinstance(error, TRANSIENT_BOTOCORE_ERRORS) or _error_code(error) in TRANSIENT_ERROR_CODES
+    )
+
+
+class AdaptiveConcurrencyLimit:
+    # Additive increase, multiplicative decrease: each prompt response allows one more request in
+    # flight, each throttled response or latency spike cuts the number allowed by decrease_factor
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: int = 1,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 3.0,
+        latency_smoothing: float = 0.2,
+    ):
+        self._max_limit = max_limit
+        self._limit = float(min(initial_limit, max_limit))
+        self._decrease_factor = decrease_factor
+        self._latency_spike_factor = latency_spike_factor
+        self._latency_smoothing = latency_smoothing
+        self._average_latency_seconds: Optional[float] = None
+        self._in_flight = 0
+        self._condition = Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+    def try_acquire(self) -> bool:
+        # takes a slot only if one is free now, for requests not worth waiting for
+        with self._condition:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _is_latency_spike(self, latency_seconds: float) -> bool:
+        return (
+            self._average_latency_seconds is not None
+            and latency_seconds > self._average_latency_seconds * self._latency_spike_factor
+        )
+
+    def record_success(self, latency_seconds: float):
+        with self._condition:
+            if self._is_latency_spike(latency_seconds):
+                self._decrease()
+            else:
+                self._limit = min(float(self._max_limit), self._limit + 1)
+            if self._average_latency_seconds is None:
+                self._average_latency_seconds = latency_seconds
+            else:
+                self._average_latency_seconds += self._latency_smoothing * (
+                    latency_seconds - self._average_latency_seconds
+                )
+            self._condition.notify_all()
+
+    def record_throttled(self):
+        with self._condition:
+            self._decrease()
+
+    def _decrease(self):
+        self._limit = max(1.0, self._limit * self._decrease_factor)
+
+
+class AdaptiveRetryingRequests:
+    # Retries throttled and transiently failed requests after a random delay of up to an exponentially growing cap
+    # ("full jitter"), so requests throttled together do not retry together
+    def __init__(
+        self,
+        concurrency_limit: AdaptiveConcurrencyLimit,
+        max_attempts: int = 5,
+        base_delay_seconds: float = 0.1,
+        max_delay_seconds: float = 5.0,
+        metrics: Optional[PipelineMetrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self._concurrency_limit = concurrency_limit
+        self._max_attempts = max_attempts
+        self._base_delay_seconds = base_delay_seconds
+        self._max_delay_seconds = max_delay_seconds
+        self._metrics = metrics if metrics is not None else PipelineMetrics()
+        self._clock = clock
+        self._sleep = sleep
+        self._jitter = jitter
+
+    def _attempt(self, request: Callable[[], T]) -> T:
+        with self._concurrency_limit.slot():
+            start = self._clock()
+            try:
+                result = request()
+            except ClientError as error:
+                if is_throttling_error(error):
+                    self._concurrency_limit.record_throttled()
+                raise
+            self._concurrency_limit.record_success(self._clock() - start)
+            return result
+
+    def _retry_delay_seconds(self, attempt: int) -> float:
+        return self._jitter() * min(
+            self._max_delay_seconds, self._base_delay_seconds * 2 ** (attempt - 1)
+        )
+
+    def call(self, object_uri: str, request: Callable[[], T]) -> T:
+        attempt = 1
+        while True:
+            try:
+                return self._attempt(request)
+            except (ClientError, BotoCoreError) as error:
+                is_retryable = is_throttling_error(error) or is_transient_error(error)
+                if not is_retryable or attempt >= self._max_attempts:
+                    raise
+                delay_seconds = self._retry_delay_seconds(attempt)
+                self._log_retry(object_uri, attempt, error, delay_seconds)
+            self._sleep(delay_seconds)
+            attempt += 1
+
+    def _log_retry(self, object_uri: str, attempt: int, error: Exception, delay_seconds: float):
+        if is_throttling_error(error):
+            self._metrics.increment("s3_throttled_requests", 1, MetricUnit.COUNT)
+            message, event = "Throttled requesting", "S3_REQUEST_THROTTLED"
+        else:
+            self._metrics.increment("s3_transient_errors", 1, MetricUnit.COUNT)
+            message, event = "Transient error requesting", "S3_REQUEST_FAILED_TRANSIENTLY"
+        logger.warning(
+            f"{message} {object_uri} on attempt {attempt}, retrying",
+            extra={
+                "event": event,
+                "object_uri": object_uri,
+                "attempt": attempt,
+                "error-code": _error_code(error) or type(error).__name__,
+                "retry-delay-seconds": delay_seconds,
+                "concurrency-limit": self._concurrency_limit.limit,
+            },
+        )
@@ -0,0 +1,58 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Deque, Iterator, Tuple
+
+import pyarrow as pa
+import pyarrow.csv as csv
+
+CSV_SIZE_SAMPLE_ROWS = 1024
+
+
+def estimate_rows_per_chunk(table: pa.Table, chunk_size_bytes: int) -> int:
+    # sized from rows spread across the table encoded as CSV, which can be several times
+    # larger than their Arrow size, e.g. for dates and small integers
+    if table.num_rows == 0:
+        return 1
+    step = max(1, table.num_rows // CSV_SIZE_SAMPLE_ROWS)
+    sample = table.take(pa.array(range(0, table.num_rows, step)))
+    encoded_bytes = len(_encode_csv_slice(sample, include_header=False))
+    bytes_per_row = max(1, encoded_bytes // sample.num_rows)
+    return max(1, chunk_size_bytes // bytes_per_row)
+
+
+def _encode_csv_slice(table_slice: pa.Table, include_header: bool) -> bytes:
+    buffer = BytesIO()
+    csv.write_csv(table_slice, buffer, csv.WriteOptions(include_header=include_header))
+    return buffer.getvalue()
+
+
+def _table_slices(table: pa.Table, rows_per_chunk: int) -> Iterator[Tuple[pa.Table, bool]]:
+    for offset in range(0, max(table.num_rows, 1), rows_per_chunk):
+        yield table.slice(offset, rows_per_chunk), offset == 0
+
+
+def _encode_csv_chunks_concurrently(
+    table: pa.Table, rows_per_chunk: int, max_workers: int
+) -> Iterator[bytes]:
+    # Arrow releases the GIL while encoding, so slices are encoded in parallel. At most
+    # 2 * max_workers encoded slices are held at once and they are yielded in table order.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: Deque[Future] = deque()
+        for table_slice, include_header in _table_slices(table, rows_per_chunk):
+            in_flight.append(executor.submit(_encode_csv_slice, table_slice, include_header))
+            if len(in_flight) >= 2 * max_workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def encode_csv_chunks(
+    table: pa.Table, rows_per_chunk: int, max_workers: int = 1
+) -> Iterator[bytes]:
+    # Concatenated, the chunks are byte-identical to csv.write_csv(table)
+    if max_workers > 1:
+        yield from _encode_csv_chunks_concurrently(table, rows_per_chunk, max_workers)
+        return
+    for table_slice, include_header in _table_slices(table, rows_per_chunk):
+        yield _encode_csv_slice(table_slice, include_header)
@@ -0,0 +1,156 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from prmreportsgenerator.config import DEFAULT_S3_READ_MAX_ATTEMPTS, DEFAULT_S3_READ_PART_THREADS
+from prmreportsgenerator.metrics.pipeline_metrics import PipelineMetrics
+from prmreportsgenerator.output_format import OutputFormat
+
+# botocore's default, enough for the few requests writes make at once
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+
+@dataclass(frozen=True)
+class ParquetFooter:
+    metadata: pq.FileMetaData
+    size_bytes: int
+
+
+@dataclass(frozen=True)
+class ListedObject:
+    uri: str
+    size_bytes: int
+    etag: Optional[str]
+
+
+class DataManager(ABC):
+    @abstractmethod
+    def read_parquet(self, object_uri: str, columns: Optional[List[str]] = None) -> pa.Table:
+        pass
+
+    @abstractmethod
+    def read_parquet_footer(self, object_uri: str) -> ParquetFooter:
+        pass
+
+    @abstractmethod
+    def read_dataset(
+        self,
+        object_uris: List[str],
+        columns: Optional[List[str]] = None,
+        schema: Optional[pa.Schema] = None,
+    ) -> pa.Table:
+        pass
+
+    @abstractmethod
+    def object_size(self, object_uri: str) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    def list_objects(self, prefix_uri: str) -> List[ListedObject]:
+        pass
+
+    def exists(self, object_uri: str) -> bool:
+        return self.object_size(object_uri) is not None
+
+    @abstractmethod
+    def write_table(
+        self,
+        table: pa.Table,
+        object_uris: Dict[OutputFormat, str],
+        metadata: Dict[str, str],
+        parquet_row_group_size: Optional[int] = None,
+    ):
+        pass
+
+    @abstractmethod
+    def write_json(self, object_uri: str, data: Dict[str, Any], metadata: Dict[str, str]):
+        pass
+
+    def write_table_to_csv(self, object_uri: str, table: pa.Table, metadata: Dict[str, str]):
+        self.write_table(table, {OutputFormat.CSV: object_uri}, metadata)
+
+    def close(self):
+        pass
+
+
+def read_pool_connections(s3_read_concurrency: int, s3_read_part_threads: int, hedged: bool) -> int:
+    # each object read at once may fetch its parts on every part thread, and may have a hedge
+    # beside it, so connections beyond the pool's size would be dropped and reopened
+    connections = s3_read_concurrency * s3_read_part_threads
+    if hedged:
+        connections += 2 * s3_read_concurrency
+    return max(DEFAULT_MAX_POOL_CONNECTIONS, connections)
+
+
+def create_data_manager(
+    local_data_directory: Optional[str],
+    s3_endpoint_url: Optional[str],
+    metrics: PipelineMetrics,
+    s3_upload_part_size_bytes: Optional[int] = None,
+    csv_encoding_threads: int = 1,
+    s3_read_concurrency: int = 1,
+    s3_read_max_attempts: int = DEFAULT_S3_READ_MAX_ATTEMPTS,
+    s3_read_hedge_percentile: Optional[int] = None,
+    s3_read_part_size_bytes: Optional[int] = None,
+    s3_read_part_threads: int = DEFAULT_S3_READ_PART_THREADS,
+) -> DataManager:
+    # backends are imported here so a run only imports the one it uses
+    if local_data_directory:
+        from prmreportsgenerator.io.local import LocalDataManager
+
+        return LocalDataManager(
+            local_data_directory, metrics=metrics, csv_encoding_threads=csv_encoding_threads
+        )
+
+    import boto3
+    from botocore.config import Config
+
+    from prmreportsgenerator.io.adaptive_concurrency import (
+        AdaptiveConcurrencyLimit,
+        AdaptiveRetryingRequests,
+    )
+    from prmreportsgenerator.io.hedged_requests import HedgedRequests
+    from prmreportsgenerator.io.s3 import DEFAULT_UPLOAD_PART_SIZE_BYTES, S3DataManager
+
+    s3 = boto3.resource("s3", endpoint_url=s3_endpoint_url)
+    # reads are retried by read_requests, including dropped connections and timeouts, so retries
+    # are paced by its concurrency limit rather than botocore's
+    read_s3 = boto3.resource(
+        "s3",
+        endpoint_url=s3_endpoint_url,
+        config=Config(
+            retries={"mode": "standard", "max_attempts": 1},
+            max_pool_connections=read_pool_connections(
+                s3_read_concurrency,
+                s3_read_part_threads,
+                hedged=s3_read_hedge_percentile is not None,
+            ),
+        ),
+    )
+    read_concurrency_limit = AdaptiveConcurrencyLimit(max_limit=s3_read_concurrency)
+    return S3DataManager(
+        s3,
+        metrics=metrics,
+        upload_part_size_bytes=s3_upload_part_size_bytes or DEFAULT_UPLOAD_PART_SIZE_BYTES,
+        csv_encoding_threads=csv_encoding_threads,
+        read_client=read_s3,
+        read_requests=AdaptiveRetryingRequests(
+            read_concurrency_limit,
+            max_attempts=s3_read_max_attempts,
+            metrics=metrics,
+        ),
+        hedged_requests=HedgedRequests(
+            # each request in flight may have a hedge in flight beside it
+            max_workers=2 * s3_read_concurrency,
+            percentile=s3_read_hedge_percentile,
+            metrics=metrics,
+            concurrency_limit=read_concurrency_limit,
+        )
+        if s3_read_hedge_percentile is not None
+        else None,
+        read_part_size_bytes=s3_read_part_size_bytes,
+        read_part_threads=s3_read_part_threads,
+    )
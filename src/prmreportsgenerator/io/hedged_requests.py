@@ -0,0 +1,145 @@
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+from prmreportsgenerator.io.adaptive_concurrency import AdaptiveConcurrencyLimit
+from prmreportsgenerator.metrics.pipeline_metrics import MetricUnit, PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_HEDGE_PERCENTILE = 95
+
+
+def size_class(size_bytes: Optional[int]) -> Optional[int]:
+    # objects within a factor of four of each other share a class, e.g. daily files and
+    # compacted months are in different classes
+    if size_bytes is None:
+        return None
+    return size_bytes.bit_length() // 2
+
+
+class LatencyPercentile:
+    # Tracks the latencies of the most recent requests, so the deadline follows this run's S3
+    def __init__(self, percentile: float, min_samples: int = 5, max_samples: int = 100):
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=max_samples)
+        self._lock = Lock()
+
+    def record(self, latency_seconds: float):
+        with self._lock:
+            self._latencies.append(latency_seconds)
+
+    def value(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        rank = math.ceil(self._percentile / 100 * len(latencies))
+        return latencies[max(rank, 1) - 1]
+
+
+class HedgedRequests:
+    # A request still running after the latency percentile of this run's requests is duplicated,
+    # and whichever finishes first is used. The slower request is left to finish in the background.
+    def __init__(
+        self,
+        max_workers: int,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_samples: int = 5,
+        metrics: Optional[PipelineMetrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+        concurrency_limit: Optional[AdaptiveConcurrencyLimit] = None,
+    ):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._percentile = percentile
+        self._min_samples = min_samples
+        # deadlines are learned per size class, as larger objects take longer to download
+        self._deadlines: Dict[Optional[int], LatencyPercentile] = {}
+        self._deadlines_lock = Lock()
+        self._metrics = metrics if metrics is not None else PipelineMetrics()
+        self._clock = clock
+        # the limit the primary request holds a slot of, so a hedge also needs a slot
+        self._concurrency_limit = concurrency_limit
+
+    def _deadline(self, size_bytes: Optional[int]) -> LatencyPercentile:
+        with self._deadlines_lock:
+            return self._deadlines.setdefault(
+                size_class(size_bytes),
+                LatencyPercentile(self._percentile, min_samples=self._min_samples),
+            )
+
+    def _timed(self, request: Callable[[], T], deadline: LatencyPercentile) -> Callable[[], T]:
+        def timed_request() -> T:
+            start = self._clock()
+            result = request()
+            deadline.record(self._clock() - start)
+            return result
+
+        return timed_request
+
+    def call(
+        self, object_uri: str, request: Callable[[], T], size_bytes: Optional[int] = None
+    ) -> T:
+        deadline = self._deadline(size_bytes)
+        deadline_seconds = deadline.value()
+        if deadline_seconds is None:
+            return self._timed(request, deadline)()
+        primary = self._executor.submit(self._timed(request, deadline))
+        done, _ = wait([primary], timeout=deadline_seconds)
+        if done:
+            return primary.result()
+        if self._concurrency_limit is not None and not self._concurrency_limit.try_acquire():
+            self._metrics.increment("hedged_requests_skipped", 1, MetricUnit.COUNT)
+            return primary.result()
+        return self._hedge(object_uri, self._timed(request, deadline), primary, deadline_seconds)
+
+    def _submit_hedge(self, request: Callable[[], T]) -> Future:
+        hedge = self._executor.submit(request)
+        if self._concurrency_limit is not None:
+            # the slot is held until the hedge finishes, even if the primary wins
+            concurrency_limit = self._concurrency_limit
+            hedge.add_done_callback(lambda _: concurrency_limit.release())
+        return hedge
+
+    def _hedge(
+        self, object_uri: str, request: Callable[[], T], primary: Future, deadline_seconds: float
+    ) -> T:
+        logger.info(
+            f"Hedging request for {object_uri} still running after {deadline_seconds:.3f}s",
+            extra={
+                "event": "HEDGED_S3_REQUEST",
+                "object_uri": object_uri,
+                "deadline-seconds": deadline_seconds,
+            },
+        )
+        self._metrics.increment("hedged_requests", 1, MetricUnit.COUNT)
+        hedge = self._submit_hedge(request)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = hedge if hedge in done else primary
+        if first.exception() is not None:
+            other = primary if first is hedge else hedge
+            return other.result()
+        if first is hedge:
+            self._record_hedge_won(primary)
+        return first.result()
+
+    def _record_hedge_won(self, primary: Future):
+        self._metrics.increment("hedged_requests_won", 1, MetricUnit.COUNT)
+        hedge_finished = self._clock()
+
+        def record_time_saved(_: Future):
+            self._metrics.increment(
+                "hedged_requests_seconds_saved", self._clock() - hedge_finished, MetricUnit.SECONDS
+            )
+
+        primary.add_done_callback(record_time_saved)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -1,22 +1,67 @@
 import json
-from datetime import datetime
+import math
+from datetime import datetime, timezone
 from logging import Formatter, LogRecord, makeLogRecord
+from typing import Dict, Optional, Tuple
 
-DEFAULT_LOG_RECORD_ATTRS = vars(makeLogRecord({})).keys()
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+DEFAULT_LOG_RECORD_ATTRS = frozenset(vars(makeLogRecord({})).keys())
+
+_MICROSECONDS_PER_SECOND = 1_000_000
 
 
 class JsonFormatter(Formatter):
+    def __init__(self, use_orjson: bool = orjson is not None):
+        super().__init__()
+        self._use_orjson = use_orjson and orjson is not None
+        self._extra_attrs_cache: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._cached_second: Optional[int] = None
+        self._cached_second_isoformat = ""
+
+    def _extra_attrs(self, record_attrs: Tuple[str, ...]) -> Tuple[str, ...]:
+        # records logged from the same call site share the same attributes
+        extra_attrs = self._extra_attrs_cache.get(record_attrs)
+        if extra_attrs is None:
+            extra_attrs = tuple(
+                name for name in record_attrs if name not in DEFAULT_LOG_RECORD_ATTRS
+            )
+            self._extra_attrs_cache[record_attrs] = extra_attrs
+        return extra_attrs
+
+    def _isoformat(self, created: float) -> str:
+        # same rounding and format as datetime.utcfromtimestamp(created).isoformat()
+        fraction, whole = math.modf(created)
+        microseconds = round(fraction * _MICROSECONDS_PER_SECOND)
+        if microseconds >= _MICROSECONDS_PER_SECOND:
+            whole += 1
+            microseconds -= _MICROSECONDS_PER_SECOND
+        second = int(whole)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_second_isoformat = (
+                datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None).isoformat()
+            )
+        if microseconds:
+            return f"{self._cached_second_isoformat}.{microseconds:06d}"
+        return self._cached_second_isoformat
+
+    def _dumps(self, log: dict) -> str:
+        if self._use_orjson:
+            try:
+                return orjson.dumps(log).decode()
+            except TypeError:
+                pass  # e.g. integers wider than 64 bits, which the json module supports
+        return json.dumps(log)
+
     def format(self, record: LogRecord) -> str:
-        return json.dumps(
-            {
-                name: value
-                for (name, value) in vars(record).items()
-                if name not in DEFAULT_LOG_RECORD_ATTRS
-            }
-            | {
-                "level": record.levelname,
-                "message": record.msg,
-                "module": record.module,
-                "time": datetime.utcfromtimestamp(record.created).isoformat(),
-            }
-        )
+        record_vars = vars(record)
+        log = {name: record_vars[name] for name in self._extra_attrs(tuple(record_vars))}
+        log["level"] = record.levelname
+        log["message"] = record.msg
+        log["module"] = record.module
+        log["time"] = self._isoformat(record.created)
+        return self._dumps(log)
@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow.fs import LocalFileSystem
+
+from prmreportsgenerator.io.data_manager import DataManager, ListedObject, ParquetFooter
+from prmreportsgenerator.io.output_encoder import write_outputs
+from prmreportsgenerator.io.parquet_dataset import read_parquet_dataset
+from prmreportsgenerator.metrics.pipeline_metrics import MetricUnit, PipelineMetrics
+from prmreportsgenerator.output_format import OutputFormat
+
+logger = logging.getLogger(__name__)
+
+_METADATA_FILE_SUFFIX = ".metadata.json"
+_CSV_CHUNK_SIZE_BYTES = 4 * 1024 * 1024
+
+
+class LocalDataManager(DataManager):
+    # Mirrors the S3 layout on disk: s3://bucket/key is read from and written to <root>/bucket/key
+    def __init__(
+        self,
+        root_directory: str,
+        metrics: Optional[PipelineMetrics] = None,
+        csv_encoding_threads: int = 1,
+    ):
+        self._root_directory = Path(root_directory)
+        self._metrics = metrics if metrics is not None else PipelineMetrics()
+        self._csv_encoding_threads = csv_encoding_threads
+        self._parquet_footers: Dict[str, pq.FileMetaData] = {}
+
+    def _path_from_uri(self, uri: str) -> Path:
+        object_url = urlparse(uri)
+        return self._root_directory / object_url.netloc / object_url.path.lstrip("/")
+
+    @staticmethod
+    def metadata_path(path: Path) -> Path:
+        return path.with_name(path.name + _METADATA_FILE_SUFFIX)
+
+    def read_parquet(self, object_uri: str, columns: Optional[List[str]] = None) -> pa.Table:
+        path = self._path_from_uri(object_uri)
+        logger.info(
+            f"Reading file from: {path}",
+            extra={"event": "READING_FILE_FROM_LOCAL_DIRECTORY", "object_uri": object_uri},
+        )
+        if not path.is_file():
+            logger.error(
+                f"File not found: {path}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_LOCAL_DIRECTORY"},
+            )
+            raise FileNotFoundError(object_uri)
+
+        self._metrics.increment("objects_read", 1, MetricUnit.COUNT)
+        self._metrics.increment("bytes_read", path.stat().st_size, MetricUnit.BYTES)
+        return pq.ParquetFile(
+            str(path), metadata=self._parquet_footers.pop(object_uri, None), memory_map=True
+        ).read(columns=columns)
+
+    def read_parquet_footer(self, object_uri: str) -> ParquetFooter:
+        path = self._path_from_uri(object_uri)
+        if not path.is_file():
+            logger.error(
+                f"File not found: {path}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_LOCAL_DIRECTORY"},
+            )
+            raise FileNotFoundError(object_uri)
+        metadata = pq.read_metadata(str(path), memory_map=True)
+        self._parquet_footers[object_uri] = metadata
+        return ParquetFooter(metadata=metadata, size_bytes=path.stat().st_size)
+
+    def read_dataset(
+        self,
+        object_uris: List[str],
+        columns: Optional[List[str]] = None,
+        schema: Optional[pa.Schema] = None,
+    ) -> pa.Table:
+        logger.info(
+            f"Reading {len(object_uris)} files as a dataset",
+            extra={"event": "READING_DATASET_FROM_LOCAL_DIRECTORY", "object_uris": object_uris},
+        )
+        paths = [str(self._path_from_uri(object_uri)) for object_uri in object_uris]
+        try:
+            table = read_parquet_dataset(paths, LocalFileSystem(), columns, schema)
+        except FileNotFoundError as error:
+            logger.error(
+                f"File not found: {error}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_LOCAL_DIRECTORY"},
+            )
+            raise
+        self._metrics.increment("objects_read", len(object_uris), MetricUnit.COUNT)
+        return table
+
+    def object_size(self, object_uri: str) -> Optional[int]:
+        path = self._path_from_uri(object_uri)
+        return path.stat().st_size if path.is_file() else None
+
+    def list_objects(self, prefix_uri: str) -> List[ListedObject]:
+        # prefixes are directories here, and the files have no ETag
+        directory = self._path_from_uri(prefix_uri)
+        if not directory.is_dir():
+            return []
+        return [
+            ListedObject(
+                uri=prefix_uri.rstrip("/") + "/" + path.relative_to(directory).as_posix(),
+                size_bytes=path.stat().st_size,
+                etag=None,
+            )
+            for path in sorted(directory.rglob("*"))
+            if path.is_file() and not path.name.endswith(_METADATA_FILE_SUFFIX)
+        ]
+
+    @staticmethod
+    def _temporary_file(path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return NamedTemporaryFile("wb", dir=path.parent, suffix=".tmp", delete=False)
+
+    def write_table(
+        self,
+        table: pa.Table,
+        object_uris: Dict[OutputFormat, str],
+        metadata: Dict[str, str],
+        parquet_row_group_size: Optional[int] = None,
+    ):
+        # Every output is written to a temporary file and only renamed into place once all
+        # outputs have been written, so a failed write never replaces an existing report
+        paths = {
+            output_format: self._path_from_uri(uri) for output_format, uri in object_uris.items()
+        }
+        for output_format, object_uri in object_uris.items():
+            logger.info(
+                f"Attempting to write: {paths[output_format]}",
+                extra={
+                    "event": f"ATTEMPTING_WRITE_{output_format.value}_TO_LOCAL_DIRECTORY",
+                    "object_uri": object_uri,
+                },
+            )
+        temporary_paths = self._write_temporary_files(table, paths, parquet_row_group_size)
+        for output_format, object_uri in object_uris.items():
+            self._move_into_place(temporary_paths[output_format], paths[output_format], metadata)
+            logger.info(
+                f"Successfully written to: {paths[output_format]}",
+                extra={
+                    "event": f"SUCCESSFULLY_WROTE_{output_format.value}_TO_LOCAL_DIRECTORY",
+                    "object_uri": object_uri,
+                },
+            )
+
+    def _write_temporary_files(
+        self,
+        table: pa.Table,
+        paths: Dict[OutputFormat, Path],
+        parquet_row_group_size: Optional[int],
+    ) -> Dict[OutputFormat, str]:
+        temporary_files = {
+            output_format: self._temporary_file(path) for output_format, path in paths.items()
+        }
+        try:
+            write_outputs(
+                table,
+                sinks=temporary_files,  # type: ignore
+                chunk_size_bytes=_CSV_CHUNK_SIZE_BYTES,
+                csv_encoding_threads=self._csv_encoding_threads,
+                parquet_row_group_size=parquet_row_group_size,
+            )
+        except BaseException:
+            for temporary_file in temporary_files.values():
+                temporary_file.close()
+                os.remove(temporary_file.name)
+            raise
+        return {output_format: file.name for output_format, file in temporary_files.items()}
+
+    def _move_into_place(self, temporary_path: str, path: Path, metadata: Dict[str, str]):
+        with self._temporary_file(self.metadata_path(path)) as metadata_file:
+            metadata_file.write(json.dumps(metadata).encode())
+        os.replace(metadata_file.name, self.metadata_path(path))
+        os.replace(temporary_path, path)
+        self._metrics.increment("output_bytes", path.stat().st_size, MetricUnit.BYTES)
+
+    def write_json(self, object_uri: str, data: Dict[str, Any], metadata: Dict[str, str]):
+        path = self._path_from_uri(object_uri)
+        with self._temporary_file(path) as temporary_file:
+            temporary_file.write(json.dumps(data).encode())
+        self._move_into_place(temporary_file.name, path, metadata)
+        logger.info(
+            f"Successfully written to: {path}",
+            extra={"event": "SUCCESSFULLY_WROTE_JSON_TO_LOCAL_DIRECTORY", "object_uri": object_uri},
+        )
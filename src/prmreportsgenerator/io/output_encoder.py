@@ -0,0 +1,57 @@
+from typing import BinaryIO, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from prmreportsgenerator.io.csv_encoder import encode_csv_chunks, estimate_rows_per_chunk
+from prmreportsgenerator.output_format import OutputFormat
+
+_CSV_COMPRESSIONS = {
+    OutputFormat.CSV_GZIP: "gzip",
+    OutputFormat.CSV_ZSTD: "zstd",
+}
+PARQUET_COMPRESSION = "zstd"
+
+
+def _csv_stream(output_format: OutputFormat, sink: BinaryIO):
+    if output_format in _CSV_COMPRESSIONS:
+        return pa.CompressedOutputStream(sink, _CSV_COMPRESSIONS[output_format])
+    return sink
+
+
+def _write_csv_outputs(
+    table: pa.Table, streams: List[BinaryIO], chunk_size_bytes: int, csv_encoding_threads: int
+):
+    rows_per_chunk = estimate_rows_per_chunk(table, chunk_size_bytes // csv_encoding_threads)
+    for chunk in encode_csv_chunks(table, rows_per_chunk, csv_encoding_threads):
+        for stream in streams:
+            stream.write(chunk)
+    for stream in streams:
+        stream.close()
+
+
+def write_outputs(
+    table: pa.Table,
+    sinks: Dict[OutputFormat, BinaryIO],
+    chunk_size_bytes: int,
+    csv_encoding_threads: int = 1,
+    parquet_row_group_size: Optional[int] = None,
+):
+    # The table is CSV encoded once and each chunk is written to every CSV sink, compressing
+    # it on the way where needed. Every sink is closed once it has been written.
+    csv_streams = [
+        _csv_stream(output_format, sink)
+        for output_format, sink in sinks.items()
+        if output_format != OutputFormat.PARQUET
+    ]
+    if csv_streams:
+        _write_csv_outputs(table, csv_streams, chunk_size_bytes, csv_encoding_threads)
+
+    if OutputFormat.PARQUET in sinks:
+        pq.write_table(
+            table,
+            sinks[OutputFormat.PARQUET],
+            compression=PARQUET_COMPRESSION,
+            row_group_size=parquet_row_group_size,
+        )
+        sinks[OutputFormat.PARQUET].close()
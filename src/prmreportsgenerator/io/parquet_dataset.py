@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow.fs import FileSystem
+
+from prmreportsgenerator.utils.unify_tables import unify_table_schemas
+
+# footers are small, so fetching them is bound by request latency rather than bandwidth
+FOOTER_INSPECT_THREADS = 16
+
+
+def _unified_schema(
+    paths: List[str], parquet_format: ds.ParquetFileFormat, filesystem: FileSystem
+) -> pa.Schema:
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(len(paths), FOOTER_INSPECT_THREADS))
+    ) as executor:
+        schemas = list(executor.map(lambda path: parquet_format.inspect(path, filesystem), paths))
+    return unify_table_schemas(schemas)
+
+
+def read_parquet_dataset(
+    paths: List[str],
+    filesystem: FileSystem,
+    columns: Optional[List[str]] = None,
+    schema: Optional[pa.Schema] = None,
+) -> pa.Table:
+    # Scanning the files as one dataset reads fragments in parallel, pre-buffers and coalesces
+    # column chunk ranges and only reads projected columns. As when concatenating the files one
+    # by one, the schema is unified across every file's, so columns missing from a file are null
+    # and narrower types are widened, and rows keep the order of the paths.
+    parquet_format = ds.ParquetFileFormat(
+        default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True)
+    )
+    if schema is None:
+        schema = _unified_schema(paths, parquet_format, filesystem)
+    dataset = ds.FileSystemDataset.from_paths(
+        paths, schema=schema, format=parquet_format, filesystem=filesystem
+    )
+    return dataset.to_table(columns=columns)
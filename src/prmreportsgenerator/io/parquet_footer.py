@@ -0,0 +1,92 @@
+from bisect import bisect_right
+from io import SEEK_CUR, SEEK_END, SEEK_SET, RawIOBase
+from typing import List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PARQUET_MAGIC = b"PAR1"
+# A Parquet file ends with its footer, the footer's length as 4 little-endian bytes, then "PAR1"
+FOOTER_TRAILER_SIZE_BYTES = 8
+# large enough for the footer of a transfer file, so it is usually fetched in one request
+FOOTER_READ_SIZE_BYTES = 64 * 1024
+
+
+def footer_size(file_tail: bytes) -> int:
+    if not file_tail.endswith(PARQUET_MAGIC):
+        raise ValueError("Not a Parquet file, it does not end with the Parquet magic bytes")
+    footer_length = int.from_bytes(file_tail[-FOOTER_TRAILER_SIZE_BYTES:-4], "little")
+    return footer_length + FOOTER_TRAILER_SIZE_BYTES
+
+
+def parse_footer(file_tail: bytes) -> pq.FileMetaData:
+    # the footer is parsed on its own, preceded by the magic bytes a Parquet file starts with
+    footer_start = len(file_tail) - footer_size(file_tail)
+    if footer_start < 0:
+        raise ValueError("Parquet footer is incomplete")
+    return pq.read_metadata(pa.BufferReader(PARQUET_MAGIC + file_tail[footer_start:]))
+
+
+def column_chunk_ranges(metadata: pq.FileMetaData, columns: List[str]) -> List[Tuple[int, int]]:
+    # nested columns, like lists, are stored as leaf columns whose path starts with their name
+    ranges = []
+    for row_group_index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(row_group_index)
+        for column_index in range(row_group.num_columns):
+            column_chunk = row_group.column(column_index)
+            if column_chunk.path_in_schema.split(".")[0] not in columns:
+                continue
+            start = (
+                column_chunk.dictionary_page_offset
+                if column_chunk.has_dictionary_page
+                else column_chunk.data_page_offset
+            )
+            ranges.append((start, start + column_chunk.total_compressed_size))
+    return ranges
+
+
+def coalesce_ranges(ranges: List[Tuple[int, int]], max_gap_bytes: int) -> List[Tuple[int, int]]:
+    coalesced: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if coalesced and start - coalesced[-1][1] <= max_gap_bytes:
+            coalesced[-1] = (coalesced[-1][0], max(end, coalesced[-1][1]))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+class FetchedRanges(RawIOBase):
+    # A file of which only some byte ranges were downloaded, e.g. the chunks of the columns read.
+    # The Parquet reader, given the footer, reads only within those ranges, so only they are held.
+    def __init__(self, size_bytes: int, ranges: List[Tuple[int, int]], bodies: List[bytes]):
+        self._size_bytes = size_bytes
+        self._starts = [start for start, _ in ranges]
+        self._bodies = [memoryview(body) for body in bodies]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        origins = {SEEK_SET: 0, SEEK_CUR: self._position, SEEK_END: self._size_bytes}
+        self._position = origins[whence] + offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self._size_bytes:
+            return 0
+        index = bisect_right(self._starts, self._position) - 1
+        offset = self._position - self._starts[index] if index >= 0 else -1
+        if offset < 0 or offset >= len(self._bodies[index]):
+            raise ValueError(f"Byte {self._position} of the file was not downloaded")
+        length = min(len(buffer), len(self._bodies[index]) - offset)
+        end = offset + length
+        memoryview(buffer).cast("B")[:length] = self._bodies[index][offset:end]
+        self._position += length
+        return length
@@ -0,0 +1,18 @@
+from logging import Handler, LogRecord
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Tuple
+
+
+class InProcessQueueHandler(QueueHandler):
+    # Records never leave the process, so there is no need to pre-format and strip them
+    # before they are queued. Formatting happens on the listener thread instead.
+    def prepare(self, record: LogRecord) -> LogRecord:
+        return record
+
+
+def start_queue_logging(handler: Handler) -> Tuple[QueueHandler, QueueListener]:
+    log_queue: SimpleQueue = SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return InProcessQueueHandler(log_queue), listener
@@ -0,0 +1,59 @@
+import os
+from abc import ABC, abstractmethod
+from tempfile import TemporaryDirectory
+from typing import List, Optional
+
+import pyarrow as pa
+
+
+class ReportPartials(ABC):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @abstractmethod
+    def append(self, partial: pa.Table):
+        pass
+
+    @abstractmethod
+    def tables(self) -> List[pa.Table]:
+        pass
+
+    def close(self):
+        pass
+
+
+class InMemoryReportPartials(ReportPartials):
+    def __init__(self):
+        self._partials: List[pa.Table] = []
+
+    def append(self, partial: pa.Table):
+        self._partials.append(partial)
+
+    def tables(self) -> List[pa.Table]:
+        return list(self._partials)
+
+
+class SpilledReportPartials(ReportPartials):
+    # Partials are written to Arrow IPC files and memory mapped back, so the page cache rather
+    # than the process holds them until they are merged
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = TemporaryDirectory(prefix="report-partials-", dir=directory)
+        self._paths: List[str] = []
+        self.spilled_bytes = 0
+
+    def append(self, partial: pa.Table):
+        path = os.path.join(self._directory.name, f"{len(self._paths)}.arrow")
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, partial.schema) as writer:
+                writer.write_table(partial)
+        self._paths.append(path)
+        self.spilled_bytes += os.path.getsize(path)
+
+    def tables(self) -> List[pa.Table]:
+        return [pa.ipc.open_file(pa.memory_map(path)).read_all() for path in self._paths]
+
+    def close(self):
+        self._directory.cleanup()
@@ -1,13 +1,26 @@
+import calendar
 import logging
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from functools import partial
+from typing import Any, Collection, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote
 
 import pyarrow as pa
 
 from prmreportsgenerator.domain.reporting_windows.reporting_window import ReportingWindow
-from prmreportsgenerator.io.s3 import S3DataManager
+from prmreportsgenerator.domain.transfer_data_schema import (
+    TransferDataSchemaError,
+    transfer_data_schema_errors,
+)
+from prmreportsgenerator.io.data_manager import DataManager, ParquetFooter
+from prmreportsgenerator.io.transfer_data_catalog import TransferDataCatalog
+from prmreportsgenerator.output_format import OUTPUT_FILE_EXTENSIONS, OutputFormat
 from prmreportsgenerator.report_name import ReportName
 from prmreportsgenerator.utils.add_leading_zero import add_leading_zero
+from prmreportsgenerator.utils.unify_tables import conform_table, unify_table_schemas
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +29,14 @@ class ReportsS3UriResolver:
     _TRANSFER_DATA_FILE_NAME = "transfers.parquet"
     _TRANSFER_DATA_VERSION = "v11"
     _REPORTS_VERSION = "v5"
+    _MANIFEST_FILE_NAME = "manifest.json"
+    _NULL_PARTITION_FILE_NAME = "null"
+    _EMPTY_PARTITION_FILE_NAME = "empty"
+    # the day of a daily file, or the month of a compacted one
+    _TRANSFER_DATA_MONTH_PREFIX = re.compile(r"^(s3://.+?/\d{4}/\d{2}/)")
+    _TRANSFER_DATA_PERIOD = re.compile(r"(\d{4}-\d{2}(?:-\d{2})?)-transfers\.parquet$")
 
-    def __init__(self, transfer_data_bucket: str, reports_bucket: str):
+    def __init__(self, transfer_data_bucket: str, reports_bucket: Optional[str] = None):
         self._transfer_data_bucket = transfer_data_bucket
         self._reports_bucket = reports_bucket
 
@@ -42,26 +61,81 @@ class ReportsS3UriResolver:
 
         return f"{start_year}-{start_month}-{start_day}-{filename}"
 
-    def input_transfer_data_uris(
-        self, reporting_window: ReportingWindow, cutoff_days: int
-    ) -> List[str]:
+    def _daily_transfer_data_uri(self, date: datetime, cutoff_days: int) -> str:
+        return self._s3_path(
+            self._transfer_data_bucket,
+            self._TRANSFER_DATA_VERSION,
+            f"cutoff-{cutoff_days}",
+            f"{add_leading_zero(date.year)}",
+            f"{add_leading_zero(date.month)}",
+            f"{add_leading_zero(date.day)}",
+            self._filepath(start_date=date, filename=self._TRANSFER_DATA_FILE_NAME),
+        )
+
+    @classmethod
+    def transfer_data_period(cls, s3_uri: str) -> str:
+        match = cls._TRANSFER_DATA_PERIOD.search(s3_uri)
+        return match.group(1) if match else s3_uri
+
+    @classmethod
+    def transfer_data_month_prefix(cls, s3_uri: str) -> str:
+        # the month directory holding a daily file's day directory, or a compacted file
+        match = cls._TRANSFER_DATA_MONTH_PREFIX.match(s3_uri)
+        if match is None:
+            raise ValueError(f"Not a transfer data uri: {s3_uri}")
+        return match.group(1)
+
+    def compacted_transfer_data_uri(self, month: datetime, cutoff_days: int) -> str:
+        # a month of daily files merged into one, alongside the month's daily directories
+        year = add_leading_zero(month.year)
+        month_number = add_leading_zero(month.month)
+        return self._s3_path(
+            self._transfer_data_bucket,
+            self._TRANSFER_DATA_VERSION,
+            f"cutoff-{cutoff_days}",
+            year,
+            month_number,
+            f"{year}-{month_number}-{self._TRANSFER_DATA_FILE_NAME}",
+        )
+
+    @staticmethod
+    def _dates_by_month(reporting_window: ReportingWindow) -> Dict[datetime, List[datetime]]:
+        dates_by_month: Dict[datetime, List[datetime]] = {}
+        for date in reporting_window.get_dates():
+            dates_by_month.setdefault(date.replace(day=1), []).append(date)
+        return dates_by_month
+
+    def whole_months(self, reporting_window: ReportingWindow) -> List[datetime]:
         return [
-            self._s3_path(
-                self._transfer_data_bucket,
-                self._TRANSFER_DATA_VERSION,
-                f"cutoff-{cutoff_days}",
-                f"{add_leading_zero(start_date.year)}",
-                f"{add_leading_zero(start_date.month)}",
-                f"{add_leading_zero(start_date.day)}",
-                self._filepath(start_date=start_date, filename=self._TRANSFER_DATA_FILE_NAME),
-            )
-            for start_date in reporting_window.get_dates()
+            month
+            for month, dates in self._dates_by_month(reporting_window).items()
+            if len(dates) == calendar.monthrange(month.year, month.month)[1]
         ]
 
+    def input_transfer_data_uris(
+        self,
+        reporting_window: ReportingWindow,
+        cutoff_days: int,
+        compacted_months: Collection[datetime] = (),
+    ) -> List[str]:
+        # compacted months must be whole months of the window, see whole_months
+        uris = []
+        for month, dates in self._dates_by_month(reporting_window).items():
+            if month in compacted_months:
+                uris.append(self.compacted_transfer_data_uri(month, cutoff_days))
+            else:
+                uris.extend(self._daily_transfer_data_uri(date, cutoff_days) for date in dates)
+        return uris
+
     def _output_table_file_name(
-        self, start_date: datetime, end_date: datetime, cutoff_days: int, report_name: ReportName
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        cutoff_days: int,
+        report_name: ReportName,
+        extension: str,
     ):
-        filename = f"{report_name.value.lower()}--{cutoff_days}-days-cutoff.csv"
+        filename = f"{report_name.value.lower()}--{cutoff_days}-days-cutoff{extension}"
         actual_end_date = end_date - timedelta(
             days=1
         )  # data is at until midnight, so the actual data is for the previous day
@@ -74,6 +148,7 @@ class ReportsS3UriResolver:
         supplement_s3_key: str,
         cutoff_days: int,
         report_name: ReportName,
+        output_format: OutputFormat = OutputFormat.CSV,
     ) -> str:
         return self._s3_path(
             self._reports_bucket,
@@ -82,25 +157,286 @@ class ReportsS3UriResolver:
             f"{add_leading_zero(start_date.year)}",
             f"{add_leading_zero(start_date.month)}",
             f"{add_leading_zero(start_date.day)}",
-            self._output_table_file_name(start_date, end_date, cutoff_days, report_name),
+            self._output_table_file_name(
+                start_date,
+                end_date,
+                cutoff_days,
+                report_name,
+                OUTPUT_FILE_EXTENSIONS[output_format],
+            ),
         )
 
+    def _output_partitions_uri(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        supplement_s3_key: str,
+        cutoff_days: int,
+        report_name: ReportName,
+        filename: str,
+    ) -> str:
+        # partitions are written under a directory named like the unpartitioned report
+        return self._s3_path(
+            self._reports_bucket,
+            self._REPORTS_VERSION,
+            supplement_s3_key,
+            f"{add_leading_zero(start_date.year)}",
+            f"{add_leading_zero(start_date.month)}",
+            f"{add_leading_zero(start_date.day)}",
+            self._output_table_file_name(
+                start_date, end_date, cutoff_days, report_name, extension=""
+            ),
+            filename,
+        )
+
+    @classmethod
+    def _partition_file_name(cls, partition_value: Any) -> str:
+        if partition_value is None:
+            return cls._NULL_PARTITION_FILE_NAME
+        # percent encoded, so distinct values have distinct names
+        return quote(str(partition_value), safe="") or cls._EMPTY_PARTITION_FILE_NAME
+
+    def output_partition_uri(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        supplement_s3_key: str,
+        cutoff_days: int,
+        report_name: ReportName,
+        partition_value: Any,
+        output_format: OutputFormat = OutputFormat.CSV,
+    ) -> str:
+        filename = (
+            self._partition_file_name(partition_value) + OUTPUT_FILE_EXTENSIONS[output_format]
+        )
+        return self._output_partitions_uri(
+            start_date, end_date, supplement_s3_key, cutoff_days, report_name, filename
+        )
+
+    def output_manifest_uri(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        supplement_s3_key: str,
+        cutoff_days: int,
+        report_name: ReportName,
+    ) -> str:
+        return self._output_partitions_uri(
+            start_date,
+            end_date,
+            supplement_s3_key,
+            cutoff_days,
+            report_name,
+            self._MANIFEST_FILE_NAME,
+        )
+
+
+@dataclass(frozen=True)
+class OutputPartition:
+    value: Any
+    table: pa.Table
+    s3_uris: Dict[OutputFormat, str]
+
+
+def _wait_for_all(futures: List[Future]):
+    try:
+        for future in futures:
+            future.result()
+    except Exception:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def _check_partition_uris_are_unique(partitions: List[OutputPartition]):
+    # e.g. the string "null" and a null value, which would otherwise overwrite each other
+    seen_values: Dict[str, Any] = {}
+    for partition in partitions:
+        for s3_uri in partition.s3_uris.values():
+            if s3_uri in seen_values:
+                raise ValueError(
+                    f"Partition values {seen_values[s3_uri]!r} and {partition.value!r} "
+                    f"would both be written to {s3_uri}"
+                )
+            seen_values[s3_uri] = partition.value
+
+
+def _manifest_value(partition_value: Any) -> Any:
+    # JSON has no date type, so dates and datetimes are written in ISO format
+    if hasattr(partition_value, "isoformat"):
+        return partition_value.isoformat()
+    return partition_value
+
 
 class ReportsIO:
     def __init__(
         self,
-        s3_data_manager: S3DataManager,
+        data_manager: DataManager,
+        catalog: Optional[TransferDataCatalog] = None,
     ):
-        self._s3_manager = s3_data_manager
+        self._data_manager = data_manager
+        self._catalog = catalog
 
-    def read_transfers_as_table(self, s3_uris: List[str]) -> pa.Table:
-        return pa.concat_tables(
-            [self._s3_manager.read_parquet(s3_path) for s3_path in s3_uris],
-        )
+    def object_exists(self, s3_uri: str) -> bool:
+        if self._catalog is not None:
+            return self.object_sizes([s3_uri], max_workers=1)[0] is not None
+        return self._data_manager.exists(s3_uri)
+
+    def object_sizes(
+        self, s3_uris: List[str], max_workers: int, refresh_listing: bool = False
+    ) -> List[Optional[int]]:
+        # sizes come from listings or HEAD requests, so no object is downloaded.
+        # Missing objects are None.
+        if self._catalog is not None:
+            listed_objects = self._catalog.listed_objects(
+                s3_uris, max_workers=max_workers, refresh=refresh_listing
+            )
+            return [None if listed is None else listed.size_bytes for listed in listed_objects]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._data_manager.object_size, s3_uris))
+
+    def _read_transfer_file_footer(self, s3_uri: str) -> Tuple[Optional[ParquetFooter], List[str]]:
+        try:
+            footer = self._data_manager.read_parquet_footer(s3_uri)
+        except FileNotFoundError:
+            return None, ["file not found"]
+        except ValueError as error:
+            return None, [str(error)]
+        return footer, transfer_data_schema_errors(footer.metadata.schema.to_arrow_schema())
+
+    def validate_transfer_files(self, s3_uris: List[str], max_workers: int) -> List[ParquetFooter]:
+        # only the footers are fetched, so a bad file fails the run before any file is downloaded
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._read_transfer_file_footer, s3_uris))
+        errors = [
+            f"{s3_uri}: {error}"
+            for s3_uri, (_, file_errors) in zip(s3_uris, results)
+            for error in file_errors
+        ]
+        if errors:
+            raise TransferDataSchemaError("Invalid transfer data files - " + "; ".join(errors))
+        return [footer for footer, _ in results if footer is not None]
+
+    def transfer_data_schema(self, s3_uris: List[str], max_workers: int) -> pa.Schema:
+        # the schema every file is conformed to when files are read one at a time, from the
+        # files' footers rather than their data
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            footers = list(executor.map(self._data_manager.read_parquet_footer, s3_uris))
+        return unify_table_schemas([footer.metadata.schema.to_arrow_schema() for footer in footers])
+
+    def read_transfers_as_table(
+        self,
+        s3_uris: List[str],
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+        schema: Optional[pa.Schema] = None,
+    ) -> pa.Table:
+        read_parquet = self._data_manager.read_parquet
+        if columns is not None:
+            read_parquet = partial(read_parquet, columns=columns)
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                tables = list(executor.map(read_parquet, s3_uris))
+        else:
+            tables = [read_parquet(s3_path) for s3_path in s3_uris]
+        return self._concat_transfer_tables(s3_uris, tables, schema)
+
+    @staticmethod
+    def _concat_transfer_tables(
+        s3_uris: List[str], tables: List[pa.Table], schema: Optional[pa.Schema] = None
+    ) -> pa.Table:
+        # files written before or after a change to the transfer data schema can be read together
+        if schema is None:
+            schema = unify_table_schemas([table.schema for table in tables])
+        conformed_tables = []
+        for s3_uri, table in zip(s3_uris, tables):
+            conformed_table, adaptations = conform_table(table, schema)
+            if adaptations:
+                logger.warning(
+                    f"Adapted schema of transfer data file: {s3_uri}",
+                    extra={
+                        "event": "ADAPTED_TRANSFER_DATA_SCHEMA",
+                        "object_uri": s3_uri,
+                        "adaptations": adaptations,
+                    },
+                )
+            conformed_tables.append(conformed_table)
+        return pa.concat_tables(conformed_tables)
+
+    def read_transfers_as_dataset(
+        self,
+        s3_uris: List[str],
+        columns: Optional[List[str]] = None,
+        schema: Optional[pa.Schema] = None,
+    ) -> pa.Table:
+        return self._data_manager.read_dataset(s3_uris, columns=columns, schema=schema)
 
     def write_table(
         self, table: pa.Table, s3_uri: str, output_metadata: Dict[str, Union[str, int, float]]
     ):
-        self._s3_manager.write_table_to_csv(
+        self._data_manager.write_table_to_csv(
             object_uri=s3_uri, table=table, metadata=output_metadata
         )
+
+    def write_parquet(
+        self,
+        table: pa.Table,
+        s3_uri: str,
+        output_metadata: Dict[str, str],
+        row_group_size: Optional[int] = None,
+    ):
+        self._data_manager.write_table(
+            table=table,
+            object_uris={OutputFormat.PARQUET: s3_uri},
+            metadata=output_metadata,
+            parquet_row_group_size=row_group_size,
+        )
+
+    def write_table_in_formats(
+        self,
+        table: pa.Table,
+        s3_uris: Dict[OutputFormat, str],
+        output_metadata: Dict[str, str],
+    ):
+        self._data_manager.write_table(table=table, object_uris=s3_uris, metadata=output_metadata)
+
+    def write_partitioned_table(
+        self,
+        partitions: List[OutputPartition],
+        partition_column: str,
+        manifest_uri: str,
+        output_metadata: Dict[str, str],
+        max_workers: int,
+    ):
+        _check_partition_uris_are_unique(partitions)
+        # the manifest is written last, so it never lists a partition that failed to upload
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            _wait_for_all(
+                [
+                    executor.submit(
+                        self._data_manager.write_table,
+                        table=partition.table,
+                        object_uris=partition.s3_uris,
+                        metadata=output_metadata,
+                    )
+                    for partition in partitions
+                ]
+            )
+        manifest = {
+            "partition-column": partition_column,
+            "total-rows": sum(partition.table.num_rows for partition in partitions),
+            "partitions": [
+                {
+                    "value": _manifest_value(partition.value),
+                    "rows": partition.table.num_rows,
+                    "objects": {
+                        output_format.value: s3_uri
+                        for output_format, s3_uri in partition.s3_uris.items()
+                    },
+                }
+                for partition in partitions
+            ],
+        }
+        self._data_manager.write_json(
+            object_uri=manifest_uri, data=manifest, metadata=output_metadata
+        )
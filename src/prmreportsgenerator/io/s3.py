@@ -1,15 +1,46 @@
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from io import BytesIO
-from typing import Dict
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import pyarrow as pa
-import pyarrow.csv as csv
 import pyarrow.parquet as pq
+from pyarrow.fs import S3FileSystem
+
+from prmreportsgenerator.config import DEFAULT_S3_READ_PART_THREADS
+from prmreportsgenerator.io.adaptive_concurrency import (
+    AdaptiveConcurrencyLimit,
+    AdaptiveRetryingRequests,
+)
+from prmreportsgenerator.io.data_manager import DataManager, ListedObject, ParquetFooter
+from prmreportsgenerator.io.hedged_requests import HedgedRequests
+from prmreportsgenerator.io.output_encoder import write_outputs
+from prmreportsgenerator.io.parquet_dataset import read_parquet_dataset
+from prmreportsgenerator.io.parquet_footer import (
+    FOOTER_READ_SIZE_BYTES,
+    FetchedRanges,
+    coalesce_ranges,
+    column_chunk_ranges,
+    footer_size,
+    parse_footer,
+)
+from prmreportsgenerator.metrics.pipeline_metrics import MetricUnit, PipelineMetrics
+from prmreportsgenerator.output_format import (
+    OUTPUT_CONTENT_ENCODINGS,
+    OUTPUT_CONTENT_TYPES,
+    OutputFormat,
+)
 
 logger = logging.getLogger(__name__)
 
+# S3 rejects multipart uploads with parts smaller than this, other than the last part
+MINIMUM_UPLOAD_PART_SIZE_BYTES = 5 * 1024 * 1024
+DEFAULT_UPLOAD_PART_SIZE_BYTES = 8 * 1024 * 1024
+# column chunks closer than this are fetched in one request, as a request costs more than the gap
+COLUMN_CHUNK_COALESCE_GAP_BYTES = 64 * 1024
+
 
 def _serialize_datetime(obj):
     if isinstance(obj, datetime):
@@ -17,45 +48,384 @@ def _serialize_datetime(obj):
     raise TypeError(f"Type {type(obj)} is not JSON serializable")
 
 
-class S3DataManager:
-    def __init__(self, client):
+class S3ObjectWriter:
+    # A writable file-like object that uploads everything written to it as one S3 object.
+    # Objects that fit in a single part are uploaded with one put when closed, larger objects
+    # are uploaded part by part as they are written so only one part is held in memory.
+    def __init__(
+        self,
+        s3_object,
+        part_size_bytes: int,
+        content_type: str,
+        metadata: Dict[str, str],
+        content_encoding: Optional[str] = None,
+    ):
+        self._s3_object = s3_object
+        self._part_size_bytes = part_size_bytes
+        self._object_args = {"ContentType": content_type, "Metadata": metadata}
+        if content_encoding:
+            self._object_args["ContentEncoding"] = content_encoding
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._multipart_upload: Any = None
+        self._uploaded_parts: List[Dict] = []
+        self._completed = False
+        self.closed = False
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._buffer.append(data)
+        self._buffered_bytes += len(data)
+        self.bytes_written += len(data)
+        if self._buffered_bytes >= self._part_size_bytes:
+            self._upload_part()
+        return len(data)
+
+    def _take_buffer(self) -> bytes:
+        body = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+        return body
+
+    def _upload_part(self):
+        if self._multipart_upload is None:
+            self._multipart_upload = self._s3_object.initiate_multipart_upload(**self._object_args)
+        part_number = len(self._uploaded_parts) + 1
+        response = self._multipart_upload.Part(part_number).upload(Body=self._take_buffer())
+        self._uploaded_parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._multipart_upload is None:
+            self._s3_object.put(Body=self._take_buffer(), **self._object_args)
+        else:
+            if self._buffered_bytes:
+                self._upload_part()
+            self._multipart_upload.complete(MultipartUpload={"Parts": self._uploaded_parts})
+        self._completed = True
+
+    def abort(self):
+        self.closed = True
+        if self._multipart_upload is not None and not self._completed:
+            self._multipart_upload.abort()
+
+
+class S3DataManager(DataManager):
+    def __init__(
+        self,
+        client,
+        metrics: Optional[PipelineMetrics] = None,
+        upload_part_size_bytes: int = DEFAULT_UPLOAD_PART_SIZE_BYTES,
+        csv_encoding_threads: int = 1,
+        read_client=None,
+        read_requests: Optional[AdaptiveRetryingRequests] = None,
+        hedged_requests: Optional[HedgedRequests] = None,
+        read_part_size_bytes: Optional[int] = None,
+        read_part_threads: int = DEFAULT_S3_READ_PART_THREADS,
+    ):
+        if upload_part_size_bytes < MINIMUM_UPLOAD_PART_SIZE_BYTES:
+            raise ValueError(
+                f"Upload part size must be at least {MINIMUM_UPLOAD_PART_SIZE_BYTES} bytes"
+            )
         self._client = client
+        self._metrics = metrics if metrics is not None else PipelineMetrics()
+        # reads go through a client without botocore retries, so throttling reaches read_requests
+        self._read_client = read_client if read_client is not None else client
+        self._read_requests = (
+            read_requests
+            if read_requests is not None
+            else AdaptiveRetryingRequests(AdaptiveConcurrencyLimit(max_limit=1), metrics=metrics)
+        )
+        self._hedged_requests = hedged_requests
+        self._read_part_size_bytes = read_part_size_bytes
+        self._read_part_threads = read_part_threads
+        # parts of one object are limited separately from the objects read at the same time
+        self._read_part_requests = AdaptiveRetryingRequests(
+            AdaptiveConcurrencyLimit(max_limit=read_part_threads), metrics=metrics
+        )
+        self._upload_part_size_bytes = upload_part_size_bytes
+        self._csv_encoding_threads = csv_encoding_threads
+        # footers fetched ahead of a read, so the read does not parse them again
+        self._parquet_footers: Dict[str, ParquetFooter] = {}
+        # sizes seen in listings and HEAD requests, so hedged reads know an object's size class
+        self._object_sizes: Dict[str, int] = {}
 
-    def _object_from_uri(self, uri: str):
+    def _object_from_uri(self, uri: str, client=None):
         object_url = urlparse(uri)
         s3_bucket = object_url.netloc
         s3_key = object_url.path.lstrip("/")
-        return self._client.Object(s3_bucket, s3_key)
+        return (client or self._client).Object(s3_bucket, s3_key)
+
+    def _read_object_kwargs(self, uri: str) -> Dict[str, str]:
+        object_url = urlparse(uri)
+        return {"Bucket": object_url.netloc, "Key": object_url.path.lstrip("/")}
 
-    def read_parquet(self, object_uri: str) -> pa.Table:
+    def read_parquet(self, object_uri: str, columns: Optional[List[str]] = None) -> pa.Table:
         logger.info(
             "Reading file from: " + object_uri,
             extra={"event": "READING_FILE_FROM_S3", "object_uri": object_uri},
         )
-        s3_object = self._object_from_uri(object_uri)
+        self._metrics.increment("objects_read", 1, MetricUnit.COUNT)
+        footer = self._parquet_footers.pop(object_uri, None)
+        if columns is None:
+            source = pa.BufferReader(self._read_object(object_uri))
+        else:
+            footer = footer or self._fetch_parquet_footer(object_uri)
+            source = pa.PythonFile(self._read_column_chunks(object_uri, footer, columns), mode="r")
+        return pq.ParquetFile(source, metadata=footer.metadata if footer else None).read(
+            columns=columns
+        )
+
+    def _get_object_body(self, object_uri: str) -> bytes:
+        if self._hedged_requests is None:
+            return self._get_object(object_uri)["Body"].read()
+        return self._hedged_requests.call(
+            object_uri,
+            lambda: self._get_object(object_uri)["Body"].read(),
+            size_bytes=self._object_sizes.get(object_uri),
+        )
+
+    def _read_object(self, object_uri: str) -> Union[bytes, pa.Buffer]:
+        if self._read_part_size_bytes is not None:
+            return self._read_object_in_parts(object_uri, self._read_part_size_bytes)
+        body = self._read_requests.call(object_uri, lambda: self._get_object_body(object_uri))
+        self._metrics.increment("bytes_read", len(body), MetricUnit.BYTES)
+        return body
+
+    def _read_object_range(self, object_uri: str, start: int, end: int) -> Tuple[bytes, int]:
+        response = self._get_object(object_uri, Range=f"bytes={start}-{end - 1}")
+        body = response["Body"].read()
+        self._metrics.increment("bytes_read", len(body), MetricUnit.BYTES)
+        return body, int(response["ContentRange"].rsplit("/", 1)[1])
+
+    def _read_object_in_parts(
+        self, object_uri: str, part_size_bytes: int
+    ) -> Union[bytes, pa.Buffer]:
+        # the first part's response gives the object's size, so a small object takes one request
+        first_part, size_bytes = self._read_requests.call(
+            object_uri, lambda: self._read_object_range(object_uri, 0, part_size_bytes)
+        )
+        if len(first_part) >= size_bytes:
+            return first_part
+        buffer = pa.allocate_buffer(size_bytes)
+        memoryview(buffer).cast("B")[: len(first_part)] = first_part
+        part_ranges = [
+            (start, min(start + part_size_bytes, size_bytes))
+            for start in range(len(first_part), size_bytes, part_size_bytes)
+        ]
+        self._read_ranges_into(object_uri, buffer, part_ranges)
+        return buffer
+
+    def _read_ranges(self, object_uri: str, ranges: List[Tuple[int, int]]) -> List[bytes]:
+        def read_range(byte_range: Tuple[int, int]) -> bytes:
+            start, end = byte_range
+            body, _ = self._read_part_requests.call(
+                object_uri, lambda: self._read_object_range(object_uri, start, end)
+            )
+            return body
+
+        with ThreadPoolExecutor(max_workers=self._read_part_threads) as executor:
+            return list(executor.map(read_range, ranges))
+
+    def _read_ranges_into(self, object_uri: str, buffer: pa.Buffer, ranges: List[Tuple[int, int]]):
+        buffer_view = memoryview(buffer).cast("B")
+        for (start, end), body in zip(ranges, self._read_ranges(object_uri, ranges)):
+            buffer_view[start:end] = body
+
+    def _read_column_chunks(
+        self, object_uri: str, footer: ParquetFooter, columns: List[str]
+    ) -> FetchedRanges:
+        # only the columns' chunks are downloaded and held, not a buffer the size of the file
+        ranges = coalesce_ranges(
+            column_chunk_ranges(footer.metadata, columns), COLUMN_CHUNK_COALESCE_GAP_BYTES
+        )
+        return FetchedRanges(footer.size_bytes, ranges, self._read_ranges(object_uri, ranges))
+
+    def _get_object(self, object_uri: str, **kwargs):
+        # reads run on many threads, so they call the low-level client, which is thread safe,
+        # rather than the shared boto3 resource, which is not
+        read_client = self._read_client.meta.client
         try:
-            response = s3_object.get()
-        except self._client.meta.client.exceptions.NoSuchKey:
+            return read_client.get_object(**self._read_object_kwargs(object_uri), **kwargs)
+        except read_client.exceptions.NoSuchKey:
             logger.error(
                 f"File not found: {object_uri}, exiting...",
                 extra={"event": "FILE_NOT_FOUND_IN_S3"},
             )
             raise FileNotFoundError(object_uri)
 
-        body = BytesIO(response["Body"].read())
-        return pq.read_table(body)
+    def read_parquet_footer(self, object_uri: str) -> ParquetFooter:
+        footer = self._fetch_parquet_footer(object_uri)
+        self._parquet_footers[object_uri] = footer
+        return footer
 
-    def write_table_to_csv(self, object_uri: str, table: pa.Table, metadata: Dict[str, str]):
+    def _fetch_parquet_footer(self, object_uri: str) -> ParquetFooter:
+        # a suffix range fetches the end of the object, which usually holds the whole footer
+        file_tail, size_bytes = self._read_requests.call(
+            object_uri, lambda: self._read_object_tail(object_uri, FOOTER_READ_SIZE_BYTES)
+        )
+        if footer_size(file_tail) > len(file_tail):
+            file_tail, _ = self._read_requests.call(
+                object_uri, lambda: self._read_object_tail(object_uri, footer_size(file_tail))
+            )
+        return ParquetFooter(metadata=parse_footer(file_tail), size_bytes=size_bytes)
+
+    def _read_object_tail(self, object_uri: str, tail_bytes: int) -> Tuple[bytes, int]:
+        response = self._get_object(object_uri, Range=f"bytes=-{tail_bytes}")
+        return response["Body"].read(), int(response["ContentRange"].rsplit("/", 1)[1])
+
+    def _arrow_filesystem(self) -> S3FileSystem:
+        client_meta = self._client.meta.client.meta
+        return S3FileSystem(
+            region=client_meta.region_name, endpoint_override=client_meta.endpoint_url
+        )
+
+    def read_dataset(
+        self,
+        object_uris: List[str],
+        columns: Optional[List[str]] = None,
+        schema: Optional[pa.Schema] = None,
+    ) -> pa.Table:
+        logger.info(
+            f"Reading {len(object_uris)} files as a dataset",
+            extra={"event": "READING_DATASET_FROM_S3", "object_uris": object_uris},
+        )
+        paths = [object_url.netloc + object_url.path for object_url in map(urlparse, object_uris)]
+        try:
+            table = read_parquet_dataset(paths, self._arrow_filesystem(), columns, schema)
+        except FileNotFoundError as error:
+            logger.error(
+                f"File not found: {error}, exiting...",
+                extra={"event": "FILE_NOT_FOUND_IN_S3"},
+            )
+            raise
+        self._metrics.increment("objects_read", len(object_uris), MetricUnit.COUNT)
+        return table
+
+    def object_size(self, object_uri: str) -> Optional[int]:
+        size_bytes = self._read_requests.call(
+            object_uri, lambda: self._head_object_size(object_uri)
+        )
+        if size_bytes is not None:
+            self._object_sizes[object_uri] = size_bytes
+        return size_bytes
+
+    def _list_objects(self, bucket: str, prefix: str) -> List[ListedObject]:
+        paginator = self._read_client.meta.client.get_paginator("list_objects_v2")
+        return [
+            ListedObject(
+                uri=f"s3://{bucket}/{item['Key']}",
+                size_bytes=item["Size"],
+                etag=item["ETag"].strip('"'),
+            )
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+            for item in page.get("Contents", [])
+        ]
+
+    def list_objects(self, prefix_uri: str) -> List[ListedObject]:
+        prefix_url = urlparse(prefix_uri)
+        bucket, prefix = prefix_url.netloc, prefix_url.path.lstrip("/")
+        listed_objects = self._read_requests.call(
+            prefix_uri, lambda: self._list_objects(bucket, prefix)
+        )
+        self._object_sizes.update(
+            (listed_object.uri, listed_object.size_bytes) for listed_object in listed_objects
+        )
+        return listed_objects
+
+    def _head_object_size(self, object_uri: str) -> Optional[int]:
+        read_client = self._read_client.meta.client
+        try:
+            response = read_client.head_object(**self._read_object_kwargs(object_uri))
+        except read_client.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] == "404":
+                return None
+            raise
+        return response["ContentLength"]
+
+    def close(self):
+        if self._hedged_requests is not None:
+            self._hedged_requests.close()
+
+    def _create_writer(
+        self, object_uri: str, output_format: OutputFormat, metadata: Dict[str, str]
+    ) -> S3ObjectWriter:
+        return S3ObjectWriter(
+            self._object_from_uri(object_uri),
+            part_size_bytes=self._upload_part_size_bytes,
+            content_type=OUTPUT_CONTENT_TYPES[output_format],
+            content_encoding=OUTPUT_CONTENT_ENCODINGS.get(output_format),
+            metadata=metadata,
+        )
+
+    def write_table(
+        self,
+        table: pa.Table,
+        object_uris: Dict[OutputFormat, str],
+        metadata: Dict[str, str],
+        parquet_row_group_size: Optional[int] = None,
+    ):
+        writers = {
+            output_format: self._create_writer(object_uri, output_format, metadata)
+            for output_format, object_uri in object_uris.items()
+        }
+        for output_format, object_uri in object_uris.items():
+            logger.info(
+                "Attempting to upload: " + object_uri,
+                extra={
+                    "event": f"ATTEMPTING_UPLOAD_{output_format.value}_TO_S3",
+                    "object_uri": object_uri,
+                },
+            )
+        try:
+            write_outputs(
+                table,
+                sinks=writers,  # type: ignore
+                chunk_size_bytes=self._upload_part_size_bytes,
+                csv_encoding_threads=self._csv_encoding_threads,
+                parquet_row_group_size=parquet_row_group_size,
+            )
+        except Exception:
+            for writer in writers.values():
+                writer.abort()
+            raise
+        self._record_uploads(writers, object_uris)
+
+    def _record_uploads(
+        self, writers: Dict[OutputFormat, S3ObjectWriter], object_uris: Dict[OutputFormat, str]
+    ):
+        for output_format, object_uri in object_uris.items():
+            self._metrics.increment(
+                "output_bytes", writers[output_format].bytes_written, MetricUnit.BYTES
+            )
+            logger.info(
+                "Successfully uploaded to: " + object_uri,
+                extra={
+                    "event": f"SUCCESSFULLY_UPLOADED_{output_format.value}_TO_S3",
+                    "object_uri": object_uri,
+                },
+            )
+
+    def write_json(self, object_uri: str, data: Dict[str, Any], metadata: Dict[str, str]):
         logger.info(
             "Attempting to upload: " + object_uri,
-            extra={"event": "ATTEMPTING_UPLOAD_CSV_TO_S3", "object_uri": object_uri},
+            extra={"event": "ATTEMPTING_UPLOAD_JSON_TO_S3", "object_uri": object_uri},
+        )
+        body = json.dumps(data, default=_serialize_datetime).encode()
+        self._object_from_uri(object_uri).put(
+            Body=body, ContentType="application/json", Metadata=metadata
         )
-        s3_object = self._object_from_uri(object_uri)
-        csv_buffer = BytesIO()
-        csv.write_csv(table, csv_buffer)
-        csv_buffer.seek(0)
-        s3_object.put(Body=csv_buffer.getvalue(), ContentType="text/csv", Metadata=metadata)
+        self._metrics.increment("output_bytes", len(body), MetricUnit.BYTES)
         logger.info(
             "Successfully uploaded to: " + object_uri,
-            extra={"event": "SUCCESSFULLY_UPLOADED_CSV_TO_S3", "object_uri": object_uri},
+            extra={"event": "SUCCESSFULLY_UPLOADED_JSON_TO_S3", "object_uri": object_uri},
         )
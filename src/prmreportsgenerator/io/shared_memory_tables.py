@@ -0,0 +1,127 @@
+import errno
+import logging
+import os
+import shutil
+import socket
+import uuid
+from tempfile import TemporaryDirectory, gettempdir
+from typing import Optional
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+_SEGMENTS_PREFIX = "shared-tables-"
+
+
+def _default_directory() -> str:
+    # /dev/shm is memory backed on Linux, elsewhere tables are memory mapped from temp files
+    if os.path.isdir(SHARED_MEMORY_DIRECTORY) and os.access(SHARED_MEMORY_DIRECTORY, os.W_OK):
+        return SHARED_MEMORY_DIRECTORY
+    return gettempdir()
+
+
+def _segments_prefix() -> str:
+    # the host name as well as the pid, as /dev/shm can be shared by containers whose pids overlap
+    return f"{_SEGMENTS_PREFIX}{socket.gethostname()}-"
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_segments(directory: str):
+    # segments of a process on this host killed before it could remove them, named after its pid
+    prefix = _segments_prefix()
+    for name in os.listdir(directory):
+        if not name.startswith(prefix):
+            continue
+        pid = name.replace(prefix, "", 1).split("-")[0]
+        if pid.isdigit() and not _is_running(int(pid)):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def _write_table_file(table: pa.Table, directory: str) -> str:
+    # written under a temporary name, so a reader never maps a partly written table
+    path = os.path.join(directory, f"{uuid.uuid4().hex}.arrow")
+    try:
+        with pa.OSFile(path + ".tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    except OSError:
+        if os.path.exists(path + ".tmp"):
+            os.remove(path + ".tmp")
+        raise
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def write_shared_table(
+    table: pa.Table, directory: str, fallback_directory: Optional[str] = None
+) -> str:
+    # containers often limit /dev/shm to 64MB, so a table too large for it goes to the fallback
+    try:
+        return _write_table_file(table, directory)
+    except OSError as error:
+        if error.errno != errno.ENOSPC or fallback_directory is None:
+            raise
+    logger.warning(
+        f"No space left in {directory}, writing shared table to {fallback_directory}",
+        extra={
+            "event": "SHARED_TABLE_DIRECTORY_FULL",
+            "directory": directory,
+            "fallback-directory": fallback_directory,
+            "table-bytes": table.nbytes,
+        },
+    )
+    return _write_table_file(table, fallback_directory)
+
+
+def read_shared_table(path: str) -> pa.Table:
+    # the mapping keeps the file's pages after it is removed, until the table is freed
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    os.remove(path)
+    return table
+
+
+class SharedTableSegments:
+    # The directory worker processes write tables to for the parent to map, with a fallback in the
+    # temp directory for when it is full. Both are removed on exit whether or not the workers
+    # succeeded, and by the next run on this host if this process is killed.
+    def __init__(self, directory: Optional[str] = None):
+        parent_directories = [directory or _default_directory(), gettempdir()]
+        if os.path.realpath(parent_directories[0]) == os.path.realpath(parent_directories[1]):
+            parent_directories.pop()
+        self._directories = []
+        for parent_directory in parent_directories:
+            remove_stale_segments(parent_directory)
+            self._directories.append(
+                TemporaryDirectory(
+                    prefix=f"{_segments_prefix()}{os.getpid()}-", dir=parent_directory
+                )
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def directory(self) -> str:
+        return self._directories[0].name
+
+    @property
+    def fallback_directory(self) -> Optional[str]:
+        return self._directories[1].name if len(self._directories) > 1 else None
+
+    def close(self):
+        for directory in self._directories:
+            directory.cleanup()
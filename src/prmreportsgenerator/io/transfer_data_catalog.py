@@ -0,0 +1,46 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from prmreportsgenerator.io.data_manager import DataManager, ListedObject
+
+logger = logging.getLogger(__name__)
+
+
+class TransferDataCatalog:
+    # One listing of each month's prefix stands in for a HEAD request per file. Listings are kept
+    # for the rest of the run unless refreshed, e.g. while waiting for late files.
+    def __init__(self, data_manager: DataManager, listing_prefix: Callable[[str], str]):
+        self._data_manager = data_manager
+        self._listing_prefix = listing_prefix
+        self._listings: Dict[str, Dict[str, ListedObject]] = {}
+        self._lock = Lock()
+
+    def _list(self, prefix_uri: str) -> Dict[str, ListedObject]:
+        listed_objects = self._data_manager.list_objects(prefix_uri)
+        logger.info(
+            f"Listed {len(listed_objects)} objects under {prefix_uri}",
+            extra={
+                "event": "LISTED_TRANSFER_DATA",
+                "prefix_uri": prefix_uri,
+                "objects": len(listed_objects),
+                "total-bytes": sum(listed_object.size_bytes for listed_object in listed_objects),
+            },
+        )
+        return {listed_object.uri: listed_object for listed_object in listed_objects}
+
+    def _prefixes_to_list(self, s3_uris: List[str], refresh: bool) -> List[str]:
+        prefixes = dict.fromkeys(self._listing_prefix(s3_uri) for s3_uri in s3_uris)
+        with self._lock:
+            return [prefix for prefix in prefixes if refresh or prefix not in self._listings]
+
+    def listed_objects(
+        self, s3_uris: List[str], max_workers: int, refresh: bool = False
+    ) -> List[Optional[ListedObject]]:
+        prefixes = self._prefixes_to_list(s3_uris, refresh)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            listings = dict(zip(prefixes, executor.map(self._list, prefixes)))
+        with self._lock:
+            self._listings.update(listings)
+            return [self._listings[self._listing_prefix(s3_uri)].get(s3_uri) for s3_uri in s3_uris]
@@ -1,31 +1,62 @@
 import logging
 import sys
+from dataclasses import replace
+from logging.handlers import QueueHandler, QueueListener
 from os import environ
+from typing import Tuple
 
 from prmreportsgenerator.config import PipelineConfig
 from prmreportsgenerator.io.json_formatter import JsonFormatter
-from prmreportsgenerator.reports_pipeline import ReportsPipeline
+from prmreportsgenerator.io.queue_log_handler import start_queue_logging
 
 logger = logging.getLogger("prmreportsgenerator")
 
+PLAN_ARGUMENT = "--plan"
 
-def _setup_logger():
+
+def _setup_logger() -> Tuple[QueueHandler, QueueListener]:
     logger.setLevel(logging.INFO)
     formatter = JsonFormatter()
     handler = logging.StreamHandler()
     handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    queue_handler, listener = start_queue_logging(handler)
+    logger.addHandler(queue_handler)
+    return queue_handler, listener
+
+
+def _teardown_logger(queue_handler: QueueHandler, listener: QueueListener):
+    logger.removeHandler(queue_handler)
+    listener.stop()
+
+
+def _run_pipeline(config: PipelineConfig):
+    # the pipeline imports pyarrow and boto3, so it is only imported once config is valid,
+    # and thread pools are sized before polars is first imported
+    from prmreportsgenerator.resources import apply_resource_limits
+
+    config = apply_resource_limits(config)
+    from prmreportsgenerator.reports_pipeline import ReportsPipeline
+
+    pipeline = ReportsPipeline(config)
+    if config.dry_run:
+        pipeline.plan()
+    else:
+        pipeline.run()
 
 
 def main():
     config = {}
+    queue_handler, listener = _setup_logger()
     try:
-        _setup_logger()
         config = PipelineConfig.from_environment_variables(environ)
-        ReportsPipeline(config).run()
+        if PLAN_ARGUMENT in sys.argv[1:]:
+            config = replace(config, dry_run=True)
+        _run_pipeline(config)
     except Exception as ex:
         logger.error(str(ex), extra={"event": "FAILED_TO_RUN_MAIN", "config": config.__str__()})
         sys.exit("Failed to run main, exiting...")
+    finally:
+        _teardown_logger(queue_handler, listener)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from tempfile import NamedTemporaryFile
+from typing import Dict, List, Optional
+
+from prmreportsgenerator.metrics.pipeline_metrics import Metric
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownMetricsExporter(Exception):
+    pass
+
+
+class MetricsExporter(ABC):
+    @abstractmethod
+    def export(self, metrics: List[Metric], dimensions: Dict[str, str]):
+        pass
+
+
+class CloudWatchEmfExporter(MetricsExporter):
+    # CloudWatch Logs extracts metrics from log lines in Embedded Metric Format
+    def __init__(self, namespace: str, clock=time.time):
+        self._namespace = namespace
+        self._clock = clock
+
+    def export(self, metrics: List[Metric], dimensions: Dict[str, str]):
+        logger.info(
+            "Pipeline metrics",
+            extra={
+                "event": "PIPELINE_METRICS",
+                "_aws": {
+                    "Timestamp": int(self._clock() * 1000),
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": self._namespace,
+                            "Dimensions": [list(dimensions.keys())],
+                            "Metrics": [
+                                {"Name": metric.name, "Unit": metric.unit.value}
+                                for metric in metrics
+                            ],
+                        }
+                    ],
+                },
+                **dimensions,
+                **{metric.name: metric.value for metric in metrics},
+            },
+        )
+
+
+class PrometheusTextfileExporter(MetricsExporter):
+    # For the node exporter textfile collector, which must never see a partially written file
+    def __init__(self, path: str, prefix: str = "prmreportsgenerator"):
+        self._path = path
+        self._prefix = prefix
+
+    @staticmethod
+    def _sanitise(name: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        # label values in the exposition format escape backslashes, double quotes and newlines
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def _labels(self, dimensions: Dict[str, str]) -> str:
+        labels = ",".join(
+            f'{self._sanitise(key)}="{self._escape(str(value))}"'
+            for key, value in sorted(dimensions.items())
+        )
+        return f"{{{labels}}}" if labels else ""
+
+    def _render(self, metrics: List[Metric], dimensions: Dict[str, str]) -> str:
+        labels = self._labels(dimensions)
+        lines = []
+        for metric in sorted(metrics, key=lambda m: m.name):
+            metric_name = f"{self._prefix}_{self._sanitise(metric.name)}"
+            lines.append(f"# TYPE {metric_name} gauge")
+            lines.append(f"{metric_name}{labels} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, metrics: List[Metric], dimensions: Dict[str, str]):
+        directory = os.path.dirname(os.path.abspath(self._path))
+        with NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as temp_file:
+            temp_file.write(self._render(metrics, dimensions))
+        os.replace(temp_file.name, self._path)
+        logger.info(
+            "Wrote Prometheus metrics textfile: " + self._path,
+            extra={"event": "WROTE_PROMETHEUS_METRICS_TEXTFILE", "path": self._path},
+        )
+
+
+def _create_metrics_exporter(
+    exporter_name: str, namespace: str, prometheus_textfile_path: Optional[str]
+) -> MetricsExporter:
+    if exporter_name == "cloudwatch":
+        return CloudWatchEmfExporter(namespace=namespace)
+    if exporter_name == "prometheus":
+        if prometheus_textfile_path is None:
+            raise ValueError("PROMETHEUS_TEXTFILE_PATH must be set to use prometheus exporter")
+        return PrometheusTextfileExporter(path=prometheus_textfile_path)
+    raise UnknownMetricsExporter(f"Unknown metrics exporter: {exporter_name}")
+
+
+def create_metrics_exporters(
+    exporter_names: Optional[str], namespace: str, prometheus_textfile_path: Optional[str]
+) -> List[MetricsExporter]:
+    if not exporter_names:
+        return []
+    return [
+        _create_metrics_exporter(name.strip().lower(), namespace, prometheus_textfile_path)
+        for name in exporter_names.split(",")
+    ]
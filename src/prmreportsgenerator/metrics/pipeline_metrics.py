@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from threading import Lock
+from typing import Dict, Iterator, List
+
+
+class MetricUnit(Enum):
+    SECONDS = "Seconds"
+    BYTES = "Bytes"
+    COUNT = "Count"
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    value: float
+    unit: MetricUnit
+
+
+class PipelineMetrics:
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = Lock()
+
+    def record(self, name: str, value: float, unit: MetricUnit):
+        with self._lock:
+            self._metrics[name] = Metric(name=name, value=value, unit=unit)
+
+    def increment(self, name: str, value: float, unit: MetricUnit):
+        with self._lock:
+            current = self._metrics.get(name)
+            total = current.value + value if current else value
+            self._metrics[name] = Metric(name=name, value=total, unit=unit)
+
+    @contextmanager
+    def time_phase(self, phase: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(f"{phase}_duration_seconds", self._clock() - start, MetricUnit.SECONDS)
+
+    def metrics(self) -> List[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
@@ -0,0 +1,49 @@
+import logging
+import time
+from enum import Enum
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MISSING_TRANSFER_DATA_WAIT_SECONDS = 60 * 60
+DEFAULT_MISSING_TRANSFER_DATA_POLL_SECONDS = 5 * 60
+
+
+class MissingTransferDataPolicy(Enum):
+    FAIL = "FAIL"
+    SKIP = "SKIP"
+    WAIT = "WAIT"
+
+
+class MissingTransferDataError(FileNotFoundError):
+    def __init__(self, missing_s3_uris: List[str]):
+        super().__init__(
+            f"{len(missing_s3_uris)} transfer data files not found: " + ", ".join(missing_s3_uris)
+        )
+        self.missing_s3_uris = missing_s3_uris
+
+
+def wait_for_transfer_data(
+    missing_s3_uris: List[str],
+    find_missing: Callable[[List[str]], List[str]],
+    wait_seconds: float,
+    poll_seconds: float,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> List[str]:
+    # only the files still missing are checked again, and whatever is missing at the deadline
+    # is returned for the caller to fail on
+    deadline = clock() + wait_seconds
+    while missing_s3_uris and clock() < deadline:
+        logger.info(
+            f"Waiting for {len(missing_s3_uris)} transfer data files",
+            extra={
+                "event": "WAITING_FOR_TRANSFER_DATA",
+                "missing-transfer-data-s3-uris": missing_s3_uris,
+                "seconds-remaining": deadline - clock(),
+            },
+        )
+        # the deadline can pass between the check above and here
+        sleep(max(0.0, min(poll_seconds, deadline - clock())))
+        missing_s3_uris = find_missing(missing_s3_uris)
+    return missing_s3_uris
@@ -0,0 +1,28 @@
+from enum import Enum
+
+
+class OutputFormat(Enum):
+    CSV = "CSV"
+    CSV_GZIP = "CSV_GZIP"
+    CSV_ZSTD = "CSV_ZSTD"
+    PARQUET = "PARQUET"
+
+
+OUTPUT_FILE_EXTENSIONS = {
+    OutputFormat.CSV: ".csv",
+    OutputFormat.CSV_GZIP: ".csv.gz",
+    OutputFormat.CSV_ZSTD: ".csv.zst",
+    OutputFormat.PARQUET: ".parquet",
+}
+
+OUTPUT_CONTENT_TYPES = {
+    OutputFormat.CSV: "text/csv",
+    OutputFormat.CSV_GZIP: "text/csv",
+    OutputFormat.CSV_ZSTD: "text/csv",
+    OutputFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+OUTPUT_CONTENT_ENCODINGS = {
+    OutputFormat.CSV_GZIP: "gzip",
+    OutputFormat.CSV_ZSTD: "zstd",
+}
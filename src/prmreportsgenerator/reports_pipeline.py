@@ -1,7 +1,12 @@
 import logging
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import boto3
 import pyarrow as pa
 
 from prmreportsgenerator.config import PipelineConfig
@@ -13,35 +18,96 @@ from prmreportsgenerator.domain.reporting_windows.monthly_reporting_window impor
     MonthlyReportingWindow,
 )
 from prmreportsgenerator.domain.reporting_windows.reporting_window import ReportingWindow
-from prmreportsgenerator.domain.reports_generator.sub_icb_location_level_integration_times import (
-    SICBLLevelIntegrationTimesReportsGenerator,
+from prmreportsgenerator.domain.reports_generator.reports_generator_registry import (
+    load_reports_generator,
 )
-from prmreportsgenerator.domain.reports_generator.transfer_details_per_hour import (
-    TransferDetailsPerHourReportsGenerator,
+from prmreportsgenerator.io.data_manager import create_data_manager
+from prmreportsgenerator.io.json_formatter import JsonFormatter
+from prmreportsgenerator.io.report_partials import (
+    InMemoryReportPartials,
+    ReportPartials,
+    SpilledReportPartials,
 )
-from prmreportsgenerator.domain.reports_generator.transfer_level_technical_failures import (
-    TransferLevelTechnicalFailuresReportsGenerator,
+from prmreportsgenerator.io.reports_io import OutputPartition, ReportsIO, ReportsS3UriResolver
+from prmreportsgenerator.io.shared_memory_tables import (
+    SharedTableSegments,
+    read_shared_table,
+    write_shared_table,
 )
-from prmreportsgenerator.domain.reports_generator.transfer_outcomes_per_supplier_pathway import (
-    TransferOutcomesPerSupplierPathwayReportsGenerator,
+from prmreportsgenerator.io.transfer_data_catalog import TransferDataCatalog
+from prmreportsgenerator.metrics.exporters import create_metrics_exporters
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit, PipelineMetrics
+from prmreportsgenerator.missing_transfer_data import (
+    MissingTransferDataError,
+    MissingTransferDataPolicy,
+    wait_for_transfer_data,
+)
+from prmreportsgenerator.output_format import OutputFormat
+from prmreportsgenerator.resources import apply_resource_limits, worker_resource_limits
+from prmreportsgenerator.run_plan import (
+    ExecutionStrategy,
+    RunPlan,
+    choose_execution_strategy,
+    estimate_peak_memory_bytes,
+    memory_budget_bytes,
 )
-from prmreportsgenerator.io.reports_io import ReportsIO, ReportsS3UriResolver
-from prmreportsgenerator.io.s3 import S3DataManager
-from prmreportsgenerator.report_name import ReportName
 from prmreportsgenerator.utils.date_helpers import convert_to_datetime_string
+from prmreportsgenerator.utils.partition_table import partition_table
 
 logger = logging.getLogger(__name__)
 
+OBJECT_SIZE_THREADS = 16
+
+
+@dataclass(frozen=True)
+class ShardAggregate:
+    # the aggregate is passed back through shared memory rather than pickled
+    aggregate_path: str
+    total_transfers: int
+    total_technical_failures: int
+    metrics: List[Metric]
+
 
 class ReportsPipeline:
     def __init__(self, config: PipelineConfig):
-        s3 = boto3.resource("s3", endpoint_url=config.s3_endpoint_url)
-        s3_manager = S3DataManager(s3)
+        self._config = config
+        self._metrics = PipelineMetrics()
+        data_manager = create_data_manager(
+            local_data_directory=config.local_data_directory,
+            s3_endpoint_url=config.s3_endpoint_url,
+            metrics=self._metrics,
+            s3_upload_part_size_bytes=config.s3_upload_part_size_bytes,
+            csv_encoding_threads=config.csv_encoding_threads,
+            s3_read_concurrency=config.transfer_read_concurrency or 1,
+            s3_read_max_attempts=config.s3_read_max_attempts,
+            s3_read_hedge_percentile=config.s3_read_hedge_percentile
+            if config.hedge_s3_reads
+            else None,
+            s3_read_part_size_bytes=config.s3_read_part_size_bytes,
+            s3_read_part_threads=config.s3_read_part_threads,
+        )
 
         self._reporting_window = self.create_reporting_window(config)
         self._cutoff_days = config.cutoff_days
         self._report_name = config.report_name
         self._alert_enabled = config.alert_enabled
+        self._metrics_only = config.metrics_only
+        self._transfer_read_concurrency = config.transfer_read_concurrency or 1
+        self._output_formats = config.output_formats
+        self._read_compacted_transfer_data = config.read_compacted_transfer_data
+        self._read_transfers_as_dataset = config.read_transfers_as_dataset
+        self._validate_transfer_data = config.validate_transfer_data
+        self._transfer_footer_read_threads = config.transfer_footer_read_threads
+        self._output_partition_column = config.output_partition_column
+        self._output_partition_upload_threads = config.output_partition_upload_threads
+        self._memory_budget_bytes = memory_budget_bytes(config.memory_budget_bytes)
+        self._spill_directory = config.spill_directory
+        self._deduplicate_conversations = config.deduplicate_conversations
+        self._aggregation_processes = config.aggregation_processes
+        self._shared_tables_directory = config.shared_tables_directory
+        self._missing_transfer_data_policy = config.missing_transfer_data_policy
+        self._missing_transfer_data_wait_seconds = config.missing_transfer_data_wait_seconds
+        self._missing_transfer_data_poll_seconds = config.missing_transfer_data_poll_seconds
 
         self._uri_resolver = ReportsS3UriResolver(
             transfer_data_bucket=config.input_transfer_data_bucket,
@@ -51,7 +117,26 @@ class ReportsPipeline:
         self._date_range_info_json = self._construct_date_range_info_json(config)
         self._additional_metadata = self._construct_additional_metadata(config)
 
-        self._io = ReportsIO(s3_data_manager=s3_manager)
+        self._data_manager = data_manager
+        self._io = ReportsIO(
+            data_manager=data_manager,
+            catalog=TransferDataCatalog(
+                data_manager, listing_prefix=self._uri_resolver.transfer_data_month_prefix
+            )
+            if config.discover_transfer_data_by_listing
+            else None,
+        )
+
+        self._metrics_exporters = create_metrics_exporters(
+            exporter_names=config.metrics_exporters,
+            namespace=config.metrics_namespace,
+            prometheus_textfile_path=config.prometheus_textfile_path,
+        )
+        self._metrics_dimensions = {
+            "report-name": config.report_name.value,
+            "reporting-window": self._reporting_window.config_string,
+            "cutoff-days": str(config.cutoff_days),
+        }
 
     @staticmethod
     def create_reporting_window(config: PipelineConfig) -> ReportingWindow:
@@ -67,20 +152,143 @@ class ReportsPipeline:
             return MonthlyReportingWindow(config.number_of_months)
         raise ValueError("Missing required config to generate reports. Please see README.")
 
-    def _read_transfer_table(self) -> pa.Table:
-        transfer_data_s3_uris = self._uri_resolver.input_transfer_data_uris(
-            reporting_window=self._reporting_window, cutoff_days=self._cutoff_days
+    def _compacted_months(self) -> List[datetime]:
+        if not self._read_compacted_transfer_data:
+            return []
+        return [
+            month
+            for month in self._uri_resolver.whole_months(self._reporting_window)
+            if self._io.object_exists(
+                self._uri_resolver.compacted_transfer_data_uri(month, self._cutoff_days)
+            )
+        ]
+
+    def _validate_transfer_files(self, transfer_data_s3_uris: List[str]):
+        with self._metrics.time_phase("validate_transfers"):
+            footers = self._io.validate_transfer_files(
+                transfer_data_s3_uris, max_workers=self._transfer_footer_read_threads
+            )
+        logger.info(
+            f"Validated schema of {len(footers)} transfer data files",
+            extra={
+                "event": "VALIDATED_TRANSFER_DATA_FILES",
+                "transfer_data_files": [
+                    {
+                        "object_uri": s3_uri,
+                        "rows": footer.metadata.num_rows,
+                        "bytes": footer.size_bytes,
+                    }
+                    for s3_uri, footer in zip(transfer_data_s3_uris, footers)
+                ],
+                "total-rows": sum(footer.metadata.num_rows for footer in footers),
+                "total-bytes": sum(footer.size_bytes for footer in footers),
+            },
+        )
+
+    def _transfer_data_s3_uris(self) -> List[str]:
+        return self._uri_resolver.input_transfer_data_uris(
+            reporting_window=self._reporting_window,
+            cutoff_days=self._cutoff_days,
+            compacted_months=self._compacted_months(),
+        )
+
+    def _object_sizes(
+        self, transfer_data_s3_uris: List[str], refresh_listing: bool = False
+    ) -> Dict[str, Optional[int]]:
+        object_sizes = self._io.object_sizes(
+            transfer_data_s3_uris, max_workers=OBJECT_SIZE_THREADS, refresh_listing=refresh_listing
+        )
+        return dict(zip(transfer_data_s3_uris, object_sizes))
+
+    def _recheck_missing_transfer_data(
+        self, object_sizes: Dict[str, Optional[int]], missing_s3_uris: List[str]
+    ) -> List[str]:
+        object_sizes.update(self._object_sizes(missing_s3_uris, refresh_listing=True))
+        return [s3_uri for s3_uri in missing_s3_uris if object_sizes[s3_uri] is None]
+
+    def _transfer_data_sizes(self, transfer_data_s3_uris: List[str]) -> Dict[str, Optional[int]]:
+        # the sizes are kept, so choosing an execution strategy needs no more requests
+        object_sizes = self._object_sizes(transfer_data_s3_uris)
+        missing_s3_uris = [s3_uri for s3_uri, size in object_sizes.items() if size is None]
+        if missing_s3_uris and self._missing_transfer_data_policy == MissingTransferDataPolicy.WAIT:
+            wait_for_transfer_data(
+                missing_s3_uris,
+                partial(self._recheck_missing_transfer_data, object_sizes),
+                wait_seconds=self._missing_transfer_data_wait_seconds,
+                poll_seconds=self._missing_transfer_data_poll_seconds,
+            )
+        return object_sizes
+
+    def _available_transfer_data_s3_uris(
+        self, transfer_data_s3_uris: List[str]
+    ) -> Tuple[List[str], List[int], List[str]]:
+        # every file is checked up front, so a missing day fails the run before any download
+        with self._metrics.time_phase("check_transfers_exist"):
+            object_sizes = self._transfer_data_sizes(transfer_data_s3_uris)
+        missing_s3_uris = [s3_uri for s3_uri, size in object_sizes.items() if size is None]
+        available_sizes = {
+            s3_uri: size for s3_uri, size in object_sizes.items() if size is not None
+        }
+        self._metrics.record("missing_transfer_data_files", len(missing_s3_uris), MetricUnit.COUNT)
+        if not missing_s3_uris:
+            return list(available_sizes), list(available_sizes.values()), []
+        skip = self._missing_transfer_data_policy == MissingTransferDataPolicy.SKIP
+        if not skip or len(missing_s3_uris) == len(transfer_data_s3_uris):
+            raise MissingTransferDataError(missing_s3_uris)
+        missing_periods = [
+            self._uri_resolver.transfer_data_period(s3_uri) for s3_uri in missing_s3_uris
+        ]
+        logger.warning(
+            f"Skipping {len(missing_s3_uris)} missing transfer data files",
+            extra={
+                "event": "SKIPPED_MISSING_TRANSFER_DATA",
+                "missing-transfer-data-s3-uris": missing_s3_uris,
+                "missing-transfer-data-days": missing_periods,
+                **self._date_range_info_json,
+            },
         )
+        return list(available_sizes), list(available_sizes.values()), missing_periods
 
+    def _read_transfer_table(
+        self,
+        transfer_data_s3_uris: List[str],
+        columns: Optional[List[str]] = None,
+        schema: Optional[pa.Schema] = None,
+    ) -> pa.Table:
+        if self._read_transfers_as_dataset:
+            return self._io.read_transfers_as_dataset(
+                transfer_data_s3_uris, columns=columns, schema=schema
+            )
+        return self._io.read_transfers_as_table(
+            transfer_data_s3_uris,
+            max_workers=self._transfer_read_concurrency,
+            columns=columns,
+            schema=schema,
+        )
+
+    def _execution_strategy(self, object_sizes: List[int]) -> ExecutionStrategy:
+        if self._memory_budget_bytes is None:
+            return ExecutionStrategy.IN_MEMORY
+        execution_strategy = choose_execution_strategy(
+            object_sizes, self._report_name, self._memory_budget_bytes
+        )
         logger.info(
-            "Attempting to read from the following transfer data S3 Uris",
+            f"Selected {execution_strategy.value} execution strategy",
             extra={
-                "event": "ATTEMPTING_TO_READ_FROM_TRANSFER_DATA_S3_URIS",
-                "transfer_data_s3_uris": transfer_data_s3_uris,
+                "event": "SELECTED_EXECUTION_STRATEGY",
+                "execution-strategy": execution_strategy.value,
+                "memory-budget-bytes": self._memory_budget_bytes,
+                "estimated-peak-memory-bytes": estimate_peak_memory_bytes(
+                    sum(object_sizes), self._report_name
+                ),
             },
         )
+        return execution_strategy
 
-        return self._io.read_transfers_as_table(transfer_data_s3_uris)
+    def _create_report_partials(self, execution_strategy: ExecutionStrategy) -> ReportPartials:
+        if execution_strategy == ExecutionStrategy.SPILL:
+            return SpilledReportPartials(directory=self._spill_directory)
+        return InMemoryReportPartials()
 
     def _log_technical_failure_percentage(self, transfers_metrics: Dict[str, str]):
         logger.info(
@@ -95,11 +303,15 @@ class ReportsPipeline:
             },
         )
 
-    def _generate_transfers_metrics(self, transfers) -> Dict[str, str]:
-        total_transfers = transfers.num_rows
-        total_technical_failures = transfers.filter(
-            pa.compute.equal(transfers["status"], "Technical failure")
-        ).num_rows
+    @staticmethod
+    def _count_technical_failures(transfers: pa.Table) -> int:
+        # sums the comparison's boolean mask rather than materialising the matching rows
+        is_technical_failure = pa.compute.equal(transfers["status"], "Technical failure")
+        return pa.compute.sum(is_technical_failure).as_py() or 0
+
+    def _generate_transfers_metrics(
+        self, total_transfers: int, total_technical_failures: int
+    ) -> Dict[str, str]:
         technical_failures_percentage = round((total_technical_failures / total_transfers) * 100, 2)
         return {
             "technical-failures-percentage": str(technical_failures_percentage),
@@ -107,17 +319,61 @@ class ReportsPipeline:
             "total-transfers": str(total_transfers),
         }
 
+    def _output_uri_args(self) -> dict:
+        return {
+            "start_date": self._reporting_window.start_datetime,
+            "end_date": self._reporting_window.end_datetime,
+            "supplement_s3_key": self._reporting_window.config_string,
+            "cutoff_days": self._cutoff_days,
+            "report_name": self._report_name,
+        }
+
+    def _output_table_uris(self) -> Dict[OutputFormat, str]:
+        return {
+            output_format: self._uri_resolver.output_table_uri(
+                **self._output_uri_args(), output_format=output_format
+            )
+            for output_format in self._output_formats
+        }
+
+    def _output_uris(self) -> List[str]:
+        if self._output_partition_column:
+            return [self._uri_resolver.output_manifest_uri(**self._output_uri_args())]
+        return list(self._output_table_uris().values())
+
+    def _write_partitioned_table(
+        self, table: pa.Table, partition_column: str, output_metadata: Dict[str, str]
+    ):
+        uri_args = self._output_uri_args()
+        partitions = [
+            OutputPartition(
+                value=value,
+                table=partition,
+                s3_uris={
+                    output_format: self._uri_resolver.output_partition_uri(
+                        **uri_args, partition_value=value, output_format=output_format
+                    )
+                    for output_format in self._output_formats
+                },
+            )
+            for value, partition in partition_table(table, partition_column)
+        ]
+        self._metrics.record("output_partitions", len(partitions), MetricUnit.COUNT)
+        self._io.write_partitioned_table(
+            partitions=partitions,
+            partition_column=partition_column,
+            manifest_uri=self._uri_resolver.output_manifest_uri(**uri_args),
+            output_metadata=output_metadata,
+            max_workers=self._output_partition_upload_threads,
+        )
+
     def _write_table(self, table: pa.Table, output_metadata: Dict[str, str]):
-        start_date = self._reporting_window.start_datetime
-        end_date = self._reporting_window.end_datetime
-        output_table_uri = self._uri_resolver.output_table_uri(
-            start_date=start_date,
-            end_date=end_date,
-            supplement_s3_key=self._reporting_window.config_string,
-            cutoff_days=self._cutoff_days,
-            report_name=self._report_name,
+        if self._output_partition_column:
+            self._write_partitioned_table(table, self._output_partition_column, output_metadata)
+            return
+        self._io.write_table_in_formats(
+            table=table, s3_uris=self._output_table_uris(), output_metadata=output_metadata
         )
-        self._io.write_table(table=table, s3_uri=output_table_uri, output_metadata=output_metadata)
 
     def _construct_date_range_info_json(self, config: PipelineConfig) -> dict:
         return {
@@ -141,25 +397,214 @@ class ReportsPipeline:
             "send-email-notification": str(config.send_email_notification),
         }
 
-    def _generate_report(self, transfers: pa.Table) -> pa.Table:
-        reports = {
-            ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY: TransferOutcomesPerSupplierPathwayReportsGenerator(
-                transfers
-            ).generate(),
-            ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES: TransferLevelTechnicalFailuresReportsGenerator(
-                transfers
-            ).generate(),
-            ReportName.SUB_ICB_LOCATION_LEVEL_INTEGRATION_TIMES: SICBLLevelIntegrationTimesReportsGenerator(
-                transfers
-            ).generate(),
-            ReportName.TRANSFER_DETAILS_BY_HOUR: TransferDetailsPerHourReportsGenerator(
-                transfers
-            ).generate(),
-        }
-        return reports.get(self._report_name)
+    def _generate_report_in_memory(
+        self, transfer_data_s3_uris: List[str]
+    ) -> Tuple[pa.Table, Dict[str, str]]:
+        with self._metrics.time_phase("read_transfers"):
+            transfers = self._read_transfer_table(transfer_data_s3_uris)
+        if self._deduplicate_conversations:
+            transfers = self._deduplicated(transfers)
+        self._metrics.record("rows_processed", transfers.num_rows, MetricUnit.COUNT)
 
-    def run(self):
-        transfers = self._read_transfer_table()
+        with self._metrics.time_phase("generate_report"):
+            reports_generator = load_reports_generator(self._report_name)
+            table = reports_generator(transfers).generate()
+        return table, self._generate_transfers_metrics(
+            transfers.num_rows, self._count_technical_failures(transfers)
+        )
+
+    def _record_duplicate_conversations(self, duplicates: int):
+        self._metrics.record("duplicate_conversations", duplicates, MetricUnit.COUNT)
+        logger.info(
+            f"Removed {duplicates} duplicate conversations",
+            extra={
+                "event": "DEDUPLICATED_CONVERSATIONS",
+                "duplicate-conversations": duplicates,
+                **self._date_range_info_json,
+            },
+        )
+
+    def _deduplicated(self, transfers: pa.Table) -> pa.Table:
+        # deduplication uses polars, so like the reports generators it is only imported when used
+        from prmreportsgenerator.domain.conversation_deduplication import deduplicate_conversations
+
+        with self._metrics.time_phase("deduplicate_conversations"):
+            transfers, duplicates = deduplicate_conversations(transfers)
+        self._record_duplicate_conversations(duplicates)
+        return transfers
+
+    def _read_transfers_file_by_file(self, transfer_data_s3_uris: List[str]) -> Iterator[pa.Table]:
+        # files are read one at a time to bound memory, each conformed to the schema unified
+        # across all of them, so every partial has the columns and types the whole window has
+        schema = self._io.transfer_data_schema(
+            transfer_data_s3_uris, max_workers=self._transfer_footer_read_threads
+        )
+        if not self._deduplicate_conversations:
+            for transfer_data_s3_uri in transfer_data_s3_uris:
+                yield self._read_transfer_table([transfer_data_s3_uri], schema=schema)
+            return
+
+        from prmreportsgenerator.domain.conversation_deduplication import (
+            StreamingConversationDeduplicator,
+        )
+
+        # a conversation's row from the newest file is kept, so files are read newest first
+        deduplicator = StreamingConversationDeduplicator()
+        for transfer_data_s3_uri in reversed(transfer_data_s3_uris):
+            yield deduplicator.deduplicate(
+                self._read_transfer_table([transfer_data_s3_uri], schema=schema)
+            )
+        self._record_duplicate_conversations(deduplicator.duplicates)
+
+    def _generate_report_from_partials(
+        self, transfer_data_s3_uris: List[str], partials: ReportPartials
+    ) -> Tuple[pa.Table, Dict[str, str]]:
+        reports_generator = load_reports_generator(self._report_name)
+        total_transfers = total_technical_failures = 0
+        with self._metrics.time_phase("aggregate_transfers"):
+            for transfers in self._read_transfers_file_by_file(transfer_data_s3_uris):
+                partials.append(reports_generator(transfers).aggregate())
+                total_transfers += transfers.num_rows
+                total_technical_failures += self._count_technical_failures(transfers)
+        self._metrics.record("rows_processed", total_transfers, MetricUnit.COUNT)
+
+        partial_tables = partials.tables()
+        if self._deduplicate_conversations:
+            partial_tables.reverse()
+        with self._metrics.time_phase("generate_report"):
+            table = reports_generator.merge(partial_tables)
+        return table, self._generate_transfers_metrics(total_transfers, total_technical_failures)
+
+    def aggregate_shard(
+        self,
+        transfer_data_s3_uris: List[str],
+        segments_directory: str,
+        fallback_segments_directory: Optional[str],
+    ) -> ShardAggregate:
+        reports_generator = load_reports_generator(self._report_name)
+        transfers = self._read_transfer_table(transfer_data_s3_uris)
+        return ShardAggregate(
+            aggregate_path=write_shared_table(
+                reports_generator(transfers).aggregate(),
+                segments_directory,
+                fallback_segments_directory,
+            ),
+            total_transfers=transfers.num_rows,
+            total_technical_failures=self._count_technical_failures(transfers),
+            metrics=self._metrics.metrics(),
+        )
+
+    @staticmethod
+    def _shards(transfer_data_s3_uris: List[str], number_of_shards: int) -> List[List[str]]:
+        # contiguous runs of days, so each shard's partial is in date order
+        if not transfer_data_s3_uris:
+            return []
+        shard_size = -(-len(transfer_data_s3_uris) // number_of_shards)
+        shards: Dict[int, List[str]] = {}
+        for index, transfer_data_s3_uri in enumerate(transfer_data_s3_uris):
+            shards.setdefault(index // shard_size, []).append(transfer_data_s3_uri)
+        return list(shards.values())
+
+    def _aggregate_shards(
+        self, shards: List[List[str]], segments: SharedTableSegments
+    ) -> List[ShardAggregate]:
+        # spawned rather than forked, as forking copies the log queue's threads and locks
+        worker_config = worker_resource_limits(self._config, len(shards))
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=get_context("spawn"),
+            initializer=_initialise_shard_worker,
+            initargs=(worker_config,),
+        ) as executor:
+            return list(
+                executor.map(
+                    _aggregate_transfer_data_shard,
+                    repeat(worker_config),
+                    shards,
+                    repeat(segments.directory),
+                    repeat(segments.fallback_directory),
+                )
+            )
+
+    def _generate_report_sharded(
+        self, transfer_data_s3_uris: List[str], processes: int
+    ) -> Tuple[pa.Table, Dict[str, str]]:
+        shards = self._shards(transfer_data_s3_uris, processes)
+        with self._metrics.time_phase("aggregate_transfers"), SharedTableSegments(
+            self._shared_tables_directory
+        ) as segments:
+            shard_aggregates = self._aggregate_shards(shards, segments)
+            aggregates = [read_shared_table(shard.aggregate_path) for shard in shard_aggregates]
+        for metric in [metric for shard in shard_aggregates for metric in shard.metrics]:
+            self._metrics.increment(metric.name, metric.value, metric.unit)
+        total_transfers = sum(shard.total_transfers for shard in shard_aggregates)
+        self._metrics.record("rows_processed", total_transfers, MetricUnit.COUNT)
+        self._metrics.record("aggregation_shards", len(shards), MetricUnit.COUNT)
+
+        with self._metrics.time_phase("generate_report"):
+            table = load_reports_generator(self._report_name).merge(aggregates)
+        return table, self._generate_transfers_metrics(
+            total_transfers, sum(shard.total_technical_failures for shard in shard_aggregates)
+        )
+
+    def _generate_report_in_memory_or_sharded(
+        self, transfer_data_s3_uris: List[str]
+    ) -> Tuple[pa.Table, Dict[str, str]]:
+        # the shards are held in memory at once, so they are only split when the whole window
+        # fits the memory budget. Deduplication has to see every file, so it is never split
+        # across processes, and a window of one file, or none, has nothing to split.
+        processes = min(self._aggregation_processes, len(transfer_data_s3_uris))
+        if processes > 1 and not self._deduplicate_conversations:
+            return self._generate_report_sharded(transfer_data_s3_uris, processes)
+        return self._generate_report_in_memory(transfer_data_s3_uris)
+
+    def _generate_report(
+        self, transfer_data_s3_uris: List[str], object_sizes: List[int]
+    ) -> Tuple[pa.Table, Dict[str, str]]:
+        execution_strategy = self._execution_strategy(object_sizes)
+        if execution_strategy == ExecutionStrategy.IN_MEMORY:
+            return self._generate_report_in_memory_or_sharded(transfer_data_s3_uris)
+        with self._create_report_partials(execution_strategy) as partials:
+            return self._generate_report_from_partials(transfer_data_s3_uris, partials)
+
+    def _export_metrics(self):
+        metrics = self._metrics.metrics()
+        for exporter in self._metrics_exporters:
+            # a failed export is logged rather than raised, so it cannot hide the run's own error
+            try:
+                exporter.export(metrics, self._metrics_dimensions)
+            except Exception as error:
+                logger.warning(
+                    f"Failed to export metrics: {error}",
+                    extra={
+                        "event": "FAILED_TO_EXPORT_METRICS",
+                        "exporter": type(exporter).__name__,
+                    },
+                )
+
+    @staticmethod
+    def _missing_transfer_data_metadata(missing_periods: List[str]) -> Dict[str, str]:
+        if not missing_periods:
+            return {}
+        return {"missing-transfer-data-days": ",".join(missing_periods)}
+
+    def _produce_report(self):
+        (
+            transfer_data_s3_uris,
+            object_sizes,
+            missing_periods,
+        ) = self._available_transfer_data_s3_uris(self._transfer_data_s3_uris())
+
+        logger.info(
+            "Attempting to read from the following transfer data S3 Uris",
+            extra={
+                "event": "ATTEMPTING_TO_READ_FROM_TRANSFER_DATA_S3_URIS",
+                "transfer_data_s3_uris": transfer_data_s3_uris,
+            },
+        )
+
+        if self._validate_transfer_data:
+            self._validate_transfer_files(transfer_data_s3_uris)
 
         logger.info(
             f"Attempting to produce {self._report_name.value} report for transfers in date range",
@@ -169,7 +614,8 @@ class ReportsPipeline:
             },
         )
 
-        table = self._generate_report(transfers)
+        table, transfers_metrics = self._generate_report(transfer_data_s3_uris, object_sizes)
+        self._metrics.record("output_rows", table.num_rows, MetricUnit.COUNT)
 
         logger.info(
             f"Successfully produced {self._report_name.value} report for transfers in date range",
@@ -178,15 +624,117 @@ class ReportsPipeline:
                 **self._date_range_info_json,
             },
         )
-        transfers_metrics = self._generate_transfers_metrics(transfers)
 
         self._log_technical_failure_percentage(transfers_metrics)
 
-        self._write_table(
-            table=table,
-            output_metadata={
-                **transfers_metrics,
+        with self._metrics.time_phase("write_report"):
+            self._write_table(
+                table=table,
+                output_metadata={
+                    **transfers_metrics,
+                    **self._date_range_info_json,
+                    **self._additional_metadata,
+                    **self._missing_transfer_data_metadata(missing_periods),
+                },
+            )
+
+    def plan(self) -> RunPlan:
+        transfer_data_s3_uris = self._transfer_data_s3_uris()
+        object_sizes = self._io.object_sizes(transfer_data_s3_uris, max_workers=OBJECT_SIZE_THREADS)
+        existing_object_sizes = [size for size in object_sizes if size is not None]
+        total_input_bytes = sum(existing_object_sizes)
+        run_plan = RunPlan(
+            transfer_data_uris=transfer_data_s3_uris,
+            missing_transfer_data_uris=[
+                s3_uri for s3_uri, size in zip(transfer_data_s3_uris, object_sizes) if size is None
+            ],
+            total_input_bytes=total_input_bytes,
+            output_uris=self._output_uris(),
+            estimated_peak_memory_bytes=estimate_peak_memory_bytes(
+                total_input_bytes, self._report_name
+            ),
+            memory_budget_bytes=self._memory_budget_bytes,
+            execution_strategy=choose_execution_strategy(
+                existing_object_sizes, self._report_name, self._memory_budget_bytes
+            ),
+        )
+        logger.info(
+            f"Planned {self._report_name.value} report from "
+            f"{len(transfer_data_s3_uris)} transfer data files",
+            extra={
+                "event": "RUN_PLAN",
+                "transfer-data-files": len(run_plan.transfer_data_uris),
+                "missing-transfer-data-s3-uris": run_plan.missing_transfer_data_uris,
+                "total-input-bytes": run_plan.total_input_bytes,
+                "output-s3-uris": run_plan.output_uris,
+                "estimated-peak-memory-bytes": run_plan.estimated_peak_memory_bytes,
+                "memory-budget-bytes": run_plan.memory_budget_bytes,
+                "execution-strategy": run_plan.execution_strategy.value,
                 **self._date_range_info_json,
-                **self._additional_metadata,
             },
         )
+        return run_plan
+
+    def _report_transfers_metrics(self):
+        transfer_data_s3_uris, _, _ = self._available_transfer_data_s3_uris(
+            self._transfer_data_s3_uris()
+        )
+        columns = ["status"]
+        if self._deduplicate_conversations:
+            columns.append("conversation_id")
+        with self._metrics.time_phase("read_transfer_statuses"):
+            # only the columns' chunks are downloaded from each file
+            statuses = self._read_transfer_table(transfer_data_s3_uris, columns=columns)
+        if self._deduplicate_conversations:
+            statuses = self._deduplicated(statuses)
+        self._metrics.record("rows_processed", statuses.num_rows, MetricUnit.COUNT)
+
+        self._log_technical_failure_percentage(
+            self._generate_transfers_metrics(
+                statuses.num_rows, self._count_technical_failures(statuses)
+            )
+        )
+
+    def run(self):
+        # metrics are exported for failed runs too, which is when their durations and errors matter
+        try:
+            with self._metrics.time_phase("run"):
+                if self._metrics_only:
+                    self._report_transfers_metrics()
+                else:
+                    self._produce_report()
+        except Exception:
+            self._metrics.increment("run_errors", 1, MetricUnit.COUNT)
+            raise
+        finally:
+            self._export_metrics()
+            self.close()
+
+    def close(self):
+        self._data_manager.close()
+
+
+def _initialise_shard_worker(config: PipelineConfig):
+    # a spawned worker has none of the parent's log handlers or thread pool sizes
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+    package_logger = logging.getLogger("prmreportsgenerator")
+    package_logger.setLevel(logging.INFO)
+    package_logger.addHandler(handler)
+    apply_resource_limits(config, override_polars_max_threads=True)
+
+
+def _aggregate_transfer_data_shard(
+    config: PipelineConfig,
+    transfer_data_s3_uris: List[str],
+    segments_directory: str,
+    fallback_segments_directory: Optional[str],
+) -> ShardAggregate:
+    # runs in a worker process, with its own S3 clients
+    pipeline = ReportsPipeline(config)
+    try:
+        return pipeline.aggregate_shard(
+            transfer_data_s3_uris, segments_directory, fallback_segments_directory
+        )
+    finally:
+        pipeline.close()
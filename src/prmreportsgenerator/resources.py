@@ -0,0 +1,100 @@
+import logging
+import math
+import os
+from dataclasses import dataclass, replace
+from typing import MutableMapping, Optional
+
+from prmreportsgenerator.config import PipelineConfig
+from prmreportsgenerator.utils.cgroup_limits import (
+    CGROUP_ROOT,
+    cgroup_cpu_limit,
+    cgroup_memory_limit_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+POLARS_MAX_THREADS = "POLARS_MAX_THREADS"
+# I/O threads mostly wait on S3 rather than use a core, so there are several per core
+IO_THREADS_PER_CPU = 4
+MINIMUM_IO_THREADS = 8
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    cpu_count: int
+    cgroup_cpu_limit: Optional[float]
+    memory_limit_bytes: Optional[int]
+    io_threads: int
+
+
+def _host_cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def resource_limits(config: PipelineConfig, cgroup_root: str = CGROUP_ROOT) -> ResourceLimits:
+    # libraries size their pools from the host's cores, not the container's CPU quota
+    cpu_limit = cgroup_cpu_limit(cgroup_root)
+    cpu_count = _host_cpu_count()
+    if cpu_limit is not None:
+        cpu_count = max(1, min(cpu_count, math.ceil(cpu_limit)))
+    cpu_count = config.cpu_count or cpu_count
+    return ResourceLimits(
+        cpu_count=cpu_count,
+        cgroup_cpu_limit=cpu_limit,
+        memory_limit_bytes=cgroup_memory_limit_bytes(cgroup_root),
+        io_threads=config.arrow_io_threads
+        or max(MINIMUM_IO_THREADS, cpu_count * IO_THREADS_PER_CPU),
+    )
+
+
+def worker_resource_limits(
+    config: PipelineConfig, processes: int, cgroup_root: str = CGROUP_ROOT
+) -> PipelineConfig:
+    # each of the worker processes sizes its pools for its share of the CPUs and reads
+    limits = resource_limits(config, cgroup_root)
+    transfer_read_concurrency = config.transfer_read_concurrency or limits.io_threads
+    return replace(
+        config,
+        cpu_count=max(1, limits.cpu_count // processes),
+        arrow_io_threads=max(1, limits.io_threads // processes),
+        transfer_read_concurrency=max(1, transfer_read_concurrency // processes),
+    )
+
+
+def apply_resource_limits(
+    config: PipelineConfig,
+    env: MutableMapping[str, str] = os.environ,
+    cgroup_root: str = CGROUP_ROOT,
+    override_polars_max_threads: bool = False,
+) -> PipelineConfig:
+    limits = resource_limits(config, cgroup_root)
+    # polars reads this once, when it is first imported, so it must be set before then.
+    # Worker processes inherit the parent's value, so they override it with their share.
+    if override_polars_max_threads:
+        env[POLARS_MAX_THREADS] = str(limits.cpu_count)
+    env.setdefault(POLARS_MAX_THREADS, str(limits.cpu_count))
+
+    import pyarrow as pa
+
+    pa.set_cpu_count(limits.cpu_count)
+    pa.set_io_thread_count(limits.io_threads)
+    tuned_config = replace(
+        config,
+        transfer_read_concurrency=config.transfer_read_concurrency or limits.io_threads,
+    )
+    logger.info(
+        f"Sized thread pools for {limits.cpu_count} CPUs",
+        extra={
+            "event": "TUNED_RESOURCES",
+            "cpu-count": limits.cpu_count,
+            "cgroup-cpu-limit": limits.cgroup_cpu_limit,
+            "memory-limit-bytes": limits.memory_limit_bytes,
+            "polars-max-threads": env[POLARS_MAX_THREADS],
+            "arrow-cpu-count": pa.cpu_count(),
+            "arrow-io-threads": pa.io_thread_count(),
+            "transfer-read-concurrency": tuned_config.transfer_read_concurrency,
+        },
+    )
+    return tuned_config
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional
+
+from prmreportsgenerator.report_name import ReportName
+from prmreportsgenerator.utils.cgroup_limits import cgroup_memory_limit_bytes
+
+# Peak memory of a run as a multiple of the size of its Parquet transfer files, measured
+# generating each report from transfer files of 300,000 transfers. Files that compress
+# better than those expand by more, so this is a lower bound rather than a limit.
+REPORT_PEAK_MEMORY_PER_INPUT_BYTE = {
+    ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY: 7,
+    ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES: 8,
+    ReportName.SUB_ICB_LOCATION_LEVEL_INTEGRATION_TIMES: 7,
+    ReportName.TRANSFER_DETAILS_BY_HOUR: 7,
+}
+
+# Leaves the rest of a container's memory for the interpreter and imported libraries
+CGROUP_MEMORY_BUDGET_FRACTION = 0.8
+
+
+class ExecutionStrategy(Enum):
+    IN_MEMORY = "IN_MEMORY"
+    STREAMING = "STREAMING"
+    SPILL = "SPILL"
+
+
+def estimate_peak_memory_bytes(input_bytes: int, report_name: ReportName) -> int:
+    return input_bytes * REPORT_PEAK_MEMORY_PER_INPUT_BYTE[report_name]
+
+
+def memory_budget_bytes(configured_budget_bytes: Optional[int]) -> Optional[int]:
+    if configured_budget_bytes is not None:
+        return configured_budget_bytes
+    memory_limit_bytes = cgroup_memory_limit_bytes()
+    if memory_limit_bytes is None:
+        return None
+    return int(memory_limit_bytes * CGROUP_MEMORY_BUDGET_FRACTION)
+
+
+def choose_execution_strategy(
+    object_sizes: List[int], report_name: ReportName, budget_bytes: Optional[int]
+) -> ExecutionStrategy:
+    if budget_bytes is None:
+        return ExecutionStrategy.IN_MEMORY
+    if estimate_peak_memory_bytes(sum(object_sizes), report_name) <= budget_bytes:
+        return ExecutionStrategy.IN_MEMORY
+    # streaming holds one file's transfers at a time, leaving the rest for the partials so far
+    if estimate_peak_memory_bytes(max(object_sizes, default=0), report_name) * 2 <= budget_bytes:
+        return ExecutionStrategy.STREAMING
+    return ExecutionStrategy.SPILL
+
+
+@dataclass(frozen=True)
+class RunPlan:
+    transfer_data_uris: List[str]
+    missing_transfer_data_uris: List[str]
+    total_input_bytes: int
+    output_uris: List[str]
+    estimated_peak_memory_bytes: int
+    memory_budget_bytes: Optional[int]
+    execution_strategy: ExecutionStrategy
@@ -0,0 +1,96 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from dateutil.relativedelta import relativedelta
+from dateutil.tz import UTC
+
+from prmreportsgenerator.config import CompactionConfig
+from prmreportsgenerator.domain.reporting_windows.custom_reporting_window import (
+    CustomReportingWindow,
+)
+from prmreportsgenerator.domain.reporting_windows.monthly_reporting_window import (
+    MonthlyReportingWindow,
+)
+from prmreportsgenerator.io.data_manager import create_data_manager
+from prmreportsgenerator.io.reports_io import ReportsIO, ReportsS3UriResolver
+from prmreportsgenerator.metrics.pipeline_metrics import PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class TransferDataCompactor:
+    # Merges a month of daily transfer files into one sorted file, which the reports pipeline
+    # reads instead of the daily files when its reporting window covers the whole month
+    def __init__(self, config: CompactionConfig):
+        self._data_manager = create_data_manager(
+            local_data_directory=config.local_data_directory,
+            s3_endpoint_url=config.s3_endpoint_url,
+            metrics=PipelineMetrics(),
+            s3_upload_part_size_bytes=config.s3_upload_part_size_bytes,
+        )
+        self._io = ReportsIO(data_manager=self._data_manager)
+        self._uri_resolver = ReportsS3UriResolver(
+            transfer_data_bucket=config.input_transfer_data_bucket
+        )
+        self._month = self._month_start(config.month)
+        self._cutoff_days = config.cutoff_days
+        self._sort_column = config.sort_column
+        self._row_group_size = config.row_group_size
+        self._build_tag = config.build_tag
+
+    @staticmethod
+    def _month_start(month: Optional[datetime]) -> datetime:
+        if month is None:
+            return MonthlyReportingWindow(number_of_months=1).start_datetime
+        return datetime(month.year, month.month, 1, tzinfo=UTC)
+
+    def run(self):
+        try:
+            self._compact()
+        finally:
+            self.close()
+
+    def close(self):
+        self._data_manager.close()
+
+    def _compact(self):
+        month_window = CustomReportingWindow(self._month, self._month + relativedelta(months=1))
+        transfer_data_s3_uris = self._uri_resolver.input_transfer_data_uris(
+            reporting_window=month_window, cutoff_days=self._cutoff_days
+        )
+        compacted_s3_uri = self._uri_resolver.compacted_transfer_data_uri(
+            self._month, self._cutoff_days
+        )
+        logger.info(
+            "Attempting to compact transfer data into: " + compacted_s3_uri,
+            extra={
+                "event": "ATTEMPTING_TO_COMPACT_TRANSFER_DATA",
+                "transfer_data_s3_uris": transfer_data_s3_uris,
+                "compacted_s3_uri": compacted_s3_uri,
+            },
+        )
+
+        # every daily file must exist, a compacted file is only ever a complete month
+        transfers = self._io.read_transfers_as_table(transfer_data_s3_uris)
+        # sorted rows give each row group narrow min/max statistics on the sort column
+        transfers = transfers.sort_by([(self._sort_column, "ascending")])
+        self._io.write_parquet(
+            table=transfers,
+            s3_uri=compacted_s3_uri,
+            output_metadata={
+                "compacted-days": str(len(transfer_data_s3_uris)),
+                "sort-column": self._sort_column,
+                "reports-generator-version": self._build_tag,
+            },
+            row_group_size=self._row_group_size,
+        )
+
+        logger.info(
+            "Successfully compacted transfer data into: " + compacted_s3_uri,
+            extra={
+                "event": "COMPACTED_TRANSFER_DATA",
+                "compacted_s3_uri": compacted_s3_uri,
+                "total-transfers": transfers.num_rows,
+            },
+        )
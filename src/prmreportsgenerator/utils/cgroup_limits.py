@@ -0,0 +1,42 @@
+import os
+from typing import Optional
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# cgroup v1 reports an unlimited memory limit as the largest page aligned signed 64 bit integer
+_CGROUP_V1_UNLIMITED_MEMORY_BYTES = 2**62
+
+
+def _read_cgroup_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as cgroup_file:
+            return cgroup_file.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_memory_limit_bytes(cgroup_root: str = CGROUP_ROOT) -> Optional[int]:
+    memory_max = _read_cgroup_file(os.path.join(cgroup_root, "memory.max"))
+    if memory_max is not None:
+        return None if memory_max == "max" else int(memory_max)
+    limit_in_bytes = _read_cgroup_file(os.path.join(cgroup_root, "memory", "memory.limit_in_bytes"))
+    if limit_in_bytes is None or int(limit_in_bytes) >= _CGROUP_V1_UNLIMITED_MEMORY_BYTES:
+        return None
+    return int(limit_in_bytes)
+
+
+def _cgroup_v1_cpu_limit(cgroup_root: str) -> Optional[float]:
+    quota = _read_cgroup_file(os.path.join(cgroup_root, "cpu", "cpu.cfs_quota_us"))
+    period = _read_cgroup_file(os.path.join(cgroup_root, "cpu", "cpu.cfs_period_us"))
+    if quota is None or period is None or int(quota) <= 0:
+        return None
+    return int(quota) / int(period)
+
+
+def cgroup_cpu_limit(cgroup_root: str = CGROUP_ROOT) -> Optional[float]:
+    # the CPU quota in cores, e.g. 1.5 for a quota of 150ms per 100ms period
+    cpu_max = _read_cgroup_file(os.path.join(cgroup_root, "cpu.max"))
+    if cpu_max is None:
+        return _cgroup_v1_cpu_limit(cgroup_root)
+    quota, period = cpu_max.split()
+    return None if quota == "max" else int(quota) / int(period)
@@ -0,0 +1,21 @@
+from typing import Any, List, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def partition_table(table: pa.Table, column: str) -> List[Tuple[Any, pa.Table]]:
+    # Sorting (stably) puts the rows of each partition next to each other, so every partition
+    # is a zero-copy slice of the sorted table rather than a separate filter over all rows
+    if column not in table.column_names:
+        raise ValueError(f"Cannot partition table by {column}, no such column")
+    sorted_table = table.sort_by([(column, "ascending")])
+    value_counts = pc.value_counts(sorted_table[column])
+    partitions = []
+    offset = 0
+    for value, count in zip(
+        value_counts.field("values").to_pylist(), value_counts.field("counts").to_pylist()
+    ):
+        partitions.append((value, sorted_table.slice(offset, count)))
+        offset += count
+    return partitions
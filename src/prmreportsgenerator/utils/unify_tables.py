@@ -0,0 +1,28 @@
+from typing import List, Tuple
+
+import pyarrow as pa
+
+
+def unify_table_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+    # null typed columns take the type other tables have, narrower types are widened, e.g.
+    # int32 to int64, and a column any table has is in the unified schema
+    return pa.unify_schemas(schemas, promote_options="permissive")
+
+
+def conform_table(table: pa.Table, schema: pa.Schema) -> Tuple[pa.Table, List[str]]:
+    # missing columns are all-null arrays, which share one zeroed buffer rather than copying
+    columns = []
+    adaptations = []
+    for field in schema:
+        index = table.schema.get_field_index(field.name)
+        if index == -1:
+            columns.append(pa.chunked_array([pa.nulls(table.num_rows, field.type)]))
+            adaptations.append(f"added missing column {field.name}")
+        elif not table.schema.field(index).type.equals(field.type):
+            columns.append(table.column(index).cast(field.type))
+            adaptations.append(
+                f"cast column {field.name} from {table.schema.field(index).type} to {field.type}"
+            )
+        else:
+            columns.append(table.column(index))
+    return pa.Table.from_arrays(columns, schema=schema), adaptations
@@ -0,0 +1,571 @@
+import json
+from os import environ
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+from pyarrow.parquet import write_table
+
+from prmreportsgenerator.io.local import LocalDataManager
+from prmreportsgenerator.main import main
+from prmreportsgenerator.report_name import ReportName
+from prmreportsgenerator.reports_pipeline import logger as reports_pipeline_logger
+from prmreportsgenerator.utils.add_leading_zero import add_leading_zero
+from tests.builders.pa_table import PaTableBuilder
+from tests.e2e.e2e_setup import (
+    BUILD_TAG,
+    DEFAULT_CONVERSATION_CUTOFF_DAYS,
+    S3_INPUT_TRANSFER_DATA_BUCKET,
+    S3_OUTPUT_REPORTS_BUCKET,
+    _get_s3_path,
+    _read_csv,
+    _read_parquet_columns_json,
+)
+
+
+def _read_transfers_json(shared_datadir, day: int) -> pa.Table:
+    transfers_json = shared_datadir / "inputs" / f"2019-12-{add_leading_zero(day)}-transfers.json"
+    return pa.table(
+        data=_read_parquet_columns_json(transfers_json), schema=PaTableBuilder.get_schema()
+    )
+
+
+def _write_local_transfer_table(local_data_directory, day: int, transfers_table: pa.Table):
+    day_string = add_leading_zero(day)
+    path = local_data_directory / _get_s3_path(
+        S3_INPUT_TRANSFER_DATA_BUCKET, 2019, 12, day_string, DEFAULT_CONVERSATION_CUTOFF_DAYS
+    )
+    path.parent.mkdir(parents=True)
+    write_table(transfers_table, str(path))
+
+
+def _write_local_transfer_parquet(shared_datadir, local_data_directory, day: int):
+    _write_local_transfer_table(
+        local_data_directory, day, _read_transfers_json(shared_datadir, day)
+    )
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_reads_and_writes_local_data_directory(shared_datadir, tmp_path):
+    expected_transfer_level_technical_failures = _read_csv(
+        shared_datadir
+        / "expected_outputs"
+        / "transfer_level_technical_failures_report"
+        / "custom_transfer_level_technical_failures.csv"
+    )
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+
+    try:
+        environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+        environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+        environ["BUILD_TAG"] = BUILD_TAG
+        environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+        environ["START_DATETIME"] = "2019-12-19T00:00:00Z"
+        environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+        environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        environ["VALIDATE_TRANSFER_DATA"] = "true"
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        main()
+
+        assert _read_csv(output_path) == expected_transfer_level_technical_failures
+
+        metadata_path = output_path.with_name(output_path.name + ".metadata.json")
+        actual_metadata = json.loads(metadata_path.read_text())
+
+        assert actual_metadata["total-transfers"] == "2"
+        assert actual_metadata["report-name"] == ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_spills_report_partials_when_transfers_exceed_memory_budget(shared_datadir, tmp_path):
+    expected_transfer_level_technical_failures = _read_csv(
+        shared_datadir
+        / "expected_outputs"
+        / "transfer_level_technical_failures_report"
+        / "custom_transfer_level_technical_failures.csv"
+    )
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+
+    spill_directory = tmp_path / "spill"
+    spill_directory.mkdir()
+
+    try:
+        environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+        environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+        environ["BUILD_TAG"] = BUILD_TAG
+        environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+        environ["START_DATETIME"] = "2019-12-19T00:00:00Z"
+        environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+        environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        environ["MEMORY_BUDGET"] = "1"
+        environ["SPILL_DIRECTORY"] = str(spill_directory)
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        with mock.patch(
+            "prmreportsgenerator.io.local.LocalDataManager.object_size",
+            autospec=True,
+            side_effect=LocalDataManager.object_size,
+        ) as mock_object_size:
+            main()
+
+        assert _read_csv(output_path) == expected_transfer_level_technical_failures
+
+        metadata_path = output_path.with_name(output_path.name + ".metadata.json")
+        actual_metadata = json.loads(metadata_path.read_text())
+
+        assert actual_metadata["total-transfers"] == "2"
+        assert actual_metadata["report-name"] == ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        assert list(spill_directory.iterdir()) == []
+        # sizes from the existence check are reused to choose the execution strategy
+        assert mock_object_size.call_count == 2
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_writes_report_partitioned_by_column_with_manifest(shared_datadir, tmp_path):
+    output_directory = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff"
+    )
+
+    try:
+        environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+        environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+        environ["BUILD_TAG"] = BUILD_TAG
+        environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+        environ["START_DATETIME"] = "2019-12-19T00:00:00Z"
+        environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+        environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        environ["OUTPUT_PARTITION_COLUMN"] = "sending practice Sub ICB Location ODS code"
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        main()
+
+        expected = _read_csv(
+            shared_datadir
+            / "expected_outputs"
+            / "transfer_level_technical_failures_report"
+            / "custom_transfer_level_technical_failures.csv"
+        )
+        manifest = json.loads((output_directory / "manifest.json").read_text())
+
+        assert manifest["total-rows"] == 2
+        assert [(p["value"], p["rows"]) for p in manifest["partitions"]] == [("33A", 1), (None, 1)]
+        assert _read_csv(output_directory / "33A.csv") == [expected[0], expected[1]]
+        assert _read_csv(output_directory / "null.csv") == [expected[0], expected[2]]
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_reads_compacted_transfer_data_for_whole_month(shared_datadir, tmp_path):
+    expected_transfer_level_technical_failures = _read_csv(
+        shared_datadir
+        / "expected_outputs"
+        / "transfer_level_technical_failures_report"
+        / "custom_transfer_level_technical_failures.csv"
+    )
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/01"
+        / "2019-12-01-to-2019-12-31-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+
+    try:
+        environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+        environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+        environ["BUILD_TAG"] = BUILD_TAG
+        environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+        environ["START_DATETIME"] = "2019-12-01T00:00:00Z"
+        environ["END_DATETIME"] = "2020-01-01T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+        environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        environ["READ_COMPACTED_TRANSFER_DATA"] = "true"
+
+        # only the compacted file exists, so reading any daily file would fail
+        compacted_path = (
+            tmp_path
+            / S3_INPUT_TRANSFER_DATA_BUCKET
+            / f"v11/cutoff-{DEFAULT_CONVERSATION_CUTOFF_DAYS}/2019/12/2019-12-transfers.parquet"
+        )
+        compacted_path.parent.mkdir(parents=True)
+        compacted_table = pa.concat_tables(
+            [_read_transfers_json(shared_datadir, day) for day in [19, 20]]
+        )
+        write_table(compacted_table, str(compacted_path))
+
+        main()
+
+        assert _read_csv(output_path) == expected_transfer_level_technical_failures
+
+    finally:
+        environ.clear()
+
+
+def test_e2e_plan_logs_inputs_and_outputs_without_writing_report(shared_datadir, tmp_path):
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+    input_path = tmp_path / _get_s3_path(
+        S3_INPUT_TRANSFER_DATA_BUCKET, 2019, 12, "19", DEFAULT_CONVERSATION_CUTOFF_DAYS
+    )
+    missing_input_uri = "s3://" + _get_s3_path(
+        S3_INPUT_TRANSFER_DATA_BUCKET, 2019, 12, "20", DEFAULT_CONVERSATION_CUTOFF_DAYS
+    )
+
+    try:
+        environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+        environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+        environ["BUILD_TAG"] = BUILD_TAG
+        environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+        environ["START_DATETIME"] = "2019-12-19T00:00:00Z"
+        environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+        environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+
+        _write_local_transfer_parquet(shared_datadir, tmp_path, 19)
+
+        with mock.patch("sys.argv", ["main", "--plan"]), mock.patch.object(
+            reports_pipeline_logger, "info"
+        ) as mock_log_info:
+            main()
+
+        run_plan_log = next(
+            call.kwargs["extra"]
+            for call in mock_log_info.call_args_list
+            if call.kwargs.get("extra", {}).get("event") == "RUN_PLAN"
+        )
+        assert run_plan_log["transfer-data-files"] == 2
+        assert run_plan_log["missing-transfer-data-s3-uris"] == [missing_input_uri]
+        assert run_plan_log["total-input-bytes"] == input_path.stat().st_size
+        assert run_plan_log["output-s3-uris"] == [f"s3://{output_path.relative_to(tmp_path)}"]
+        assert not output_path.exists()
+
+    finally:
+        environ.clear()
+
+
+def test_e2e_metrics_only_logs_technical_failure_percentage_without_writing_report(
+    shared_datadir, tmp_path
+):
+    output_directory = tmp_path / S3_OUTPUT_REPORTS_BUCKET
+
+    try:
+        environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+        environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+        environ["BUILD_TAG"] = BUILD_TAG
+        environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+        environ["START_DATETIME"] = "2019-12-19T00:00:00Z"
+        environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
+        environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+        environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        environ["ALERT_ENABLED"] = "true"
+        environ["METRICS_ONLY"] = "true"
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        with mock.patch.object(reports_pipeline_logger, "info") as mock_log_info:
+            main()
+
+        percent_of_technical_failures_log = next(
+            call.kwargs["extra"]
+            for call in mock_log_info.call_args_list
+            if call.kwargs.get("extra", {}).get("event") == "PERCENT_OF_TECHNICAL_FAILURES"
+        )
+        assert percent_of_technical_failures_log["total-transfers"] == "2"
+        assert percent_of_technical_failures_log["total-technical-failures"] == "2"
+        assert percent_of_technical_failures_log["percent-of-technical-failures"] == "100.0"
+        assert percent_of_technical_failures_log["alert-enabled"] is True
+        assert not output_directory.exists()
+
+    finally:
+        environ.clear()
+
+
+def _set_local_transfer_level_technical_failures_environ(tmp_path):
+    environ["INPUT_TRANSFER_DATA_BUCKET"] = S3_INPUT_TRANSFER_DATA_BUCKET
+    environ["OUTPUT_REPORTS_BUCKET"] = S3_OUTPUT_REPORTS_BUCKET
+    environ["BUILD_TAG"] = BUILD_TAG
+    environ["LOCAL_DATA_DIRECTORY"] = str(tmp_path)
+    environ["START_DATETIME"] = "2019-12-19T00:00:00Z"
+    environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
+    environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
+    environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_skips_missing_transfer_data_and_records_missing_days(shared_datadir, tmp_path):
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+        environ["MISSING_TRANSFER_DATA_POLICY"] = "SKIP"
+
+        _write_local_transfer_parquet(shared_datadir, tmp_path, 19)
+
+        main()
+
+        metadata_path = output_path.with_name(output_path.name + ".metadata.json")
+        actual_metadata = json.loads(metadata_path.read_text())
+
+        assert actual_metadata["total-transfers"] == "1"
+        assert actual_metadata["missing-transfer-data-days"] == "2019-12-20"
+
+    finally:
+        environ.clear()
+
+
+def test_e2e_fails_before_reading_transfer_data_when_a_day_is_missing(shared_datadir, tmp_path):
+    output_directory = tmp_path / S3_OUTPUT_REPORTS_BUCKET
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+
+        _write_local_transfer_parquet(shared_datadir, tmp_path, 20)
+
+        with mock.patch(
+            "prmreportsgenerator.io.local.LocalDataManager.read_parquet"
+        ) as mock_read_parquet, pytest.raises(SystemExit):
+            main()
+
+        mock_read_parquet.assert_not_called()
+        assert not output_directory.exists()
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_discovers_transfer_data_by_listing_each_month(shared_datadir, tmp_path):
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+        environ["DISCOVER_TRANSFER_DATA_BY_LISTING"] = "true"
+        environ["MEMORY_BUDGET"] = str(1024 * 1024 * 1024)
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        with mock.patch(
+            "prmreportsgenerator.io.local.LocalDataManager.object_size"
+        ) as mock_object_size, mock.patch(
+            "prmreportsgenerator.io.local.LocalDataManager.list_objects",
+            autospec=True,
+            side_effect=LocalDataManager.list_objects,
+        ) as mock_list_objects:
+            main()
+
+        metadata_path = output_path.with_name(output_path.name + ".metadata.json")
+        assert json.loads(metadata_path.read_text())["total-transfers"] == "2"
+        mock_object_size.assert_not_called()
+        assert mock_list_objects.call_count == 1
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+@pytest.mark.parametrize("memory_budget", [None, "1"])
+def test_e2e_deduplicates_conversation_delivered_on_two_days(
+    shared_datadir, tmp_path, memory_budget
+):
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+    spill_directory = tmp_path / "spill"
+    spill_directory.mkdir()
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+        environ["DEDUPLICATE_CONVERSATIONS"] = "true"
+        environ["SPILL_DIRECTORY"] = str(spill_directory)
+        if memory_budget:
+            environ["MEMORY_BUDGET"] = memory_budget
+
+        redelivered_transfers = _read_transfers_json(shared_datadir, 19)
+        for day in [19, 20]:
+            _write_local_transfer_table(tmp_path, day, redelivered_transfers)
+
+        with mock.patch.object(reports_pipeline_logger, "info") as mock_log_info:
+            main()
+
+        metadata_path = output_path.with_name(output_path.name + ".metadata.json")
+        assert json.loads(metadata_path.read_text())["total-transfers"] == "1"
+        deduplicated_log = next(
+            call.kwargs["extra"]
+            for call in mock_log_info.call_args_list
+            if call.kwargs.get("extra", {}).get("event") == "DEDUPLICATED_CONVERSATIONS"
+        )
+        assert deduplicated_log["duplicate-conversations"] == 1
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_aggregates_days_in_worker_processes_and_merges_them(shared_datadir, tmp_path):
+    expected_transfer_level_technical_failures = _read_csv(
+        shared_datadir
+        / "expected_outputs"
+        / "transfer_level_technical_failures_report"
+        / "custom_transfer_level_technical_failures.csv"
+    )
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+        environ["AGGREGATION_PROCESSES"] = "2"
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        main()
+
+        assert _read_csv(output_path) == expected_transfer_level_technical_failures
+
+        metadata_path = output_path.with_name(output_path.name + ".metadata.json")
+        actual_metadata = json.loads(metadata_path.read_text())
+
+        assert actual_metadata["total-transfers"] == "2"
+        assert actual_metadata["total-technical-failures"] == "2"
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+def test_e2e_does_not_shard_a_window_over_the_memory_budget(shared_datadir, tmp_path):
+    expected_transfer_level_technical_failures = _read_csv(
+        shared_datadir
+        / "expected_outputs"
+        / "transfer_level_technical_failures_report"
+        / "custom_transfer_level_technical_failures.csv"
+    )
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+    spill_directory = tmp_path / "spill"
+    spill_directory.mkdir()
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+        environ["AGGREGATION_PROCESSES"] = "2"
+        environ["MEMORY_BUDGET"] = "1"
+        environ["SPILL_DIRECTORY"] = str(spill_directory)
+
+        for day in [19, 20]:
+            _write_local_transfer_parquet(shared_datadir, tmp_path, day)
+
+        with mock.patch(
+            "prmreportsgenerator.reports_pipeline.ProcessPoolExecutor"
+        ) as mock_process_pool_executor:
+            main()
+
+        mock_process_pool_executor.assert_not_called()
+        assert _read_csv(output_path) == expected_transfer_level_technical_failures
+
+    finally:
+        environ.clear()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+@pytest.mark.parametrize("read_transfers_as_dataset", ["false", "true"])
+def test_e2e_conforms_files_of_different_schema_versions_when_spilling(
+    shared_datadir, tmp_path, read_transfers_as_dataset
+):
+    expected_transfer_level_technical_failures = _read_csv(
+        shared_datadir
+        / "expected_outputs"
+        / "transfer_level_technical_failures_report"
+        / "custom_transfer_level_technical_failures.csv"
+    )
+    output_path = (
+        tmp_path
+        / S3_OUTPUT_REPORTS_BUCKET
+        / "v5/custom/2019/12/19"
+        / "2019-12-19-to-2019-12-20-transfer_level_technical_failures--14-days-cutoff.csv"
+    )
+    spill_directory = tmp_path / "spill"
+    spill_directory.mkdir()
+
+    try:
+        _set_local_transfer_level_technical_failures_environ(tmp_path)
+        environ["MEMORY_BUDGET"] = "1"
+        environ["SPILL_DIRECTORY"] = str(spill_directory)
+        environ["READ_TRANSFERS_AS_DATASET"] = read_transfers_as_dataset
+
+        _write_local_transfer_parquet(shared_datadir, tmp_path, 19)
+        # an older file without columns added since, and with a column written as null typed
+        older_transfers = _read_transfers_json(shared_datadir, 20).drop(
+            ["sending_practice_ods_code", "sla_duration"]
+        )
+        sicbl_ods_code_index = older_transfers.schema.get_field_index(
+            "sending_practice_sicbl_ods_code"
+        )
+        older_transfers = older_transfers.set_column(
+            sicbl_ods_code_index,
+            "sending_practice_sicbl_ods_code",
+            pa.nulls(older_transfers.num_rows),
+        )
+        _write_local_transfer_table(tmp_path, 20, older_transfers)
+
+        main()
+
+        assert _read_csv(output_path) == expected_transfer_level_technical_failures
+
+    finally:
+        environ.clear()
@@ -22,8 +22,9 @@ from tests.e2e.e2e_setup import (
 
 
 @pytest.mark.filterwarnings("ignore:Conversion of")
+@pytest.mark.parametrize("read_transfers_as_dataset", ["false", "true"])
 def test_e2e_custom_reporting_window_given_start_and_end_date(
-    shared_datadir,
+    shared_datadir, read_transfers_as_dataset
 ):
     fake_s3, s3_client = _setup()
     fake_s3.start()
@@ -48,6 +49,7 @@ def test_e2e_custom_reporting_window_given_start_and_end_date(
         environ["END_DATETIME"] = "2019-12-21T00:00:00Z"
         environ["CONVERSATION_CUTOFF_DAYS"] = DEFAULT_CONVERSATION_CUTOFF_DAYS
         environ["REPORT_NAME"] = ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES.value
+        environ["READ_TRANSFERS_AS_DATASET"] = read_transfers_as_dataset
 
         for day in [19, 20]:
             _override_transfer_data(
@@ -0,0 +1,97 @@
+import pyarrow as pa
+
+from prmreportsgenerator.domain.conversation_deduplication import (
+    StreamingConversationDeduplicator,
+    deduplicate_conversations,
+)
+
+
+def _transfers(conversation_ids, statuses) -> pa.Table:
+    return pa.table({"conversation_id": conversation_ids, "status": statuses})
+
+
+def test_deduplicate_conversations_keeps_last_row_of_each_conversation():
+    transfers = pa.concat_tables(
+        [
+            _transfers(["a", "b"], ["Technical failure", "Integrated on time"]),
+            _transfers(["a", "c"], ["Integrated on time", "Technical failure"]),
+        ]
+    )
+
+    actual, duplicates = deduplicate_conversations(transfers)
+
+    assert actual == _transfers(
+        ["b", "a", "c"], ["Integrated on time", "Integrated on time", "Technical failure"]
+    )
+    assert duplicates == 1
+
+
+def test_deduplicate_conversations_without_duplicates_keeps_every_row():
+    transfers = _transfers(["a", "b", "c"], ["Technical failure"] * 3)
+
+    actual, duplicates = deduplicate_conversations(transfers)
+
+    assert actual == transfers
+    assert duplicates == 0
+
+
+def test_streaming_deduplicator_fed_newest_file_first_keeps_newest_row():
+    older = _transfers(["a", "b"], ["Technical failure", "Integrated on time"])
+    newer = _transfers(["a", "c", "c"], ["Integrated on time", "Technical failure", "Integrated"])
+    deduplicator = StreamingConversationDeduplicator()
+
+    newer_kept = deduplicator.deduplicate(newer)
+    older_kept = deduplicator.deduplicate(older)
+
+    assert newer_kept == _transfers(["a", "c"], ["Integrated on time", "Integrated"])
+    assert older_kept == _transfers(["b"], ["Integrated on time"])
+    assert deduplicator.duplicates == 2
+
+
+def test_streaming_deduplicator_keeps_same_rows_as_in_memory_deduplication():
+    files = [
+        _transfers([f"{(day * 7 + i) % 40}" for i in range(20)], [f"{day}"] * 20)
+        for day in range(5)
+    ]
+    deduplicator = StreamingConversationDeduplicator()
+
+    streamed = [deduplicator.deduplicate(transfers) for transfers in reversed(files)]
+    in_memory, duplicates = deduplicate_conversations(pa.concat_tables(files))
+
+    assert pa.concat_tables(reversed(streamed)).sort_by("conversation_id") == in_memory.sort_by(
+        "conversation_id"
+    )
+    assert deduplicator.duplicates == duplicates
+
+
+def test_deduplicate_conversations_keeps_every_row_without_conversation_id():
+    transfers = _transfers([None, "a", None, "a"], ["1", "2", "3", "4"])
+
+    actual, duplicates = deduplicate_conversations(transfers)
+
+    assert actual == _transfers([None, None, "a"], ["1", "3", "4"])
+    assert duplicates == 1
+
+
+def test_streaming_deduplicator_keeps_every_row_without_conversation_id():
+    deduplicator = StreamingConversationDeduplicator()
+
+    newer_kept = deduplicator.deduplicate(_transfers([None, "a", None], ["1", "2", "3"]))
+    older_kept = deduplicator.deduplicate(_transfers(["a", None], ["4", "5"]))
+
+    assert newer_kept == _transfers([None, "a", None], ["1", "2", "3"])
+    assert older_kept.to_pylist() == [{"conversation_id": None, "status": "5"}]
+    assert deduplicator.duplicates == 1
+
+
+def test_streaming_deduplicator_finds_duplicates_across_many_files():
+    deduplicator = StreamingConversationDeduplicator()
+
+    kept = [
+        deduplicator.deduplicate(_transfers([f"{day}", f"{day // 2}"], ["status", "status"]))
+        for day in range(100)
+    ]
+
+    kept_ids = pa.concat_tables(kept)["conversation_id"].to_pylist()
+    assert sorted(kept_ids, key=int) == [f"{day}" for day in range(100)]
+    assert deduplicator.duplicates == 100
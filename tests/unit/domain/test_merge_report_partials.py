@@ -0,0 +1,52 @@
+import pyarrow as pa
+import pytest
+from dateutil.tz import UTC
+
+from prmreportsgenerator.domain.reports_generator.reports_generator_registry import (
+    load_reports_generator,
+)
+from prmreportsgenerator.domain.transfer import TransferFailureReason, TransferStatus
+from prmreportsgenerator.report_name import ReportName
+from tests.builders.common import a_datetime
+from tests.builders.pa_table import PaTableBuilder
+
+_TRANSFER_OUTCOMES = [
+    (TransferStatus.INTEGRATED_ON_TIME.value, None, []),
+    (TransferStatus.TECHNICAL_FAILURE.value, TransferFailureReason.FINAL_ERROR.value, [30]),
+    (TransferStatus.PROCESS_FAILURE.value, TransferFailureReason.INTEGRATED_LATE.value, []),
+    (TransferStatus.UNCLASSIFIED_FAILURE.value, TransferFailureReason.AMBIGUOUS_COPCS.value, [6]),
+]
+
+
+def _a_day_of_transfers(day: int):
+    builder = PaTableBuilder()
+    for index in range(12):
+        status, failure_reason, error_codes = _TRANSFER_OUTCOMES[(index + day) % 4]
+        builder.with_row(
+            requesting_supplier=f"Supplier {index % 2}",
+            sending_supplier=f"Supplier {index % 3}",
+            requesting_practice_ods_code=f"A{index % 5}",
+            requesting_practice_name=f"Practice {index % 5}",
+            requesting_practice_sicbl_ods_code="10D",
+            requesting_practice_sicbl_name="Sub ICB Location",
+            sla_duration=index * 86400,
+            status=status,
+            failure_reason=failure_reason,
+            final_error_codes=error_codes,
+            date_requested=a_datetime(year=2021, month=1, day=day, hour=index).astimezone(UTC),
+        )
+    return builder.build()
+
+
+@pytest.mark.filterwarnings("ignore:Conversion of")
+@pytest.mark.parametrize("report_name", list(ReportName))
+def test_merging_partials_of_each_day_matches_report_of_all_days(report_name):
+    days_of_transfers = [_a_day_of_transfers(day) for day in [1, 2, 3]]
+    reports_generator = load_reports_generator(report_name)
+
+    expected = reports_generator(pa.concat_tables(days_of_transfers)).generate()
+    actual = reports_generator.merge(
+        [reports_generator(transfers).aggregate() for transfers in days_of_transfers]
+    )
+
+    assert actual == expected
@@ -0,0 +1,56 @@
+import pyarrow as pa
+
+from prmreportsgenerator.domain.transfer_data_schema import (
+    TRANSFER_DATA_V11_SCHEMA,
+    transfer_data_schema_errors,
+)
+from tests.builders.pa_table import PaTableBuilder
+
+
+def test_returns_no_errors_for_transfer_table_schema():
+    schema = PaTableBuilder().with_row().build().schema
+
+    assert transfer_data_schema_errors(schema) == []
+
+
+def test_allows_columns_beyond_expected_schema():
+    schema = TRANSFER_DATA_V11_SCHEMA.append(pa.field("extra_column", pa.string()))
+
+    assert transfer_data_schema_errors(schema) == []
+
+
+def test_returns_error_for_each_missing_column():
+    schema = TRANSFER_DATA_V11_SCHEMA.remove(TRANSFER_DATA_V11_SCHEMA.get_field_index("status"))
+
+    assert transfer_data_schema_errors(schema) == ["missing column status"]
+
+
+def test_returns_error_for_column_with_unexpected_type():
+    index = TRANSFER_DATA_V11_SCHEMA.get_field_index("sla_duration")
+    schema = TRANSFER_DATA_V11_SCHEMA.set(index, pa.field("sla_duration", pa.string()))
+
+    assert transfer_data_schema_errors(schema) == [
+        "column sla_duration has type string, expected uint64"
+    ]
+
+
+def test_allows_missing_nullable_column():
+    schema = TRANSFER_DATA_V11_SCHEMA.remove(
+        TRANSFER_DATA_V11_SCHEMA.get_field_index("failure_reason")
+    )
+
+    assert transfer_data_schema_errors(schema) == []
+
+
+def test_allows_null_typed_column():
+    index = TRANSFER_DATA_V11_SCHEMA.get_field_index("sla_duration")
+    schema = TRANSFER_DATA_V11_SCHEMA.set(index, pa.field("sla_duration", pa.null()))
+
+    assert transfer_data_schema_errors(schema) == []
+
+
+def test_allows_column_with_type_that_widens_to_expected_type():
+    index = TRANSFER_DATA_V11_SCHEMA.get_field_index("sla_duration")
+    schema = TRANSFER_DATA_V11_SCHEMA.set(index, pa.field("sla_duration", pa.uint32()))
+
+    assert transfer_data_schema_errors(schema) == []
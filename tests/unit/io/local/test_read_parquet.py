@@ -0,0 +1,153 @@
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+from pyarrow.parquet import write_table
+
+from prmreportsgenerator.io.data_manager import ListedObject
+from prmreportsgenerator.io.local import LocalDataManager, logger
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit, PipelineMetrics
+
+
+def _write_fruit_table(path) -> pa.Table:
+    path.parent.mkdir(parents=True)
+    fruit_table = pa.table({"fruit": ["mango", "lemon"]})
+    write_table(fruit_table, str(path))
+    return fruit_table
+
+
+def test_read_parquet_returns_table_from_bucket_and_key_under_root_directory(tmp_path):
+    fruit_table = _write_fruit_table(tmp_path / "test_bucket" / "a" / "fruits.parquet")
+
+    data_manager = LocalDataManager(str(tmp_path))
+    actual_data = data_manager.read_parquet("s3://test_bucket/a/fruits.parquet")
+
+    assert actual_data == fruit_table
+
+
+def test_read_parquet_records_objects_and_bytes_read(tmp_path):
+    path = tmp_path / "test_bucket" / "fruits.parquet"
+    _write_fruit_table(path)
+
+    metrics = PipelineMetrics()
+    data_manager = LocalDataManager(str(tmp_path), metrics=metrics)
+    data_manager.read_parquet("s3://test_bucket/fruits.parquet")
+
+    assert metrics.metrics() == [
+        Metric(name="objects_read", value=1, unit=MetricUnit.COUNT),
+        Metric(name="bytes_read", value=path.stat().st_size, unit=MetricUnit.BYTES),
+    ]
+
+
+def test_read_parquet_logs_error_when_parquet_file_not_found(tmp_path):
+    data_manager = LocalDataManager(str(tmp_path))
+    object_uri = "s3://test_bucket/fruits.parquet"
+
+    with pytest.raises(FileNotFoundError) as e:
+        with mock.patch.object(logger, "error") as mock_log_error:
+            data_manager.read_parquet(object_uri)
+
+    mock_log_error.assert_called_once_with(
+        f"File not found: {tmp_path / 'test_bucket' / 'fruits.parquet'}, exiting...",
+        extra={"event": "FILE_NOT_FOUND_IN_LOCAL_DIRECTORY"},
+    )
+
+    assert str(e.value) == object_uri
+
+
+def test_exists_returns_whether_file_is_under_root_directory(tmp_path):
+    _write_fruit_table(tmp_path / "test_bucket" / "fruits.parquet")
+
+    data_manager = LocalDataManager(str(tmp_path))
+
+    assert data_manager.exists("s3://test_bucket/fruits.parquet")
+    assert not data_manager.exists("s3://test_bucket/vegetables.parquet")
+
+
+def test_object_size_returns_size_of_file_or_none_when_missing(tmp_path):
+    path = tmp_path / "test_bucket" / "fruits.parquet"
+    _write_fruit_table(path)
+
+    data_manager = LocalDataManager(str(tmp_path))
+
+    assert data_manager.object_size("s3://test_bucket/fruits.parquet") == path.stat().st_size
+    assert data_manager.object_size("s3://test_bucket/vegetables.parquet") is None
+
+
+def test_read_dataset_returns_files_under_root_directory_as_one_table(tmp_path):
+    fruit_table = _write_fruit_table(tmp_path / "test_bucket" / "a" / "fruits.parquet")
+    _write_fruit_table(tmp_path / "test_bucket" / "b" / "fruits.parquet")
+    metrics = PipelineMetrics()
+
+    data_manager = LocalDataManager(str(tmp_path), metrics=metrics)
+    actual_data = data_manager.read_dataset(
+        ["s3://test_bucket/a/fruits.parquet", "s3://test_bucket/b/fruits.parquet"]
+    )
+
+    assert actual_data == pa.concat_tables([fruit_table, fruit_table])
+    assert metrics.metrics() == [Metric("objects_read", 2, MetricUnit.COUNT)]
+
+
+def test_read_dataset_logs_error_when_a_file_is_not_found(tmp_path):
+    _write_fruit_table(tmp_path / "test_bucket" / "fruits.parquet")
+    data_manager = LocalDataManager(str(tmp_path))
+
+    with mock.patch.object(logger, "error") as mock_log_error:
+        with pytest.raises(FileNotFoundError):
+            data_manager.read_dataset(
+                ["s3://test_bucket/fruits.parquet", "s3://test_bucket/vegetables.parquet"]
+            )
+
+    mock_log_error.assert_called_once()
+    assert mock_log_error.call_args.kwargs["extra"] == {
+        "event": "FILE_NOT_FOUND_IN_LOCAL_DIRECTORY"
+    }
+
+
+def test_read_parquet_footer_returns_metadata_and_file_size(tmp_path):
+    path = tmp_path / "test_bucket" / "fruits.parquet"
+    fruit_table = _write_fruit_table(path)
+
+    data_manager = LocalDataManager(str(tmp_path))
+    actual = data_manager.read_parquet_footer("s3://test_bucket/fruits.parquet")
+
+    assert actual.metadata.num_rows == 2
+    assert actual.metadata.schema.to_arrow_schema() == fruit_table.schema
+    assert actual.size_bytes == path.stat().st_size
+    assert data_manager.read_parquet("s3://test_bucket/fruits.parquet") == fruit_table
+
+
+def test_read_parquet_footer_raises_file_not_found_for_missing_file(tmp_path):
+    data_manager = LocalDataManager(str(tmp_path))
+
+    with pytest.raises(FileNotFoundError):
+        data_manager.read_parquet_footer("s3://test_bucket/fruits.parquet")
+
+
+def test_read_parquet_reads_only_given_columns(tmp_path):
+    path = tmp_path / "test_bucket" / "fruits.parquet"
+    path.parent.mkdir(parents=True)
+    table = pa.table({"fruit": ["mango", "lemon"], "count": [1, 2]})
+    write_table(table, str(path))
+
+    data_manager = LocalDataManager(str(tmp_path))
+    actual_data = data_manager.read_parquet("s3://test_bucket/fruits.parquet", columns=["count"])
+
+    assert actual_data == table.select(["count"])
+
+
+def test_list_objects_returns_files_under_prefix_without_metadata_files(tmp_path):
+    month_directory = tmp_path / "test_bucket" / "2021" / "03"
+    (month_directory / "01").mkdir(parents=True)
+    (month_directory / "01" / "a.parquet").write_bytes(b"mango")
+    (month_directory / "01" / "a.parquet.metadata.json").write_bytes(b"{}")
+    (month_directory / "b.parquet").write_bytes(b"lemon!")
+
+    data_manager = LocalDataManager(str(tmp_path))
+    actual = data_manager.list_objects("s3://test_bucket/2021/03/")
+
+    assert actual == [
+        ListedObject(uri="s3://test_bucket/2021/03/01/a.parquet", size_bytes=5, etag=None),
+        ListedObject(uri="s3://test_bucket/2021/03/b.parquet", size_bytes=6, etag=None),
+    ]
+    assert data_manager.list_objects("s3://test_bucket/2021/04/") == []
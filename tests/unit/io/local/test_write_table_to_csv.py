@@ -0,0 +1,91 @@
+import json
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from prmreportsgenerator.io.local import LocalDataManager
+from prmreportsgenerator.output_format import OutputFormat
+
+SOME_METADATA = {"metadata_field": "metadata_value"}
+
+
+def test_writes_csv_under_root_directory(tmp_path):
+    data_manager = LocalDataManager(str(tmp_path))
+    data = {"Fruit": ["Banana", "Strawberry"], "Colour": ["yellow", "red"], "Quantity": [2, 3]}
+    table = pa.table(data)
+
+    expected = b'"Fruit","Colour","Quantity"\n"Banana","yellow",2\n"Strawberry","red",3\n'
+
+    data_manager.write_table_to_csv(
+        object_uri="s3://test_bucket/a/test_object.csv", table=table, metadata=SOME_METADATA
+    )
+
+    actual = (tmp_path / "test_bucket" / "a" / "test_object.csv").read_bytes()
+
+    assert actual == expected
+
+
+def test_writes_metadata_alongside_csv(tmp_path):
+    data_manager = LocalDataManager(str(tmp_path))
+    table = pa.table({"Fruit": ["Banana"]})
+
+    data_manager.write_table_to_csv(
+        object_uri="s3://test_bucket/test_object.csv", table=table, metadata=SOME_METADATA
+    )
+
+    metadata_path = tmp_path / "test_bucket" / "test_object.csv.metadata.json"
+
+    assert json.loads(metadata_path.read_text()) == SOME_METADATA
+
+
+def test_does_not_replace_existing_csv_when_write_fails(tmp_path):
+    path = tmp_path / "test_bucket" / "test_object.csv"
+    path.parent.mkdir()
+    path.write_bytes(b"previous report")
+    data_manager = LocalDataManager(str(tmp_path))
+    table = pa.table({"Fruit": ["Banana"]})
+
+    with mock.patch("prmreportsgenerator.io.local.write_outputs", side_effect=OSError):
+        with pytest.raises(OSError):
+            data_manager.write_table_to_csv(
+                object_uri="s3://test_bucket/test_object.csv", table=table, metadata=SOME_METADATA
+            )
+
+    assert path.read_bytes() == b"previous report"
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_writes_table_in_each_output_format(tmp_path):
+    data_manager = LocalDataManager(str(tmp_path))
+    table = pa.table({"Fruit": ["Banana", "Strawberry"], "Quantity": [2, 3]})
+
+    data_manager.write_table(
+        table=table,
+        object_uris={
+            OutputFormat.CSV: "s3://test_bucket/test_object.csv",
+            OutputFormat.PARQUET: "s3://test_bucket/test_object.parquet",
+        },
+        metadata=SOME_METADATA,
+    )
+
+    expected_csv = b'"Fruit","Quantity"\n"Banana",2\n"Strawberry",3\n'
+
+    assert (tmp_path / "test_bucket" / "test_object.csv").read_bytes() == expected_csv
+    assert pq.read_table(str(tmp_path / "test_bucket" / "test_object.parquet")) == table
+    assert (tmp_path / "test_bucket" / "test_object.parquet.metadata.json").exists()
+
+
+def test_writes_json_with_metadata(tmp_path):
+    data_manager = LocalDataManager(str(tmp_path))
+    data = {"partitions": [{"value": "10D", "rows": 2}]}
+
+    data_manager.write_json(
+        object_uri="s3://test_bucket/manifest.json", data=data, metadata=SOME_METADATA
+    )
+
+    path = tmp_path / "test_bucket" / "manifest.json"
+
+    assert json.loads(path.read_text()) == data
+    assert json.loads(LocalDataManager.metadata_path(path).read_text()) == SOME_METADATA
@@ -1,9 +1,16 @@
+from io import BytesIO
+from unittest import mock
 from unittest.mock import Mock
 
 import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
 
-from prmreportsgenerator.io.reports_io import ReportsIO
+from prmreportsgenerator.domain.transfer_data_schema import TransferDataSchemaError
+from prmreportsgenerator.io.data_manager import ParquetFooter
+from prmreportsgenerator.io.reports_io import ReportsIO, logger
 from tests.builders.common import a_datetime
+from tests.builders.pa_table import PaTableBuilder
 
 _METRIC_MONTH = 12
 _METRIC_YEAR = 2020
@@ -28,7 +35,7 @@ def test_read_transfer_table_given_list_of_s3_uris():
     s3_uri = f"s3://{transfer_data_bucket}/v5/{_METRIC_YEAR}/{_METRIC_MONTH}/transfers.parquet"
 
     metrics_io = ReportsIO(
-        s3_data_manager=s3_manager,
+        data_manager=s3_manager,
     )
 
     expected_table = transfer_table
@@ -38,3 +45,141 @@ def test_read_transfer_table_given_list_of_s3_uris():
     assert actual_table == expected_table
 
     s3_manager.read_parquet.assert_called_once_with(s3_uri)
+
+
+def test_read_transfer_table_in_parallel_keeps_order_of_s3_uris():
+    tables = {
+        f"s3://bucket/{day}.parquet": PaTableBuilder().with_row(conversation_id=str(day)).build()
+        for day in range(1, 6)
+    }
+    data_manager = Mock()
+    data_manager.read_parquet.side_effect = tables.get
+
+    reports_io = ReportsIO(data_manager=data_manager)
+    actual = reports_io.read_transfers_as_table(list(tables), max_workers=3)
+
+    assert actual["conversation_id"].to_pylist() == ["1", "2", "3", "4", "5"]
+
+
+def test_read_transfer_table_reads_only_given_columns():
+    transfer_table = pa.table(_INTEGRATED_TRANSFER_DATA_DICT).select(["status"])
+    data_manager = Mock()
+    data_manager.read_parquet.return_value = transfer_table
+
+    reports_io = ReportsIO(data_manager=data_manager)
+    actual_table = reports_io.read_transfers_as_table(["s3://bucket/a.parquet"], columns=["status"])
+
+    assert actual_table == transfer_table
+    data_manager.read_parquet.assert_called_once_with("s3://bucket/a.parquet", columns=["status"])
+
+
+def test_read_transfers_as_dataset_given_list_of_s3_uris():
+    transfer_table = pa.table(_INTEGRATED_TRANSFER_DATA_DICT)
+    data_manager = Mock()
+    data_manager.read_dataset.return_value = transfer_table
+
+    s3_uris = [
+        f"s3://test_transfer_data_bucket/v11/2020/12/0{day}/transfers.parquet" for day in [1, 2]
+    ]
+
+    reports_io = ReportsIO(data_manager=data_manager)
+
+    actual_table = reports_io.read_transfers_as_dataset(s3_uris, columns=["status"])
+
+    assert actual_table == transfer_table
+
+    data_manager.read_dataset.assert_called_once_with(s3_uris, columns=["status"], schema=None)
+
+
+def _a_footer(table: pa.Table) -> ParquetFooter:
+    buffer = BytesIO()
+    pq.write_table(table, buffer)
+    return ParquetFooter(metadata=pq.read_metadata(buffer), size_bytes=len(buffer.getvalue()))
+
+
+def test_validate_transfer_files_returns_footers_of_valid_files():
+    footers = {
+        "s3://bucket/a.parquet": _a_footer(PaTableBuilder().with_row().build()),
+        "s3://bucket/b.parquet": _a_footer(PaTableBuilder().with_row().with_row().build()),
+    }
+    data_manager = Mock()
+    data_manager.read_parquet_footer.side_effect = footers.get
+
+    reports_io = ReportsIO(data_manager=data_manager)
+    actual = reports_io.validate_transfer_files(list(footers), max_workers=2)
+
+    assert actual == list(footers.values())
+
+
+def test_object_sizes_returns_size_of_each_object_in_order():
+    sizes = {"s3://bucket/a.parquet": 100, "s3://bucket/b.parquet": None}
+    data_manager = Mock()
+    data_manager.object_size.side_effect = sizes.get
+
+    reports_io = ReportsIO(data_manager=data_manager)
+    actual = reports_io.object_sizes(list(sizes), max_workers=2)
+
+    assert actual == [100, None]
+
+
+def test_validate_transfer_files_raises_error_listing_every_invalid_file():
+    def read_parquet_footer(s3_uri):
+        if s3_uri == "s3://bucket/missing.parquet":
+            raise FileNotFoundError(s3_uri)
+        if s3_uri == "s3://bucket/wrong.parquet":
+            return _a_footer(PaTableBuilder().with_row().build().drop(["status"]))
+        return _a_footer(PaTableBuilder().with_row().build())
+
+    data_manager = Mock()
+    data_manager.read_parquet_footer.side_effect = read_parquet_footer
+
+    reports_io = ReportsIO(data_manager=data_manager)
+
+    with pytest.raises(TransferDataSchemaError) as e:
+        reports_io.validate_transfer_files(
+            ["s3://bucket/ok.parquet", "s3://bucket/wrong.parquet", "s3://bucket/missing.parquet"],
+            max_workers=3,
+        )
+
+    assert str(e.value) == (
+        "Invalid transfer data files - s3://bucket/wrong.parquet: missing column status;"
+        " s3://bucket/missing.parquet: file not found"
+    )
+    data_manager.read_parquet.assert_not_called()
+
+
+def test_read_transfer_table_unifies_schemas_of_files_and_logs_adapted_files():
+    tables = {
+        "s3://bucket/old.parquet": pa.table({"conversation_id": ["1"], "reason": pa.nulls(1)}),
+        "s3://bucket/new.parquet": pa.table(
+            {"conversation_id": ["2"], "reason": ["Final error"], "added": [True]}
+        ),
+    }
+    data_manager = Mock()
+    data_manager.read_parquet.side_effect = tables.get
+
+    reports_io = ReportsIO(data_manager=data_manager)
+
+    with mock.patch.object(logger, "warning") as mock_log_warning:
+        actual_table = reports_io.read_transfers_as_table(list(tables))
+
+    expected_table = pa.table(
+        {
+            "conversation_id": ["1", "2"],
+            "reason": [None, "Final error"],
+            "added": [None, True],
+        }
+    )
+
+    assert actual_table == expected_table
+    mock_log_warning.assert_called_once_with(
+        "Adapted schema of transfer data file: s3://bucket/old.parquet",
+        extra={
+            "event": "ADAPTED_TRANSFER_DATA_SCHEMA",
+            "object_uri": "s3://bucket/old.parquet",
+            "adaptations": [
+                "cast column reason from null to string",
+                "added missing column added",
+            ],
+        },
+    )
@@ -1,10 +1,12 @@
 from datetime import datetime
 from unittest.mock import patch
 
+import pytest
 from dateutil.tz import UTC, tzutc
 
 from prmreportsgenerator.domain.reporting_windows.reporting_window import ReportingWindow
 from prmreportsgenerator.io.reports_io import ReportsS3UriResolver
+from prmreportsgenerator.output_format import OutputFormat
 from prmreportsgenerator.report_name import ReportName
 from tests.builders.common import a_string, an_integer
 
@@ -61,3 +63,167 @@ def test_returns_output_uri_with_supplement_s3_key_and_filename_contains_cutoff_
     expected = f"s3://{expected_s3_key}/{expected_filename}"
 
     assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "output_format, expected_extension",
+    [
+        (OutputFormat.CSV, ".csv"),
+        (OutputFormat.CSV_GZIP, ".csv.gz"),
+        (OutputFormat.CSV_ZSTD, ".csv.zst"),
+        (OutputFormat.PARQUET, ".parquet"),
+    ],
+)
+def test_returns_output_uri_with_extension_for_output_format(output_format, expected_extension):
+    report_name = ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY
+    uri_resolver = ReportsS3UriResolver(reports_bucket=a_string(), transfer_data_bucket=a_string())
+
+    actual = uri_resolver.output_table_uri(
+        start_date=datetime(year=2022, month=3, day=5, tzinfo=UTC),
+        end_date=datetime(year=2022, month=3, day=6, tzinfo=UTC),
+        supplement_s3_key=a_string(),
+        cutoff_days=14,
+        report_name=report_name,
+        output_format=output_format,
+    )
+
+    expected_filename = f"{report_name.value.lower()}--14-days-cutoff{expected_extension}"
+    assert actual.endswith(expected_filename)
+
+
+@pytest.mark.parametrize(
+    "partition_value, expected_filename",
+    [
+        ("10D", "10D.csv"),
+        ("a/b c", "a%2Fb%20c.csv"),
+        ("a_b_c", "a_b_c.csv"),
+        ("", "empty.csv"),
+        (None, "null.csv"),
+    ],
+)
+def test_returns_output_partition_uri_under_report_directory(partition_value, expected_filename):
+    reports_bucket = a_string()
+    report_name = ReportName.SUB_ICB_LOCATION_LEVEL_INTEGRATION_TIMES
+    uri_resolver = ReportsS3UriResolver(
+        reports_bucket=reports_bucket, transfer_data_bucket=a_string()
+    )
+
+    actual = uri_resolver.output_partition_uri(
+        start_date=datetime(year=2022, month=3, day=5, tzinfo=UTC),
+        end_date=datetime(year=2022, month=3, day=7, tzinfo=UTC),
+        supplement_s3_key="4-days",
+        cutoff_days=14,
+        report_name=report_name,
+        partition_value=partition_value,
+    )
+
+    expected_directory = (
+        f"s3://{reports_bucket}/v5/4-days/2022/03/05/"
+        f"2022-03-05-to-2022-03-06-{report_name.value.lower()}--14-days-cutoff"
+    )
+
+    assert actual == f"{expected_directory}/{expected_filename}"
+
+
+def test_returns_output_manifest_uri_under_report_directory():
+    reports_bucket = a_string()
+    report_name = ReportName.SUB_ICB_LOCATION_LEVEL_INTEGRATION_TIMES
+    uri_resolver = ReportsS3UriResolver(
+        reports_bucket=reports_bucket, transfer_data_bucket=a_string()
+    )
+
+    actual = uri_resolver.output_manifest_uri(
+        start_date=datetime(year=2022, month=3, day=5, tzinfo=UTC),
+        end_date=datetime(year=2022, month=3, day=7, tzinfo=UTC),
+        supplement_s3_key="4-days",
+        cutoff_days=14,
+        report_name=report_name,
+    )
+
+    expected = (
+        f"s3://{reports_bucket}/v5/4-days/2022/03/05/"
+        f"2022-03-05-to-2022-03-06-{report_name.value.lower()}--14-days-cutoff/manifest.json"
+    )
+
+    assert actual == expected
+
+
+def test_returns_compacted_transfer_data_uri_in_month_directory():
+    transfer_data_bucket = a_string()
+    uri_resolver = ReportsS3UriResolver(transfer_data_bucket=transfer_data_bucket)
+
+    actual = uri_resolver.compacted_transfer_data_uri(
+        datetime(year=2021, month=2, day=1, tzinfo=tzutc()), cutoff_days=14
+    )
+
+    expected = f"s3://{transfer_data_bucket}/v11/cutoff-14/2021/02/2021-02-transfers.parquet"
+
+    assert actual == expected
+
+
+@patch.multiple(ReportingWindow, __abstractmethods__=set())
+def test_returns_only_months_wholly_within_reporting_window():
+    reporting_window = ReportingWindow(
+        start_datetime=datetime(year=2021, month=1, day=15, tzinfo=tzutc()),
+        end_datetime=datetime(year=2021, month=4, day=1, tzinfo=tzutc()),
+    )
+    uri_resolver = ReportsS3UriResolver(transfer_data_bucket=a_string())
+
+    actual = uri_resolver.whole_months(reporting_window)
+
+    expected = [
+        datetime(year=2021, month=2, day=1, tzinfo=tzutc()),
+        datetime(year=2021, month=3, day=1, tzinfo=tzutc()),
+    ]
+
+    assert actual == expected
+
+
+@patch.multiple(ReportingWindow, __abstractmethods__=set())
+def test_returns_compacted_uris_for_compacted_months_and_daily_uris_otherwise():
+    transfer_data_bucket = a_string()
+    reporting_window = ReportingWindow(
+        start_datetime=datetime(year=2021, month=1, day=30, tzinfo=tzutc()),
+        end_datetime=datetime(year=2021, month=3, day=2, tzinfo=tzutc()),
+    )
+    uri_resolver = ReportsS3UriResolver(transfer_data_bucket=transfer_data_bucket)
+
+    actual = uri_resolver.input_transfer_data_uris(
+        reporting_window,
+        cutoff_days=14,
+        compacted_months=[datetime(year=2021, month=2, day=1, tzinfo=tzutc())],
+    )
+
+    prefix = f"s3://{transfer_data_bucket}/v11/cutoff-14"
+    expected = [
+        f"{prefix}/2021/01/30/2021-01-30-transfers.parquet",
+        f"{prefix}/2021/01/31/2021-01-31-transfers.parquet",
+        f"{prefix}/2021/02/2021-02-transfers.parquet",
+        f"{prefix}/2021/03/01/2021-03-01-transfers.parquet",
+    ]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "s3_uri, expected",
+    [
+        ("s3://bucket/v11/cutoff-14/2021/03/04/2021-03-04-transfers.parquet", "2021-03-04"),
+        ("s3://bucket/v11/cutoff-14/2021/03/2021-03-transfers.parquet", "2021-03"),
+    ],
+)
+def test_returns_day_or_month_of_transfer_data_uri(s3_uri, expected):
+    assert ReportsS3UriResolver.transfer_data_period(s3_uri) == expected
+
+
+@pytest.mark.parametrize(
+    "s3_uri",
+    [
+        "s3://bucket/v11/cutoff-14/2021/03/04/2021-03-04-transfers.parquet",
+        "s3://bucket/v11/cutoff-14/2021/03/2021-03-transfers.parquet",
+    ],
+)
+def test_returns_month_prefix_of_transfer_data_uri(s3_uri):
+    expected = "s3://bucket/v11/cutoff-14/2021/03/"
+
+    assert ReportsS3UriResolver.transfer_data_month_prefix(s3_uri) == expected
@@ -1,8 +1,11 @@
-from unittest.mock import Mock
+from datetime import date
+from unittest.mock import Mock, call
 
 import pyarrow as pa
+import pytest
 
-from prmreportsgenerator.io.reports_io import ReportsIO
+from prmreportsgenerator.io.reports_io import OutputPartition, ReportsIO
+from prmreportsgenerator.output_format import OutputFormat
 from tests.builders.common import a_string
 
 _DATE_ANCHOR_MONTH = 1
@@ -17,7 +20,7 @@ def test_given_table_will_write_csv():
 
     output_metadata = {"metadata-field": "metadata_value"}
 
-    metrics_io = ReportsIO(s3_data_manager=s3_manager)
+    metrics_io = ReportsIO(data_manager=s3_manager)
     data = {"Fruit": ["Banana"]}
     table = pa.table(data)
 
@@ -28,3 +31,134 @@ def test_given_table_will_write_csv():
     s3_manager.write_table_to_csv.assert_called_once_with(
         object_uri=s3_uri, table=expected_table, metadata=output_metadata
     )
+
+
+def test_given_table_will_write_each_output_format():
+    data_manager = Mock()
+    reports_bucket = a_string()
+    s3_uris = {
+        OutputFormat.CSV: f"s3://{reports_bucket}/report.csv",
+        OutputFormat.PARQUET: f"s3://{reports_bucket}/report.parquet",
+    }
+    output_metadata = {"metadata-field": "metadata_value"}
+    table = pa.table({"Fruit": ["Banana"]})
+
+    reports_io = ReportsIO(data_manager=data_manager)
+    reports_io.write_table_in_formats(table=table, s3_uris=s3_uris, output_metadata=output_metadata)
+
+    data_manager.write_table.assert_called_once_with(
+        table=table, object_uris=s3_uris, metadata=output_metadata
+    )
+
+
+def _some_partitions():
+    return [
+        OutputPartition(
+            value="10D",
+            table=pa.table({"Fruit": ["Banana", "Apple"]}),
+            s3_uris={OutputFormat.CSV: "s3://bucket/report/10D.csv"},
+        ),
+        OutputPartition(
+            value=None,
+            table=pa.table({"Fruit": ["Cherry"]}),
+            s3_uris={OutputFormat.CSV: "s3://bucket/report/null.csv"},
+        ),
+    ]
+
+
+def test_writes_each_partition_then_manifest():
+    data_manager = Mock()
+    output_metadata = {"metadata-field": "metadata_value"}
+    partitions = _some_partitions()
+
+    reports_io = ReportsIO(data_manager=data_manager)
+    reports_io.write_partitioned_table(
+        partitions=partitions,
+        partition_column="Sub ICB Location ODS",
+        manifest_uri="s3://bucket/report/manifest.json",
+        output_metadata=output_metadata,
+        max_workers=2,
+    )
+
+    data_manager.write_table.assert_has_calls(
+        [
+            call(table=partition.table, object_uris=partition.s3_uris, metadata=output_metadata)
+            for partition in partitions
+        ],
+        any_order=True,
+    )
+    data_manager.write_json.assert_called_once_with(
+        object_uri="s3://bucket/report/manifest.json",
+        data={
+            "partition-column": "Sub ICB Location ODS",
+            "total-rows": 3,
+            "partitions": [
+                {"value": "10D", "rows": 2, "objects": {"CSV": "s3://bucket/report/10D.csv"}},
+                {"value": None, "rows": 1, "objects": {"CSV": "s3://bucket/report/null.csv"}},
+            ],
+        },
+        metadata=output_metadata,
+    )
+
+
+def test_does_not_write_manifest_when_a_partition_fails_to_write():
+    data_manager = Mock()
+    data_manager.write_table.side_effect = [None, RuntimeError("upload failed")]
+
+    reports_io = ReportsIO(data_manager=data_manager)
+
+    with pytest.raises(RuntimeError, match="upload failed"):
+        reports_io.write_partitioned_table(
+            partitions=_some_partitions(),
+            partition_column="Sub ICB Location ODS",
+            manifest_uri="s3://bucket/report/manifest.json",
+            output_metadata={},
+            max_workers=1,
+        )
+
+    data_manager.write_json.assert_not_called()
+
+
+def test_writes_date_partition_values_to_manifest_as_iso_dates():
+    data_manager = Mock()
+    partitions = [
+        OutputPartition(
+            value=date(2022, 3, 5),
+            table=pa.table({"Fruit": ["Banana"]}),
+            s3_uris={OutputFormat.CSV: "s3://bucket/report/2022-03-05.csv"},
+        )
+    ]
+
+    ReportsIO(data_manager=data_manager).write_partitioned_table(
+        partitions=partitions,
+        partition_column="Date",
+        manifest_uri="s3://bucket/report/manifest.json",
+        output_metadata={},
+        max_workers=1,
+    )
+
+    manifest = data_manager.write_json.call_args.kwargs["data"]
+    assert manifest["partitions"][0]["value"] == "2022-03-05"
+
+
+def test_does_not_write_partitions_that_would_overwrite_each_other():
+    data_manager = Mock()
+    partitions = [
+        OutputPartition(
+            value=value,
+            table=pa.table({"Fruit": ["Banana"]}),
+            s3_uris={OutputFormat.CSV: "s3://bucket/report/null.csv"},
+        )
+        for value in ["null", None]
+    ]
+
+    with pytest.raises(ValueError):
+        ReportsIO(data_manager=data_manager).write_partitioned_table(
+            partitions=partitions,
+            partition_column="Fruit",
+            manifest_uri="s3://bucket/report/manifest.json",
+            output_metadata={},
+            max_workers=1,
+        )
+
+    data_manager.write_table.assert_not_called()
@@ -3,10 +3,17 @@ from unittest import mock
 import boto3
 import pyarrow as pa
 import pytest
+from botocore.exceptions import ClientError
 from moto import mock_s3
 from pyarrow.parquet import write_table
 
+from prmreportsgenerator.io.adaptive_concurrency import (
+    AdaptiveConcurrencyLimit,
+    AdaptiveRetryingRequests,
+)
+from prmreportsgenerator.io.hedged_requests import HedgedRequests
 from prmreportsgenerator.io.s3 import S3DataManager, logger
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit, PipelineMetrics
 from tests.unit.io.s3 import MOTO_MOCK_REGION
 
 
@@ -76,3 +83,292 @@ def test_read_parquet_logs_error_when_s3_parquet_file_not_found(capsys):
     )
 
     assert str(e.value) == object_uri
+
+
+@mock_s3
+def test_read_parquet_records_objects_and_bytes_read():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket_name = "test_bucket"
+    bucket = conn.create_bucket(Bucket=bucket_name)
+    s3_object = bucket.Object("fruits.parquet")
+
+    fruit_table = pa.table({"fruit": ["mango", "lemon"]})
+    writer = pa.BufferOutputStream()
+    write_table(fruit_table, writer)
+    body = bytes(writer.getvalue())
+    s3_object.put(Body=body)
+
+    metrics = PipelineMetrics()
+    s3_manager = S3DataManager(conn, metrics=metrics)
+    s3_manager.read_parquet(f"s3://{bucket_name}/fruits.parquet")
+    s3_manager.read_parquet(f"s3://{bucket_name}/fruits.parquet")
+
+    assert metrics.metrics() == [
+        Metric(name="objects_read", value=2, unit=MetricUnit.COUNT),
+        Metric(name="bytes_read", value=len(body) * 2, unit=MetricUnit.BYTES),
+    ]
+
+
+@mock_s3
+def test_exists_returns_whether_object_is_in_bucket():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("fruits.parquet").put(Body=b"")
+
+    s3_manager = S3DataManager(conn)
+
+    assert s3_manager.exists("s3://test_bucket/fruits.parquet")
+    assert not s3_manager.exists("s3://test_bucket/vegetables.parquet")
+
+
+@mock_s3
+def test_object_size_returns_content_length_or_none_when_missing():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("fruits.parquet").put(Body=b"mango,lemon")
+
+    s3_manager = S3DataManager(conn)
+
+    assert s3_manager.object_size("s3://test_bucket/fruits.parquet") == 11
+    assert s3_manager.object_size("s3://test_bucket/vegetables.parquet") is None
+
+
+@mock_s3
+def test_object_size_uses_read_client():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    bucket.Object("fruits.parquet").put(Body=b"mango,lemon")
+    write_client = mock.Mock()
+
+    s3_manager = S3DataManager(write_client, read_client=conn)
+
+    assert s3_manager.object_size("s3://test_bucket/fruits.parquet") == 11
+    write_client.Object.assert_not_called()
+    write_client.meta.client.head_object.assert_not_called()
+
+
+def _write_parquet_object(s3_object, table: pa.Table, **kwargs) -> bytes:
+    writer = pa.BufferOutputStream()
+    write_table(table, writer, **kwargs)
+    body = bytes(writer.getvalue())
+    s3_object.put(Body=body)
+    return body
+
+
+@mock_s3
+def test_read_parquet_footer_returns_metadata_and_object_size():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    body = _write_parquet_object(bucket.Object("fruits.parquet"), pa.table({"fruit": ["mango"]}))
+
+    s3_manager = S3DataManager(conn)
+    actual = s3_manager.read_parquet_footer("s3://test_bucket/fruits.parquet")
+
+    assert actual.metadata.num_rows == 1
+    assert actual.metadata.schema.to_arrow_schema() == pa.schema([("fruit", pa.string())])
+    assert actual.size_bytes == len(body)
+
+
+@mock_s3
+def test_read_parquet_footer_fetches_footer_larger_than_first_range():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    table = pa.table({f"column_{i}": list(range(500)) for i in range(10)})
+    _write_parquet_object(bucket.Object("numbers.parquet"), table, row_group_size=1)
+
+    s3_manager = S3DataManager(conn)
+    actual = s3_manager.read_parquet_footer("s3://test_bucket/numbers.parquet")
+
+    assert actual.metadata.serialized_size > 64 * 1024
+    assert actual.metadata.num_row_groups == 500
+
+
+@mock_s3
+def test_read_parquet_reads_file_after_its_footer_was_read():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    fruit_table = pa.table({"fruit": ["mango", "lemon"]})
+    _write_parquet_object(bucket.Object("fruits.parquet"), fruit_table)
+
+    s3_manager = S3DataManager(conn)
+    s3_manager.read_parquet_footer("s3://test_bucket/fruits.parquet")
+    actual = s3_manager.read_parquet("s3://test_bucket/fruits.parquet")
+
+    assert actual == fruit_table
+
+
+@mock_s3
+def test_read_parquet_footer_raises_file_not_found_for_missing_object():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    conn.create_bucket(Bucket="test_bucket")
+
+    s3_manager = S3DataManager(conn)
+
+    with pytest.raises(FileNotFoundError):
+        s3_manager.read_parquet_footer("s3://test_bucket/fruits.parquet")
+
+
+@mock_s3
+def test_read_parquet_retries_throttled_get_object():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    fruit_table = pa.table({"fruit": ["mango", "lemon"]})
+    _write_parquet_object(bucket.Object("fruits.parquet"), fruit_table)
+    throttling_error = ClientError({"Error": {"Code": "SlowDown"}}, "GetObject")
+
+    s3_manager = S3DataManager(
+        conn,
+        read_requests=AdaptiveRetryingRequests(
+            AdaptiveConcurrencyLimit(max_limit=1), sleep=mock.Mock()
+        ),
+    )
+    response = s3_manager._get_object("s3://test_bucket/fruits.parquet")
+    with mock.patch.object(
+        s3_manager, "_get_object", side_effect=[throttling_error, throttling_error, response]
+    ) as mock_get_object:
+        actual_data = s3_manager.read_parquet("s3://test_bucket/fruits.parquet")
+
+    assert actual_data == fruit_table
+    assert mock_get_object.call_count == 3
+
+
+@mock_s3
+def test_read_parquet_hedges_get_object_once_deadline_is_learned():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    fruit_table = pa.table({"fruit": ["mango", "lemon"]})
+    _write_parquet_object(bucket.Object("fruits.parquet"), fruit_table)
+    hedged_requests = HedgedRequests(max_workers=2, min_samples=1)
+
+    s3_manager = S3DataManager(conn, hedged_requests=hedged_requests)
+    first_read = s3_manager.read_parquet("s3://test_bucket/fruits.parquet")
+    with mock.patch.object(hedged_requests, "call", wraps=hedged_requests.call) as mock_call:
+        second_read = s3_manager.read_parquet("s3://test_bucket/fruits.parquet")
+
+    assert first_read == fruit_table
+    assert second_read == fruit_table
+    assert mock_call.call_args.args[0] == "s3://test_bucket/fruits.parquet"
+
+
+@mock_s3
+def test_read_parquet_hedges_with_object_size_from_earlier_head_request():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    body = _write_parquet_object(bucket.Object("fruits.parquet"), pa.table({"fruit": ["mango"]}))
+    hedged_requests = HedgedRequests(max_workers=2)
+
+    s3_manager = S3DataManager(conn, hedged_requests=hedged_requests)
+    s3_manager.object_size("s3://test_bucket/fruits.parquet")
+    with mock.patch.object(hedged_requests, "call", wraps=hedged_requests.call) as mock_call:
+        s3_manager.read_parquet("s3://test_bucket/fruits.parquet")
+    s3_manager.close()
+
+    assert mock_call.call_args.kwargs["size_bytes"] == len(body)
+
+
+def _a_transfer_like_table(rows: int) -> pa.Table:
+    return pa.table(
+        {
+            "conversation_id": [f"conversation-{i}" for i in range(rows)],
+            "status": ["Integrated on time", "Technical failure"] * (rows // 2),
+            "sla_duration": list(range(rows)),
+        }
+    )
+
+
+@mock_s3
+def test_read_parquet_reads_object_larger_than_part_size_in_ranged_parts():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    table = _a_transfer_like_table(1000)
+    _write_parquet_object(bucket.Object("transfers.parquet"), table)
+    size_bytes = bucket.Object("transfers.parquet").content_length
+    metrics = PipelineMetrics()
+
+    s3_manager = S3DataManager(conn, metrics=metrics, read_part_size_bytes=1024)
+    with mock.patch.object(
+        s3_manager, "_get_object", wraps=s3_manager._get_object
+    ) as mock_get_object:
+        actual_data = s3_manager.read_parquet("s3://test_bucket/transfers.parquet")
+
+    assert actual_data == table
+    assert mock_get_object.call_count == -(-size_bytes // 1024)
+    assert Metric(name="bytes_read", value=size_bytes, unit=MetricUnit.BYTES) in metrics.metrics()
+
+
+@mock_s3
+def test_read_parquet_reads_object_smaller_than_part_size_in_one_request():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    fruit_table = pa.table({"fruit": ["mango", "lemon"]})
+    _write_parquet_object(bucket.Object("fruits.parquet"), fruit_table)
+
+    s3_manager = S3DataManager(conn, read_part_size_bytes=1024 * 1024)
+    with mock.patch.object(
+        s3_manager, "_get_object", wraps=s3_manager._get_object
+    ) as mock_get_object:
+        actual_data = s3_manager.read_parquet("s3://test_bucket/fruits.parquet")
+
+    assert actual_data == fruit_table
+    assert mock_get_object.call_count == 1
+
+
+@mock_s3
+def test_read_parquet_with_columns_reads_only_the_column_chunks():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    table = _a_transfer_like_table(1000)
+    _write_parquet_object(bucket.Object("transfers.parquet"), table)
+    size_bytes = bucket.Object("transfers.parquet").content_length
+    metrics = PipelineMetrics()
+
+    s3_manager = S3DataManager(conn, metrics=metrics)
+    actual_data = s3_manager.read_parquet("s3://test_bucket/transfers.parquet", columns=["status"])
+
+    bytes_read = {metric.name: metric.value for metric in metrics.metrics()}["bytes_read"]
+    assert actual_data == table.select(["status"])
+    assert bytes_read < size_bytes / 2
+
+
+@mock_s3
+def test_read_parquet_with_columns_uses_footer_already_read():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    table = _a_transfer_like_table(10)
+    _write_parquet_object(bucket.Object("transfers.parquet"), table)
+    object_uri = "s3://test_bucket/transfers.parquet"
+
+    s3_manager = S3DataManager(conn)
+    s3_manager.read_parquet_footer(object_uri)
+    with mock.patch.object(s3_manager, "_read_object_tail") as mock_read_object_tail:
+        actual_data = s3_manager.read_parquet(object_uri, columns=["sla_duration", "status"])
+
+    assert actual_data == table.select(["sla_duration", "status"])
+    mock_read_object_tail.assert_not_called()
+
+
+@mock_s3
+def test_list_objects_returns_every_page_of_objects_under_prefix():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    for day in range(1, 4):
+        bucket.Object(f"2021/03/{day:02d}/transfers.parquet").put(Body=b"x" * day)
+    bucket.Object("2021/04/01/transfers.parquet").put(Body=b"x")
+
+    s3_manager = S3DataManager(conn)
+    paginator = conn.meta.client.get_paginator("list_objects_v2")
+    with mock.patch.object(
+        conn.meta.client,
+        "get_paginator",
+        return_value=mock.Mock(
+            paginate=lambda **kwargs: paginator.paginate(**kwargs, PaginationConfig={"PageSize": 2})
+        ),
+    ):
+        actual = s3_manager.list_objects("s3://test_bucket/2021/03/")
+
+    assert [(listed.uri, listed.size_bytes) for listed in actual] == [
+        ("s3://test_bucket/2021/03/01/transfers.parquet", 1),
+        ("s3://test_bucket/2021/03/02/transfers.parquet", 2),
+        ("s3://test_bucket/2021/03/03/transfers.parquet", 3),
+    ]
+    assert actual[0].etag == bucket.Object("2021/03/01/transfers.parquet").e_tag.strip('"')
@@ -1,10 +1,17 @@
+import json
+from io import BytesIO
 from unittest import mock
 
 import boto3
 import pyarrow as pa
+import pyarrow.csv as csv
+import pyarrow.parquet as pq
+import pytest
 from moto import mock_s3
 
-from prmreportsgenerator.io.s3 import S3DataManager, logger
+from prmreportsgenerator.io.s3 import MINIMUM_UPLOAD_PART_SIZE_BYTES, S3DataManager, logger
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit, PipelineMetrics
+from prmreportsgenerator.output_format import OutputFormat
 from tests.unit.io.s3 import MOTO_MOCK_REGION
 
 SOME_METADATA = {"metadata_field": "metadata_value"}
@@ -95,3 +102,124 @@ def test_logs_writing_file_events():
                 ),
             ]
         )
+
+
+@mock_s3
+def test_records_output_bytes():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    conn.create_bucket(Bucket="test_bucket")
+    metrics = PipelineMetrics()
+    s3_manager = S3DataManager(conn, metrics=metrics)
+    table = pa.table({"Fruit": ["Banana"]})
+
+    s3_manager.write_table_to_csv(
+        object_uri="s3://test_bucket/test_object.csv", table=table, metadata=SOME_METADATA
+    )
+
+    assert metrics.metrics() == [
+        Metric(name="output_bytes", value=len(b'"Fruit"\n"Banana"\n'), unit=MetricUnit.BYTES)
+    ]
+
+
+@mock_s3
+@pytest.mark.parametrize("csv_encoding_threads", [1, 3])
+def test_writes_large_csv_as_multipart_upload(csv_encoding_threads):
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_manager = S3DataManager(
+        conn,
+        upload_part_size_bytes=MINIMUM_UPLOAD_PART_SIZE_BYTES,
+        csv_encoding_threads=csv_encoding_threads,
+    )
+    number_of_rows = 600_000
+    table = pa.table(
+        {"Fruit": [f"Banana-{i}" for i in range(number_of_rows)], "Quantity": range(number_of_rows)}
+    )
+
+    s3_manager.write_table_to_csv(
+        object_uri="s3://test_bucket/test_object.csv", table=table, metadata=SOME_METADATA
+    )
+
+    expected_body = BytesIO()
+    csv.write_csv(table, expected_body)
+    actual = bucket.Object("test_object.csv").get()
+
+    number_of_parts = int(actual["ETag"].strip('"').split("-")[1])
+    assert number_of_parts > 1
+    assert len(expected_body.getvalue()) > 2 * MINIMUM_UPLOAD_PART_SIZE_BYTES
+    assert actual["Body"].read() == expected_body.getvalue()
+    assert actual["ContentType"] == "text/csv"
+    assert actual["Metadata"] == SOME_METADATA
+
+
+@mock_s3
+def test_aborts_multipart_upload_when_upload_fails():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_manager = S3DataManager(conn, upload_part_size_bytes=MINIMUM_UPLOAD_PART_SIZE_BYTES)
+    table = pa.table({"Quantity": [1]})
+
+    with mock.patch(
+        "prmreportsgenerator.io.output_encoder.encode_csv_chunks",
+        side_effect=lambda *_: iter([b"a" * MINIMUM_UPLOAD_PART_SIZE_BYTES, b"b", _raise()]),
+    ):
+        with pytest.raises(ValueError):
+            s3_manager.write_table_to_csv(
+                object_uri="s3://test_bucket/test_object.csv", table=table, metadata=SOME_METADATA
+            )
+
+    assert list(bucket.multipart_uploads.all()) == []
+    assert list(bucket.objects.all()) == []
+
+
+def _raise():
+    raise ValueError("failed to encode")
+
+
+def test_rejects_upload_part_size_smaller_than_s3_minimum():
+    with pytest.raises(ValueError):
+        S3DataManager(mock.Mock(), upload_part_size_bytes=MINIMUM_UPLOAD_PART_SIZE_BYTES - 1)
+
+
+@mock_s3
+def test_writes_table_in_each_output_format():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_manager = S3DataManager(conn)
+    table = pa.table({"Fruit": ["Banana", "Strawberry"], "Quantity": [2, 3]})
+
+    s3_manager.write_table(
+        table=table,
+        object_uris={
+            OutputFormat.CSV_GZIP: "s3://test_bucket/test_object.csv.gz",
+            OutputFormat.PARQUET: "s3://test_bucket/test_object.parquet",
+        },
+        metadata=SOME_METADATA,
+    )
+
+    gzip_object = bucket.Object("test_object.csv.gz").get()
+    parquet_object = bucket.Object("test_object.parquet").get()
+
+    assert gzip_object["ContentType"] == "text/csv"
+    assert gzip_object["ContentEncoding"] == "gzip"
+    assert gzip_object["Metadata"] == SOME_METADATA
+    assert parquet_object["ContentType"] == "application/vnd.apache.parquet"
+    assert pq.read_table(BytesIO(parquet_object["Body"].read())) == table
+
+
+@mock_s3
+def test_writes_json():
+    conn = boto3.resource("s3", region_name=MOTO_MOCK_REGION)
+    bucket = conn.create_bucket(Bucket="test_bucket")
+    s3_manager = S3DataManager(conn)
+    data = {"partitions": [{"value": "10D", "rows": 2}]}
+
+    s3_manager.write_json(
+        object_uri="s3://test_bucket/manifest.json", data=data, metadata=SOME_METADATA
+    )
+
+    actual = bucket.Object("manifest.json").get()
+
+    assert json.loads(actual["Body"].read()) == data
+    assert actual["ContentType"] == "application/json"
+    assert actual["Metadata"] == SOME_METADATA
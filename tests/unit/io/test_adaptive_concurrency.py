@@ -0,0 +1,197 @@
+from threading import Thread
+from unittest import mock
+
+import pytest
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from prmreportsgenerator.io.adaptive_concurrency import (
+    AdaptiveConcurrencyLimit,
+    AdaptiveRetryingRequests,
+    logger,
+)
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit, PipelineMetrics
+
+
+def _a_client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "GetObject")
+
+
+class FakeThrottlingRequest:
+    def __init__(self, throttled_attempts: int, error_code: str = "SlowDown"):
+        self._throttled_attempts = throttled_attempts
+        self._error_code = error_code
+        self.attempts = 0
+
+    def __call__(self) -> str:
+        self.attempts += 1
+        if self.attempts <= self._throttled_attempts:
+            raise _a_client_error(self._error_code)
+        return "body"
+
+
+def _retrying_requests(concurrency_limit=None, **kwargs) -> AdaptiveRetryingRequests:
+    return AdaptiveRetryingRequests(
+        concurrency_limit or AdaptiveConcurrencyLimit(max_limit=8),
+        sleep=kwargs.pop("sleep", mock.Mock()),
+        jitter=lambda: 1.0,
+        clock=kwargs.pop("clock", lambda: 0.0),
+        **kwargs,
+    )
+
+
+def test_concurrency_limit_increases_additively_up_to_max_limit():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=3)
+
+    for _ in range(5):
+        concurrency_limit.record_success(latency_seconds=0.1)
+
+    assert concurrency_limit.limit == 3
+
+
+def test_concurrency_limit_decreases_multiplicatively_when_throttled():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=16, initial_limit=16)
+
+    concurrency_limit.record_throttled()
+    concurrency_limit.record_throttled()
+
+    assert concurrency_limit.limit == 4
+
+
+def test_concurrency_limit_never_drops_below_one():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=2, initial_limit=2)
+
+    for _ in range(5):
+        concurrency_limit.record_throttled()
+
+    assert concurrency_limit.limit == 1
+
+
+def test_concurrency_limit_decreases_on_latency_spike():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=16, initial_limit=7)
+
+    concurrency_limit.record_success(latency_seconds=0.1)
+    concurrency_limit.record_success(latency_seconds=1.0)
+
+    assert concurrency_limit.limit == 4
+
+
+def test_concurrency_limit_blocks_requests_beyond_limit_until_a_slot_is_released():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=1)
+    acquired = []
+
+    with concurrency_limit.slot():
+        waiting_thread = Thread(target=lambda: concurrency_limit.slot().__enter__())
+        waiting_thread.start()
+        waiting_thread.join(timeout=0.1)
+        acquired.append(not waiting_thread.is_alive())
+    waiting_thread.join(timeout=1)
+    acquired.append(not waiting_thread.is_alive())
+
+    assert acquired == [False, True]
+
+
+def test_retries_throttled_request_after_jittered_exponential_delays():
+    sleep = mock.Mock()
+    request = FakeThrottlingRequest(throttled_attempts=3)
+
+    actual = _retrying_requests(sleep=sleep).call("s3://bucket/a.parquet", request)
+
+    assert actual == "body"
+    assert request.attempts == 4
+    assert sleep.call_args_list == [mock.call(0.1), mock.call(0.2), mock.call(0.4)]
+
+
+def test_retry_delay_is_capped():
+    sleep = mock.Mock()
+    request = FakeThrottlingRequest(throttled_attempts=4)
+
+    _retrying_requests(sleep=sleep, max_delay_seconds=0.25).call("s3://bucket/a.parquet", request)
+
+    assert sleep.call_args_list == [
+        mock.call(0.1),
+        mock.call(0.2),
+        mock.call(0.25),
+        mock.call(0.25),
+    ]
+
+
+def test_raises_throttling_error_after_max_attempts():
+    request = FakeThrottlingRequest(throttled_attempts=10, error_code="503")
+
+    with pytest.raises(ClientError):
+        _retrying_requests(max_attempts=3).call("s3://bucket/a.parquet", request)
+
+    assert request.attempts == 3
+
+
+def test_does_not_retry_errors_other_than_throttling():
+    request = FakeThrottlingRequest(throttled_attempts=1, error_code="AccessDenied")
+
+    with pytest.raises(ClientError):
+        _retrying_requests().call("s3://bucket/a.parquet", request)
+
+    assert request.attempts == 1
+
+
+def test_retries_transient_errors_without_reducing_concurrency_limit():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=16, initial_limit=16)
+    metrics = PipelineMetrics()
+    request = FakeThrottlingRequest(throttled_attempts=2, error_code="InternalError")
+
+    with mock.patch.object(logger, "warning") as mock_log_warning:
+        actual = _retrying_requests(concurrency_limit, metrics=metrics).call(
+            "s3://bucket/a.parquet", request
+        )
+
+    assert actual == "body"
+    assert concurrency_limit.limit == 16
+    assert mock_log_warning.call_args.kwargs["extra"]["event"] == "S3_REQUEST_FAILED_TRANSIENTLY"
+    assert metrics.metrics() == [Metric(name="s3_transient_errors", value=2, unit=MetricUnit.COUNT)]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        EndpointConnectionError(endpoint_url="https://s3.amazonaws.com"),
+        ConnectionClosedError(endpoint_url="https://s3.amazonaws.com"),
+        ReadTimeoutError(endpoint_url="https://s3.amazonaws.com"),
+    ],
+)
+def test_retries_connection_errors(error):
+    request = mock.Mock(side_effect=[error, "body"])
+
+    with mock.patch.object(logger, "warning") as mock_log_warning:
+        actual = _retrying_requests().call("s3://bucket/a.parquet", request)
+
+    assert actual == "body"
+    assert mock_log_warning.call_args.kwargs["extra"]["error-code"] == type(error).__name__
+
+
+def test_throttled_requests_reduce_concurrency_limit():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=16, initial_limit=16)
+    request = FakeThrottlingRequest(throttled_attempts=2)
+
+    _retrying_requests(concurrency_limit).call("s3://bucket/a.parquet", request)
+
+    assert concurrency_limit.limit == 5
+
+
+def test_logs_and_counts_each_throttled_attempt():
+    metrics = PipelineMetrics()
+    request = FakeThrottlingRequest(throttled_attempts=2)
+
+    with mock.patch.object(logger, "warning") as mock_log_warning:
+        _retrying_requests(metrics=metrics).call("s3://bucket/a.parquet", request)
+
+    logged_attempts = [call.kwargs["extra"]["attempt"] for call in mock_log_warning.call_args_list]
+    assert logged_attempts == [1, 2]
+    assert mock_log_warning.call_args.kwargs["extra"]["object_uri"] == "s3://bucket/a.parquet"
+    assert mock_log_warning.call_args.kwargs["extra"]["error-code"] == "SlowDown"
+    assert metrics.metrics() == [
+        Metric(name="s3_throttled_requests", value=2, unit=MetricUnit.COUNT)
+    ]
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from io import BytesIO
+
+import pyarrow as pa
+import pyarrow.csv as csv
+import pytest
+
+from prmreportsgenerator.io.csv_encoder import encode_csv_chunks, estimate_rows_per_chunk
+
+
+def _write_csv(table: pa.Table) -> bytes:
+    buffer = BytesIO()
+    csv.write_csv(table, buffer)
+    return buffer.getvalue()
+
+
+def _a_table(number_of_rows: int) -> pa.Table:
+    return pa.table(
+        {
+            "Fruit": [f"fruit-{i}" for i in range(number_of_rows)],
+            "Quantity": list(range(number_of_rows)),
+            "Ripe": [i % 2 == 0 for i in range(number_of_rows)],
+        }
+    )
+
+
+@pytest.mark.parametrize("rows_per_chunk", [1, 7, 100, 1000])
+def test_encoded_chunks_are_identical_to_writing_whole_table(rows_per_chunk):
+    table = _a_table(100)
+
+    actual = b"".join(encode_csv_chunks(table, rows_per_chunk))
+
+    assert actual == _write_csv(table)
+
+
+@pytest.mark.parametrize("rows_per_chunk", [1, 7, 100, 1000])
+@pytest.mark.parametrize("max_workers", [2, 4])
+def test_concurrently_encoded_chunks_are_identical_to_writing_whole_table(
+    rows_per_chunk, max_workers
+):
+    table = _a_table(100)
+
+    actual = b"".join(encode_csv_chunks(table, rows_per_chunk, max_workers=max_workers))
+
+    assert actual == _write_csv(table)
+
+
+def test_concurrently_encodes_header_for_empty_table():
+    table = _a_table(0)
+
+    actual = list(encode_csv_chunks(table, rows_per_chunk=10, max_workers=4))
+
+    assert actual == [b'"Fruit","Quantity","Ripe"\n']
+
+
+def test_encodes_header_for_empty_table():
+    table = _a_table(0)
+
+    actual = list(encode_csv_chunks(table, rows_per_chunk=10))
+
+    assert actual == [b'"Fruit","Quantity","Ripe"\n']
+
+
+def test_estimate_rows_per_chunk_uses_csv_encoded_size():
+    table = pa.table({"Quantity": pa.array(range(1000, 1100), type=pa.int64())})
+
+    assert estimate_rows_per_chunk(table, chunk_size_bytes=50) == 10
+
+
+def test_csv_chunks_are_bounded_by_chunk_size_when_csv_is_larger_than_arrow():
+    dates = [date(2021, 1, 1) + timedelta(days=day) for day in range(1000)]
+    table = pa.table({"Date": pa.array(dates, type=pa.date32())})
+    chunk_size_bytes = 1000
+
+    rows_per_chunk = estimate_rows_per_chunk(table, chunk_size_bytes)
+    chunks = list(encode_csv_chunks(table, rows_per_chunk))
+
+    assert max(len(chunk) for chunk in chunks[1:]) <= chunk_size_bytes
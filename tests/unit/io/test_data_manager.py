@@ -0,0 +1,29 @@
+from moto import mock_s3
+
+from prmreportsgenerator.io.data_manager import create_data_manager, read_pool_connections
+from prmreportsgenerator.metrics.pipeline_metrics import PipelineMetrics
+
+
+def test_read_pool_connections_cover_part_threads_and_hedges():
+    assert read_pool_connections(8, 4, hedged=False) == 32
+    assert read_pool_connections(8, 4, hedged=True) == 48
+
+
+def test_read_pool_connections_are_never_fewer_than_botocore_default():
+    assert read_pool_connections(1, 1, hedged=True) == 10
+
+
+@mock_s3
+def test_read_client_pool_is_sized_for_read_concurrency():
+    data_manager = create_data_manager(
+        None,
+        None,
+        PipelineMetrics(),
+        s3_read_concurrency=8,
+        s3_read_part_threads=4,
+        s3_read_hedge_percentile=95,
+    )
+
+    read_client_config = data_manager._read_client.meta.client.meta.config  # type: ignore
+    assert read_client_config.max_pool_connections == 48
+    data_manager.close()
@@ -0,0 +1,181 @@
+from threading import Event
+from typing import List, Optional
+from unittest import mock
+
+import pytest
+
+from prmreportsgenerator.io.adaptive_concurrency import AdaptiveConcurrencyLimit
+from prmreportsgenerator.io.hedged_requests import (
+    HedgedRequests,
+    LatencyPercentile,
+    logger,
+    size_class,
+)
+from prmreportsgenerator.metrics.pipeline_metrics import PipelineMetrics
+
+
+def _metric_values(metrics: PipelineMetrics) -> dict:
+    return {metric.name: metric.value for metric in metrics.metrics()}
+
+
+def _learn_deadline(
+    hedged_requests: HedgedRequests, samples: int = 5, size_bytes: Optional[int] = None
+):
+    for _ in range(samples):
+        hedged_requests.call("s3://bucket/fast.parquet", lambda: "fast", size_bytes=size_bytes)
+
+
+def test_latency_percentile_is_unknown_until_enough_samples():
+    latency_percentile = LatencyPercentile(percentile=95, min_samples=3)
+
+    latency_percentile.record(0.1)
+    latency_percentile.record(0.2)
+
+    assert latency_percentile.value() is None
+
+
+def test_latency_percentile_returns_nearest_rank_of_recent_latencies():
+    latency_percentile = LatencyPercentile(percentile=90, min_samples=1, max_samples=10)
+
+    for latency in range(100):
+        latency_percentile.record(float(latency))
+
+    assert latency_percentile.value() == 98.0
+    assert LatencyPercentile(percentile=50, min_samples=1).value() is None
+
+
+def test_does_not_hedge_requests_that_finish_within_deadline():
+    metrics = PipelineMetrics()
+    hedged_requests = HedgedRequests(max_workers=2, metrics=metrics)
+
+    _learn_deadline(hedged_requests)
+    actual = hedged_requests.call("s3://bucket/a.parquet", lambda: "body")
+
+    assert actual == "body"
+    assert "hedged_requests" not in _metric_values(metrics)
+
+
+def test_hedge_that_finishes_first_wins_and_time_saved_is_recorded():
+    metrics = PipelineMetrics()
+    hedged_requests = HedgedRequests(max_workers=2, metrics=metrics)
+    release_primary = Event()
+    primary_finished = Event()
+    attempts: List[int] = []
+
+    def straggling_request():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            release_primary.wait(timeout=5)
+            primary_finished.set()
+            return "primary"
+        return "hedge"
+
+    _learn_deadline(hedged_requests)
+    with mock.patch.object(logger, "info") as mock_log_info:
+        actual = hedged_requests.call("s3://bucket/slow.parquet", straggling_request)
+    release_primary.set()
+    primary_finished.wait(timeout=5)
+    hedged_requests.close()
+
+    assert actual == "hedge"
+    assert mock_log_info.call_args.kwargs["extra"]["event"] == "HEDGED_S3_REQUEST"
+    assert mock_log_info.call_args.kwargs["extra"]["object_uri"] == "s3://bucket/slow.parquet"
+    metric_values = _metric_values(metrics)
+    assert metric_values["hedged_requests"] == 1
+    assert metric_values["hedged_requests_won"] == 1
+    assert metric_values["hedged_requests_seconds_saved"] >= 0
+
+
+def test_uses_other_request_when_first_to_finish_fails():
+    hedged_requests = HedgedRequests(max_workers=2)
+    release_primary = Event()
+    attempts: List[int] = []
+
+    def failing_hedge_request():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            release_primary.wait(timeout=5)
+            return "primary"
+        release_primary.set()
+        raise ConnectionError("hedge failed")
+
+    _learn_deadline(hedged_requests)
+    actual = hedged_requests.call("s3://bucket/slow.parquet", failing_hedge_request)
+
+    assert actual == "primary"
+
+
+def test_raises_error_when_request_fails_before_deadline():
+    hedged_requests = HedgedRequests(max_workers=2)
+
+    def failing_request():
+        raise FileNotFoundError("s3://bucket/missing.parquet")
+
+    _learn_deadline(hedged_requests)
+    with pytest.raises(FileNotFoundError):
+        hedged_requests.call("s3://bucket/missing.parquet", failing_request)
+
+
+def test_objects_within_a_factor_of_four_share_a_size_class():
+    assert size_class(1000) == size_class(2000)
+    assert size_class(1000) != size_class(100_000_000)
+    assert size_class(None) is None
+
+
+def test_does_not_hedge_requests_in_a_size_class_without_a_learned_deadline():
+    metrics = PipelineMetrics()
+    hedged_requests = HedgedRequests(max_workers=2, metrics=metrics)
+    slow_request = mock.Mock(return_value="body")
+
+    _learn_deadline(hedged_requests, size_bytes=1000)
+    actual = hedged_requests.call("s3://bucket/a.parquet", slow_request, size_bytes=100_000_000)
+
+    assert actual == "body"
+    assert "hedged_requests" not in _metric_values(metrics)
+
+
+def test_skips_hedge_when_concurrency_limit_has_no_free_slot():
+    metrics = PipelineMetrics()
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=1)
+    hedged_requests = HedgedRequests(
+        max_workers=2, metrics=metrics, concurrency_limit=concurrency_limit
+    )
+    release_primary = Event()
+    attempts: List[int] = []
+
+    def straggling_request():
+        attempts.append(len(attempts))
+        release_primary.wait(timeout=0.5)
+        return "primary"
+
+    _learn_deadline(hedged_requests)
+    with concurrency_limit.slot():
+        actual = hedged_requests.call("s3://bucket/slow.parquet", straggling_request)
+
+    assert actual == "primary"
+    assert attempts == [0]
+    assert _metric_values(metrics)["hedged_requests_skipped"] == 1
+
+
+def test_hedge_holds_a_concurrency_slot_until_it_finishes():
+    concurrency_limit = AdaptiveConcurrencyLimit(max_limit=2, initial_limit=2)
+    hedged_requests = HedgedRequests(max_workers=2, concurrency_limit=concurrency_limit)
+    release_primary = Event()
+    attempts: List[int] = []
+
+    def straggling_request():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            release_primary.wait(timeout=5)
+            return "primary"
+        return "hedge"
+
+    _learn_deadline(hedged_requests)
+    with concurrency_limit.slot():
+        actual = hedged_requests.call("s3://bucket/slow.parquet", straggling_request)
+    release_primary.set()
+    hedged_requests.close()
+
+    assert actual == "hedge"
+    assert concurrency_limit.try_acquire()
+    assert concurrency_limit.try_acquire()
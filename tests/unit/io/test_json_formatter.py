@@ -1,10 +1,17 @@
 import json
+import random
+from datetime import datetime
 from logging import makeLogRecord
 
+import pytest
+
 from prmreportsgenerator.io.json_formatter import JsonFormatter
 
 
-def test_json_formatter_correctly_formats_record():
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_formatter_correctly_formats_record(use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
 
     record = makeLogRecord(
         {
@@ -26,7 +33,52 @@ def test_json_formatter_correctly_formats_record():
         "tuple_field": [[2021, 7], [2021, 6]],
     }
 
-    actual_json_string = JsonFormatter().format(record)
+    actual_json_string = JsonFormatter(use_orjson=use_orjson).format(record)
     actual = json.loads(actual_json_string)
 
     assert actual == expected
+
+
+def test_json_formatter_filters_extra_fields_per_record():
+    formatter = JsonFormatter()
+    first_record = makeLogRecord({"msg": "first", "created": 0.0, "first_field": 1})
+    second_record = makeLogRecord({"msg": "second", "created": 0.0, "second_field": 2})
+
+    first = json.loads(formatter.format(first_record))
+    second = json.loads(formatter.format(second_record))
+
+    assert first["first_field"] == 1
+    assert "second_field" not in first
+    assert second["second_field"] == 2
+    assert "first_field" not in second
+
+
+def test_json_formatter_falls_back_to_json_module_for_values_orjson_cannot_serialise():
+    pytest.importorskip("orjson")
+    record = makeLogRecord({"msg": "a message", "created": 0.0, "big_number": 2**70})
+
+    actual = json.loads(JsonFormatter(use_orjson=True).format(record))
+
+    assert actual["big_number"] == 2**70
+
+
+def test_json_formatter_time_matches_utc_isoformat():
+    formatter = JsonFormatter()
+    created_times = [1607965513.0, 1607965513.9999996, 1607965514.0000004] + [
+        random.uniform(0, 2_000_000_000) for _ in range(1000)
+    ]
+
+    for created in created_times:
+        record = makeLogRecord({"msg": "a message", "created": created})
+        expected = datetime.utcfromtimestamp(created).isoformat()
+
+        assert json.loads(formatter.format(record))["time"] == expected
+
+
+def test_json_formatter_uses_json_module_when_orjson_is_not_installed(monkeypatch):
+    monkeypatch.setattr("prmreportsgenerator.io.json_formatter.orjson", None)
+    record = makeLogRecord({"msg": "a message", "created": 0.0, "extra_field": "some_value"})
+
+    actual = json.loads(JsonFormatter(use_orjson=True).format(record))
+
+    assert actual["extra_field"] == "some_value"
@@ -0,0 +1,76 @@
+import gzip
+from io import BytesIO
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from prmreportsgenerator.io.output_encoder import write_outputs
+from prmreportsgenerator.output_format import OutputFormat
+
+
+class _UnclosedBytesIO(BytesIO):
+    def close(self):
+        self.closed_by_writer = True
+
+
+def _a_table():
+    return pa.table(
+        {"Fruit": ["Banana", "Strawberry"] * 1000, "Quantity": list(range(2000))},
+    )
+
+
+def _write(table, output_formats, **kwargs):
+    sinks = {output_format: _UnclosedBytesIO() for output_format in output_formats}
+    write_outputs(table, sinks, chunk_size_bytes=1024, **kwargs)
+    return sinks
+
+
+def _expected_csv(table):
+    return _write(table, [OutputFormat.CSV])[OutputFormat.CSV].getvalue()
+
+
+def test_writes_csv_header_and_rows():
+    table = pa.table({"Fruit": ["Banana"], "Quantity": [2]})
+
+    sinks = _write(table, [OutputFormat.CSV])
+
+    assert sinks[OutputFormat.CSV].getvalue() == b'"Fruit","Quantity"\n"Banana",2\n'
+
+
+def test_gzip_csv_decompresses_to_same_bytes_as_csv():
+    table = _a_table()
+
+    sinks = _write(table, [OutputFormat.CSV, OutputFormat.CSV_GZIP])
+
+    actual = gzip.decompress(sinks[OutputFormat.CSV_GZIP].getvalue())
+
+    assert actual == sinks[OutputFormat.CSV].getvalue()
+
+
+@pytest.mark.parametrize("csv_encoding_threads", [1, 3])
+def test_zstd_csv_decompresses_to_same_bytes_as_csv(csv_encoding_threads):
+    table = _a_table()
+
+    sinks = _write(table, [OutputFormat.CSV_ZSTD], csv_encoding_threads=csv_encoding_threads)
+
+    compressed = pa.BufferReader(sinks[OutputFormat.CSV_ZSTD].getvalue())
+    actual = pa.CompressedInputStream(compressed, "zstd").read()
+
+    assert actual == _expected_csv(table)
+
+
+def test_writes_parquet_that_round_trips():
+    table = _a_table()
+
+    sinks = _write(table, [OutputFormat.PARQUET])
+
+    actual = pq.read_table(BytesIO(sinks[OutputFormat.PARQUET].getvalue()))
+
+    assert actual == table
+
+
+def test_closes_every_sink():
+    sinks = _write(_a_table(), list(OutputFormat))
+
+    assert all(sink.closed_by_writer for sink in sinks.values())
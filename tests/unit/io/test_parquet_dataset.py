@@ -0,0 +1,64 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from pyarrow.fs import LocalFileSystem
+
+from prmreportsgenerator.io.parquet_dataset import read_parquet_dataset
+
+
+def _write_days(tmp_path, days):
+    paths = []
+    for day in days:
+        path = tmp_path / f"{day}.parquet"
+        table = pa.table({"day": [day] * 5, "row": list(range(5))})
+        pq.write_table(table, str(path), row_group_size=2)
+        paths.append(str(path))
+    return paths
+
+
+def test_reads_same_table_as_concatenating_files_in_order(tmp_path):
+    paths = _write_days(tmp_path, [3, 1, 2])
+
+    actual = read_parquet_dataset(paths, LocalFileSystem())
+
+    expected = pa.concat_tables([pq.read_table(path) for path in paths])
+
+    assert actual == expected
+
+
+def test_reads_only_projected_columns(tmp_path):
+    paths = _write_days(tmp_path, [1, 2])
+
+    actual = read_parquet_dataset(paths, LocalFileSystem(), columns=["day"])
+
+    assert actual.column_names == ["day"]
+    assert actual["day"].to_pylist() == [1] * 5 + [2] * 5
+
+
+def test_raises_file_not_found_when_a_file_is_missing(tmp_path):
+    paths = _write_days(tmp_path, [1]) + [str(tmp_path / "2.parquet")]
+
+    with pytest.raises(FileNotFoundError):
+        read_parquet_dataset(paths, LocalFileSystem())
+
+
+def test_unifies_schema_when_first_file_is_missing_a_column(tmp_path):
+    old_path, new_path = str(tmp_path / "1.parquet"), str(tmp_path / "2.parquet")
+    pq.write_table(pa.table({"day": pa.array([1], pa.int32())}), old_path)
+    pq.write_table(pa.table({"day": pa.array([2], pa.int64()), "status": ["ok"]}), new_path)
+
+    actual = read_parquet_dataset([old_path, new_path], LocalFileSystem())
+
+    expected = pa.table({"day": pa.array([1, 2], pa.int64()), "status": [None, "ok"]})
+
+    assert actual == expected
+
+
+def test_reads_with_given_schema(tmp_path):
+    paths = _write_days(tmp_path, [1])
+    schema = pa.schema([("day", pa.int64()), ("row", pa.int64()), ("status", pa.string())])
+
+    actual = read_parquet_dataset(paths, LocalFileSystem(), schema=schema)
+
+    assert actual.schema == schema
+    assert actual["status"].to_pylist() == [None] * 5
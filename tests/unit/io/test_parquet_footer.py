@@ -0,0 +1,114 @@
+from io import BytesIO
+from typing import List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from prmreportsgenerator.io.parquet_footer import (
+    FetchedRanges,
+    coalesce_ranges,
+    column_chunk_ranges,
+    footer_size,
+    parse_footer,
+)
+
+
+def _a_parquet_file() -> bytes:
+    buffer = BytesIO()
+    pq.write_table(pa.table({"fruit": ["mango", "lemon"] * 50}), buffer, row_group_size=10)
+    return buffer.getvalue()
+
+
+def test_parses_footer_from_end_of_file():
+    parquet_file = _a_parquet_file()
+
+    footer_start = len(parquet_file) - footer_size(parquet_file)
+
+    actual = parse_footer(parquet_file[footer_start:])
+
+    assert actual.num_rows == 100
+    assert actual.num_row_groups == 10
+    assert actual.schema.to_arrow_schema() == pa.schema([("fruit", pa.string())])
+
+
+def test_footer_size_includes_length_and_magic_bytes():
+    parquet_file = _a_parquet_file()
+
+    actual = footer_size(parquet_file)
+
+    assert actual == pq.read_metadata(BytesIO(parquet_file)).serialized_size + 8
+
+
+def test_raises_error_for_file_that_is_not_parquet():
+    with pytest.raises(ValueError, match="Not a Parquet file"):
+        parse_footer(b"fruit\nmango\n")
+
+
+def test_raises_error_when_end_of_file_does_not_hold_whole_footer():
+    parquet_file = _a_parquet_file()
+
+    with pytest.raises(ValueError, match="incomplete"):
+        parse_footer(parquet_file[-20:])
+
+
+def test_column_chunk_ranges_read_back_only_the_given_column():
+    buffer = BytesIO()
+    table = pa.table({"fruit": ["mango", "lemon"] * 50, "count": list(range(100))})
+    pq.write_table(table, buffer, row_group_size=50)
+    parquet_file = buffer.getvalue()
+    metadata = pq.ParquetFile(BytesIO(parquet_file)).metadata
+
+    ranges = column_chunk_ranges(metadata, ["count"])
+    only_column_chunks = bytearray(len(parquet_file))
+    for start, end in ranges:
+        only_column_chunks[start:end] = parquet_file[start:end]
+    actual = pq.ParquetFile(BytesIO(only_column_chunks), metadata=metadata).read(columns=["count"])
+
+    assert len(ranges) == 2
+    assert actual == table.select(["count"])
+
+
+def test_coalesce_ranges_merges_ranges_within_gap():
+    ranges = [(300, 400), (0, 100), (110, 200), (1000, 1100)]
+
+    actual = coalesce_ranges(ranges, max_gap_bytes=50)
+
+    assert actual == [(0, 200), (300, 400), (1000, 1100)]
+
+
+def _fetched_columns(body: bytes, columns: List[str]) -> FetchedRanges:
+    metadata = pq.read_metadata(BytesIO(body))
+    ranges = coalesce_ranges(column_chunk_ranges(metadata, columns), max_gap_bytes=0)
+    return FetchedRanges(len(body), ranges, [body[start:end] for start, end in ranges])
+
+
+def test_parquet_reader_reads_columns_from_fetched_ranges_only():
+    table = pa.table(
+        {
+            "fruit": ["mango", "lemon"] * 50,
+            "quantity": list(range(100)),
+            "codes": [[1, 2], None] * 50,
+        }
+    )
+    buffer = BytesIO()
+    pq.write_table(table, buffer, row_group_size=10)
+    body = buffer.getvalue()
+    metadata = pq.read_metadata(BytesIO(body))
+
+    fetched = _fetched_columns(body, ["fruit", "codes"])
+    actual = pq.ParquetFile(pa.PythonFile(fetched, mode="r"), metadata=metadata).read(
+        columns=["fruit", "codes"]
+    )
+
+    assert actual == table.select(["fruit", "codes"])
+
+
+def test_fetched_ranges_raise_for_bytes_not_downloaded():
+    fetched = FetchedRanges(100, [(10, 20)], [b"x" * 10])
+
+    fetched.seek(15)
+    assert fetched.read(10) == b"xxxxx"
+    fetched.seek(50)
+    with pytest.raises(ValueError):
+        fetched.read(1)
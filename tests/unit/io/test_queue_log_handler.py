@@ -0,0 +1,49 @@
+import logging
+
+from prmreportsgenerator.io.queue_log_handler import start_queue_logging
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_queued_records_are_handled_by_listener_without_modification():
+    handler = RecordingHandler()
+    queue_handler, listener = start_queue_logging(handler)
+    logger = logging.getLogger("test_queue_log_handler")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler)
+
+    try:
+        logger.info("Reading file from: %s", "a-uri", extra={"event": "AN_EVENT"})
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+
+    [record] = handler.records
+    assert record.msg == "Reading file from: %s"
+    assert record.args == ("a-uri",)
+    assert record.event == "AN_EVENT"
+
+
+def test_listener_respects_handler_level():
+    handler = RecordingHandler()
+    handler.setLevel(logging.ERROR)
+    queue_handler, listener = start_queue_logging(handler)
+    logger = logging.getLogger("test_queue_log_handler_level")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler)
+
+    try:
+        logger.info("an info message")
+        logger.error("an error message")
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+
+    assert [record.msg for record in handler.records] == ["an error message"]
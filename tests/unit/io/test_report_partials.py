@@ -0,0 +1,32 @@
+import pyarrow as pa
+
+from prmreportsgenerator.io.report_partials import InMemoryReportPartials, SpilledReportPartials
+
+
+def test_in_memory_report_partials_returns_partials_in_order():
+    partials = [pa.table({"count": [1, 2]}), pa.table({"count": [3]})]
+
+    with InMemoryReportPartials() as report_partials:
+        for partial in partials:
+            report_partials.append(partial)
+
+        assert report_partials.tables() == partials
+
+
+def test_spilled_report_partials_reads_back_partials_in_order(tmp_path):
+    partials = [pa.table({"fruit": ["mango", "lemon"]}), pa.table({"fruit": ["apple"]})]
+
+    with SpilledReportPartials(directory=str(tmp_path)) as report_partials:
+        for partial in partials:
+            report_partials.append(partial)
+
+        assert report_partials.tables() == partials
+        assert report_partials.spilled_bytes > 0
+        assert len(list(tmp_path.glob("report-partials-*/*.arrow"))) == 2
+
+
+def test_spilled_report_partials_removes_spill_files_when_closed(tmp_path):
+    with SpilledReportPartials(directory=str(tmp_path)) as report_partials:
+        report_partials.append(pa.table({"fruit": ["mango"]}))
+
+    assert list(tmp_path.iterdir()) == []
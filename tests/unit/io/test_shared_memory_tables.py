@@ -0,0 +1,109 @@
+import errno
+import os
+import socket
+import subprocess
+import sys
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+
+from prmreportsgenerator.io.shared_memory_tables import (
+    SharedTableSegments,
+    read_shared_table,
+    remove_stale_segments,
+    write_shared_table,
+)
+
+
+def test_reads_back_shared_table_and_removes_its_file(tmp_path):
+    table = pa.table({"fruit": ["mango", "lemon"], "count": [1, 2]})
+
+    path = write_shared_table(table, str(tmp_path))
+    actual = read_shared_table(path)
+
+    assert actual == table
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_reading_shared_table_maps_rather_than_copies_it(tmp_path):
+    path = write_shared_table(pa.table({"count": list(range(100_000))}), str(tmp_path))
+
+    allocated_before = pa.total_allocated_bytes()
+    actual = read_shared_table(path)
+
+    assert pa.total_allocated_bytes() == allocated_before
+    assert actual.num_rows == 100_000
+
+
+def test_segments_directory_is_removed_on_exit(tmp_path):
+    with SharedTableSegments(directory=str(tmp_path)) as segments:
+        write_shared_table(pa.table({"count": [1]}), segments.directory)
+        assert len(list(tmp_path.iterdir())) == 1
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_segments_directory_is_removed_when_workers_fail(tmp_path):
+    with pytest.raises(RuntimeError):
+        with SharedTableSegments(directory=str(tmp_path)) as segments:
+            write_shared_table(pa.table({"count": [1]}), segments.directory)
+            raise RuntimeError("worker failed")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_removes_segments_left_by_processes_no_longer_running(tmp_path):
+    finished_process = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished_process.wait()
+    hostname = socket.gethostname()
+    stale = tmp_path / f"shared-tables-{hostname}-{finished_process.pid}-abc"
+    live = tmp_path / f"shared-tables-{hostname}-{os.getpid()}-def"
+    other_host = tmp_path / f"shared-tables-another-host-{finished_process.pid}-ghi"
+    unrelated = tmp_path / "other"
+    for directory in [stale, live, other_host, unrelated]:
+        directory.mkdir()
+
+    remove_stale_segments(str(tmp_path))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [live.name, other_host.name, unrelated.name]
+    )
+
+
+def test_writes_shared_table_to_fallback_directory_when_directory_is_full(tmp_path):
+    full_directory = tmp_path / "full"
+    fallback_directory = tmp_path / "fallback"
+    full_directory.mkdir()
+    fallback_directory.mkdir()
+    table = pa.table({"count": [1, 2]})
+    real_os_file = pa.OSFile
+
+    def os_file(path, mode):
+        if path.startswith(str(full_directory)):
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return real_os_file(path, mode)
+
+    with mock.patch("prmreportsgenerator.io.shared_memory_tables.pa.OSFile", side_effect=os_file):
+        path = write_shared_table(table, str(full_directory), str(fallback_directory))
+
+    assert os.path.dirname(path) == str(fallback_directory)
+    assert read_shared_table(path) == table
+
+
+def test_raises_when_directory_is_full_without_fallback(tmp_path):
+    with mock.patch(
+        "prmreportsgenerator.io.shared_memory_tables.pa.OSFile",
+        side_effect=OSError(errno.ENOSPC, "No space left on device"),
+    ):
+        with pytest.raises(OSError):
+            write_shared_table(pa.table({"count": [1]}), str(tmp_path))
+
+
+def test_segments_have_a_fallback_directory_in_temp_directory(tmp_path):
+    with SharedTableSegments(directory=str(tmp_path)) as segments:
+        fallback_directory = segments.fallback_directory
+        assert fallback_directory is not None
+        assert os.path.isdir(fallback_directory)
+
+    assert not os.path.exists(fallback_directory)
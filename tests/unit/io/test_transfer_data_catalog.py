@@ -0,0 +1,77 @@
+from unittest.mock import Mock
+
+from prmreportsgenerator.io.data_manager import ListedObject
+from prmreportsgenerator.io.reports_io import ReportsIO, ReportsS3UriResolver
+from prmreportsgenerator.io.transfer_data_catalog import TransferDataCatalog
+
+_MARCH_PREFIX = "s3://bucket/v11/cutoff-14/2021/03/"
+_APRIL_PREFIX = "s3://bucket/v11/cutoff-14/2021/04/"
+
+
+def _a_daily_uri(month: int, day: int) -> str:
+    return (
+        f"s3://bucket/v11/cutoff-14/2021/{month:02d}/{day:02d}/2021-{month:02d}-{day:02d}.parquet"
+    )
+
+
+def _a_listed_object(uri: str, size_bytes: int = 100) -> ListedObject:
+    return ListedObject(uri=uri, size_bytes=size_bytes, etag="etag")
+
+
+def _a_catalog(data_manager) -> TransferDataCatalog:
+    return TransferDataCatalog(
+        data_manager, listing_prefix=ReportsS3UriResolver.transfer_data_month_prefix
+    )
+
+
+def test_lists_each_month_once_for_all_its_days():
+    data_manager = Mock()
+    data_manager.list_objects.side_effect = lambda prefix: {
+        _MARCH_PREFIX: [_a_listed_object(_a_daily_uri(3, 1)), _a_listed_object(_a_daily_uri(3, 2))],
+        _APRIL_PREFIX: [_a_listed_object(_a_daily_uri(4, 1))],
+    }[prefix]
+    catalog = _a_catalog(data_manager)
+
+    actual = catalog.listed_objects(
+        [_a_daily_uri(3, 1), _a_daily_uri(3, 2), _a_daily_uri(3, 3), _a_daily_uri(4, 1)],
+        max_workers=2,
+    )
+
+    assert actual == [
+        _a_listed_object(_a_daily_uri(3, 1)),
+        _a_listed_object(_a_daily_uri(3, 2)),
+        None,
+        _a_listed_object(_a_daily_uri(4, 1)),
+    ]
+    assert sorted(call.args[0] for call in data_manager.list_objects.call_args_list) == [
+        _MARCH_PREFIX,
+        _APRIL_PREFIX,
+    ]
+
+
+def test_keeps_listings_for_the_run_unless_refreshed():
+    data_manager = Mock()
+    data_manager.list_objects.side_effect = [[], [_a_listed_object(_a_daily_uri(3, 1))]]
+    catalog = _a_catalog(data_manager)
+
+    first = catalog.listed_objects([_a_daily_uri(3, 1)], max_workers=1)
+    cached = catalog.listed_objects([_a_daily_uri(3, 1)], max_workers=1)
+    refreshed = catalog.listed_objects([_a_daily_uri(3, 1)], max_workers=1, refresh=True)
+
+    assert first == cached == [None]
+    assert refreshed == [_a_listed_object(_a_daily_uri(3, 1))]
+    assert data_manager.list_objects.call_count == 2
+
+
+def test_reports_io_uses_catalog_for_sizes_instead_of_head_requests():
+    data_manager = Mock()
+    data_manager.list_objects.return_value = [_a_listed_object(_a_daily_uri(3, 1), 42)]
+    reports_io = ReportsIO(data_manager=data_manager, catalog=_a_catalog(data_manager))
+
+    actual = reports_io.object_sizes([_a_daily_uri(3, 1), _a_daily_uri(3, 2)], max_workers=4)
+
+    assert actual == [42, None]
+    assert reports_io.object_exists(_a_daily_uri(3, 1))
+    data_manager.object_size.assert_not_called()
+    data_manager.exists.assert_not_called()
+    data_manager.list_objects.assert_called_once_with(_MARCH_PREFIX)
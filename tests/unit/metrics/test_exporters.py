@@ -0,0 +1,120 @@
+from unittest import mock
+
+import pytest
+
+from prmreportsgenerator.metrics.exporters import (
+    CloudWatchEmfExporter,
+    PrometheusTextfileExporter,
+    UnknownMetricsExporter,
+    create_metrics_exporters,
+    logger,
+)
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit
+
+SOME_METRICS = [
+    Metric(name="run_duration_seconds", value=1.5, unit=MetricUnit.SECONDS),
+    Metric(name="bytes_read", value=2048, unit=MetricUnit.BYTES),
+]
+SOME_DIMENSIONS = {"report-name": "TRANSFER_DETAILS_BY_HOUR", "cutoff-days": "14"}
+
+
+def test_cloudwatch_exporter_logs_metrics_in_embedded_metric_format():
+    exporter = CloudWatchEmfExporter(namespace="a-namespace", clock=lambda: 1607965513.358)
+
+    with mock.patch.object(logger, "info") as mock_log_info:
+        exporter.export(SOME_METRICS, SOME_DIMENSIONS)
+
+    mock_log_info.assert_called_once_with(
+        "Pipeline metrics",
+        extra={
+            "event": "PIPELINE_METRICS",
+            "_aws": {
+                "Timestamp": 1607965513358,
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": "a-namespace",
+                        "Dimensions": [["report-name", "cutoff-days"]],
+                        "Metrics": [
+                            {"Name": "run_duration_seconds", "Unit": "Seconds"},
+                            {"Name": "bytes_read", "Unit": "Bytes"},
+                        ],
+                    }
+                ],
+            },
+            "report-name": "TRANSFER_DETAILS_BY_HOUR",
+            "cutoff-days": "14",
+            "run_duration_seconds": 1.5,
+            "bytes_read": 2048,
+        },
+    )
+
+
+def test_prometheus_exporter_writes_textfile(tmp_path):
+    path = tmp_path / "reports_generator.prom"
+    exporter = PrometheusTextfileExporter(path=str(path))
+
+    exporter.export(SOME_METRICS, SOME_DIMENSIONS)
+
+    expected = (
+        "# TYPE prmreportsgenerator_bytes_read gauge\n"
+        'prmreportsgenerator_bytes_read{cutoff_days="14",report_name="TRANSFER_DETAILS_BY_HOUR"} '
+        "2048\n"
+        "# TYPE prmreportsgenerator_run_duration_seconds gauge\n"
+        "prmreportsgenerator_run_duration_seconds"
+        '{cutoff_days="14",report_name="TRANSFER_DETAILS_BY_HOUR"} 1.5\n'
+    )
+
+    assert path.read_text() == expected
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_prometheus_exporter_replaces_existing_textfile(tmp_path):
+    path = tmp_path / "reports_generator.prom"
+    path.write_text("stale")
+    exporter = PrometheusTextfileExporter(path=str(path))
+
+    exporter.export(SOME_METRICS[:1], {})
+
+    expected = (
+        "# TYPE prmreportsgenerator_run_duration_seconds gauge\n"
+        "prmreportsgenerator_run_duration_seconds 1.5\n"
+    )
+
+    assert path.read_text() == expected
+
+
+def test_prometheus_exporter_escapes_label_values(tmp_path):
+    path = tmp_path / "reports_generator.prom"
+    exporter = PrometheusTextfileExporter(path=str(path))
+
+    exporter.export(SOME_METRICS[:1], {"build-tag": 'a\\b"c\nd'})
+
+    expected = (
+        "# TYPE prmreportsgenerator_run_duration_seconds gauge\n"
+        'prmreportsgenerator_run_duration_seconds{build_tag="a\\\\b\\"c\\nd"} 1.5\n'
+    )
+
+    assert path.read_text() == expected
+
+
+def test_create_metrics_exporters_returns_no_exporters_when_not_configured():
+    assert create_metrics_exporters(None, "a-namespace", None) == []
+
+
+def test_create_metrics_exporters_given_comma_separated_names():
+    exporters = create_metrics_exporters("cloudwatch, Prometheus", "a-namespace", "/tmp/a.prom")
+
+    assert isinstance(exporters[0], CloudWatchEmfExporter)
+    assert isinstance(exporters[1], PrometheusTextfileExporter)
+
+
+def test_create_metrics_exporters_requires_textfile_path_for_prometheus():
+    with pytest.raises(ValueError):
+        create_metrics_exporters("prometheus", "a-namespace", None)
+
+
+def test_create_metrics_exporters_raises_for_unknown_exporter():
+    with pytest.raises(UnknownMetricsExporter) as e:
+        create_metrics_exporters("statsd", "a-namespace", None)
+
+    assert str(e.value) == "Unknown metrics exporter: statsd"
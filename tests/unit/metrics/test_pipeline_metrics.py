@@ -0,0 +1,56 @@
+from unittest.mock import Mock
+
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit, PipelineMetrics
+
+
+def test_records_metric():
+    metrics = PipelineMetrics()
+
+    metrics.record("rows_processed", 10, MetricUnit.COUNT)
+
+    assert metrics.metrics() == [Metric(name="rows_processed", value=10, unit=MetricUnit.COUNT)]
+
+
+def test_record_overwrites_previous_value():
+    metrics = PipelineMetrics()
+
+    metrics.record("rows_processed", 10, MetricUnit.COUNT)
+    metrics.record("rows_processed", 20, MetricUnit.COUNT)
+
+    assert metrics.metrics() == [Metric(name="rows_processed", value=20, unit=MetricUnit.COUNT)]
+
+
+def test_increment_accumulates_values():
+    metrics = PipelineMetrics()
+
+    metrics.increment("bytes_read", 100, MetricUnit.BYTES)
+    metrics.increment("bytes_read", 50, MetricUnit.BYTES)
+
+    assert metrics.metrics() == [Metric(name="bytes_read", value=150, unit=MetricUnit.BYTES)]
+
+
+def test_time_phase_records_duration_in_seconds():
+    clock = Mock(side_effect=[10.0, 12.5])
+    metrics = PipelineMetrics(clock=clock)
+
+    with metrics.time_phase("read_transfers"):
+        pass
+
+    assert metrics.metrics() == [
+        Metric(name="read_transfers_duration_seconds", value=2.5, unit=MetricUnit.SECONDS)
+    ]
+
+
+def test_time_phase_records_duration_when_phase_raises():
+    clock = Mock(side_effect=[10.0, 11.0])
+    metrics = PipelineMetrics(clock=clock)
+
+    try:
+        with metrics.time_phase("run"):
+            raise ValueError("failed")
+    except ValueError:
+        pass
+
+    assert metrics.metrics() == [
+        Metric(name="run_duration_seconds", value=1.0, unit=MetricUnit.SECONDS)
+    ]
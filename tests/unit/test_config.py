@@ -4,10 +4,13 @@ import pytest
 from dateutil.tz import tzutc
 
 from prmreportsgenerator.config import (
+    CompactionConfig,
     InvalidEnvironmentVariableValue,
     MissingEnvironmentVariable,
     PipelineConfig,
 )
+from prmreportsgenerator.missing_transfer_data import MissingTransferDataPolicy
+from prmreportsgenerator.output_format import OutputFormat
 from prmreportsgenerator.report_name import ReportName
 from tests.builders.common import a_string
 
@@ -27,6 +30,38 @@ def test_reads_from_environment_variables_and_converts_to_required_format():
         "REPORT_NAME": ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY.value,
         "ALERT_ENABLED": "True",
         "SEND_EMAIL_NOTIFICATION": "True",
+        "METRICS_EXPORTERS": "cloudwatch,prometheus",
+        "METRICS_NAMESPACE": "a-namespace",
+        "PROMETHEUS_TEXTFILE_PATH": "/metrics/reports_generator.prom",
+        "LOCAL_DATA_DIRECTORY": "/data",
+        "S3_UPLOAD_PART_SIZE_BYTES": "16777216",
+        "CSV_ENCODING_THREADS": "4",
+        "OUTPUT_FORMATS": "csv,csv_zstd, parquet",
+        "OUTPUT_PARTITION_COLUMN": "Sub ICB Location ODS",
+        "OUTPUT_PARTITION_UPLOAD_THREADS": "8",
+        "READ_COMPACTED_TRANSFER_DATA": "true",
+        "READ_TRANSFERS_AS_DATASET": "true",
+        "VALIDATE_TRANSFER_DATA": "true",
+        "TRANSFER_FOOTER_READ_THREADS": "16",
+        "DRY_RUN": "true",
+        "MEMORY_BUDGET": "1073741824",
+        "SPILL_DIRECTORY": "/tmp/spill",
+        "METRICS_ONLY": "true",
+        "TRANSFER_READ_CONCURRENCY": "8",
+        "S3_READ_MAX_ATTEMPTS": "3",
+        "HEDGE_S3_READS": "true",
+        "S3_READ_HEDGE_PERCENTILE": "90",
+        "S3_READ_PART_SIZE_BYTES": "16777216",
+        "S3_READ_PART_THREADS": "4",
+        "MISSING_TRANSFER_DATA_POLICY": "skip",
+        "MISSING_TRANSFER_DATA_WAIT_SECONDS": "600",
+        "MISSING_TRANSFER_DATA_POLL_SECONDS": "30",
+        "DISCOVER_TRANSFER_DATA_BY_LISTING": "true",
+        "DEDUPLICATE_CONVERSATIONS": "true",
+        "AGGREGATION_PROCESSES": "4",
+        "CPU_COUNT": "2",
+        "ARROW_IO_THREADS": "16",
+        "SHARED_TABLES_DIRECTORY": "/shared-tables",
     }
 
     expected_config = PipelineConfig(
@@ -46,6 +81,38 @@ def test_reads_from_environment_variables_and_converts_to_required_format():
         report_name=ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY,
         alert_enabled=True,
         send_email_notification=True,
+        metrics_exporters="cloudwatch,prometheus",
+        metrics_namespace="a-namespace",
+        prometheus_textfile_path="/metrics/reports_generator.prom",
+        local_data_directory="/data",
+        s3_upload_part_size_bytes=16777216,
+        csv_encoding_threads=4,
+        output_formats=[OutputFormat.CSV, OutputFormat.CSV_ZSTD, OutputFormat.PARQUET],
+        output_partition_column="Sub ICB Location ODS",
+        output_partition_upload_threads=8,
+        read_compacted_transfer_data=True,
+        read_transfers_as_dataset=True,
+        validate_transfer_data=True,
+        transfer_footer_read_threads=16,
+        dry_run=True,
+        memory_budget_bytes=1073741824,
+        spill_directory="/tmp/spill",
+        metrics_only=True,
+        transfer_read_concurrency=8,
+        s3_read_max_attempts=3,
+        hedge_s3_reads=True,
+        s3_read_hedge_percentile=90,
+        s3_read_part_size_bytes=16777216,
+        s3_read_part_threads=4,
+        missing_transfer_data_policy=MissingTransferDataPolicy.SKIP,
+        missing_transfer_data_wait_seconds=600,
+        missing_transfer_data_poll_seconds=30,
+        discover_transfer_data_by_listing=True,
+        deduplicate_conversations=True,
+        aggregation_processes=4,
+        cpu_count=2,
+        arrow_io_threads=16,
+        shared_tables_directory="/shared-tables",
     )
 
     actual_config = PipelineConfig.from_environment_variables(environment)
@@ -76,6 +143,35 @@ def test_read_config_from_environment_when_optional_parameters_are_not_set():
         report_name=ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY,
         alert_enabled=False,
         send_email_notification=True,
+        metrics_exporters=None,
+        metrics_namespace="PrmReportsGenerator",
+        prometheus_textfile_path=None,
+        local_data_directory=None,
+        s3_upload_part_size_bytes=None,
+        csv_encoding_threads=1,
+        output_formats=[OutputFormat.CSV],
+        output_partition_column=None,
+        output_partition_upload_threads=4,
+        read_compacted_transfer_data=False,
+        read_transfers_as_dataset=False,
+        validate_transfer_data=False,
+        transfer_footer_read_threads=8,
+        dry_run=False,
+        memory_budget_bytes=None,
+        spill_directory=None,
+        metrics_only=False,
+        transfer_read_concurrency=None,
+        s3_read_max_attempts=5,
+        hedge_s3_reads=False,
+        s3_read_hedge_percentile=95,
+        s3_read_part_size_bytes=None,
+        s3_read_part_threads=8,
+        missing_transfer_data_policy=MissingTransferDataPolicy.FAIL,
+        missing_transfer_data_wait_seconds=3600,
+        missing_transfer_data_poll_seconds=300,
+        discover_transfer_data_by_listing=False,
+        deduplicate_conversations=False,
+        aggregation_processes=1,
     )
 
     actual_config = PipelineConfig.from_environment_variables(environment)
@@ -122,3 +218,74 @@ def test_error_from_environment_when_invalid_type_field_set():
     assert (
         str(e.value) == "Expected environment variable START_DATETIME value is invalid, exiting..."
     )
+
+
+def test_error_from_environment_when_unknown_output_format_set():
+    environment = {
+        "INPUT_TRANSFER_DATA_BUCKET": "input-transfer-data-bucket",
+        "OUTPUT_REPORTS_BUCKET": "output-reports-bucket",
+        "CONVERSATION_CUTOFF_DAYS": "14",
+        "BUILD_TAG": a_string(),
+        "REPORT_NAME": ReportName.TRANSFER_OUTCOMES_PER_SUPPLIER_PATHWAY.value,
+        "OUTPUT_FORMATS": "csv,xlsx",
+    }
+
+    with pytest.raises(InvalidEnvironmentVariableValue) as e:
+        PipelineConfig.from_environment_variables(environment)
+    assert (
+        str(e.value) == "Expected environment variable OUTPUT_FORMATS value is invalid, exiting..."
+    )
+
+
+def test_reads_compaction_config_from_environment_variables():
+    environment = {
+        "BUILD_TAG": "61ad1e1c",
+        "INPUT_TRANSFER_DATA_BUCKET": "input-transfer-data-bucket",
+        "CONVERSATION_CUTOFF_DAYS": "14",
+        "COMPACTION_MONTH": "2020-02",
+        "S3_ENDPOINT_URL": "a_url",
+        "COMPACTION_SORT_COLUMN": "requesting_practice_ods_code",
+        "COMPACTION_ROW_GROUP_SIZE": "50000",
+        "LOCAL_DATA_DIRECTORY": "/data",
+        "S3_UPLOAD_PART_SIZE_BYTES": "16777216",
+    }
+
+    expected_config = CompactionConfig(
+        build_tag="61ad1e1c",
+        input_transfer_data_bucket="input-transfer-data-bucket",
+        cutoff_days=14,
+        month=datetime(year=2020, month=2, day=1),
+        s3_endpoint_url="a_url",
+        sort_column="requesting_practice_ods_code",
+        row_group_size=50000,
+        local_data_directory="/data",
+        s3_upload_part_size_bytes=16777216,
+    )
+
+    actual_config = CompactionConfig.from_environment_variables(environment)
+
+    assert actual_config == expected_config
+
+
+def test_read_compaction_config_when_optional_parameters_are_not_set():
+    environment = {
+        "BUILD_TAG": "61ad1e1c",
+        "INPUT_TRANSFER_DATA_BUCKET": "input-transfer-data-bucket",
+        "CONVERSATION_CUTOFF_DAYS": "14",
+    }
+
+    expected_config = CompactionConfig(
+        build_tag="61ad1e1c",
+        input_transfer_data_bucket="input-transfer-data-bucket",
+        cutoff_days=14,
+        month=None,
+        s3_endpoint_url=None,
+        sort_column="date_requested",
+        row_group_size=131072,
+        local_data_directory=None,
+        s3_upload_part_size_bytes=None,
+    )
+
+    actual_config = CompactionConfig.from_environment_variables(environment)
+
+    assert actual_config == expected_config
@@ -0,0 +1,88 @@
+import subprocess
+import sys
+from typing import Dict
+
+from prmreportsgenerator.domain.reports_generator.reports_generator_registry import (
+    load_reports_generator,
+)
+from prmreportsgenerator.domain.reports_generator.transfer_details_per_hour import (
+    TransferDetailsPerHourReportsGenerator,
+)
+from prmreportsgenerator.report_name import ReportName
+
+# Measured at around 40ms, the budget leaves headroom for slower CI machines
+IMPORT_TIME_BUDGET_MICROSECONDS = 150_000
+HEAVY_MODULES = ["boto3", "botocore", "pyarrow", "polars"]
+
+
+def _cumulative_import_times(statement: str) -> Dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def _imported_modules(statement: str) -> set:
+    result = subprocess.run(
+        [sys.executable, "-c", f"{statement}; import sys; print(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_main_does_not_import_heavy_modules():
+    import_times = _cumulative_import_times("import prmreportsgenerator.main")
+
+    assert [module for module in HEAVY_MODULES if module in import_times] == []
+
+
+def test_main_import_time_is_within_budget():
+    fastest_import_time = min(
+        _cumulative_import_times("import prmreportsgenerator.main")["prmreportsgenerator.main"]
+        for _ in range(3)
+    )
+
+    assert fastest_import_time < IMPORT_TIME_BUDGET_MICROSECONDS
+
+
+def test_reports_pipeline_does_not_import_reports_generators():
+    modules = _imported_modules("import prmreportsgenerator.reports_pipeline")
+
+    assert "polars" not in modules
+    assert "prmreportsgenerator.domain.reports_generator.transfer_details_per_hour" not in modules
+
+
+def test_loading_reports_generator_imports_only_the_requested_generator():
+    modules = _imported_modules(
+        "from prmreportsgenerator.domain.reports_generator.reports_generator_registry import "
+        "load_reports_generator; from prmreportsgenerator.report_name import ReportName; "
+        "load_reports_generator(ReportName.TRANSFER_DETAILS_BY_HOUR)"
+    )
+    generator_modules = {
+        module
+        for module in modules
+        if module.startswith("prmreportsgenerator.domain.reports_generator.transfer")
+        or module.startswith("prmreportsgenerator.domain.reports_generator.sub_icb")
+    }
+
+    assert generator_modules == {
+        "prmreportsgenerator.domain.reports_generator.transfer_details_per_hour"
+    }
+
+
+def test_load_reports_generator_returns_generator_for_report_name():
+    assert (
+        load_reports_generator(ReportName.TRANSFER_DETAILS_BY_HOUR)
+        == TransferDetailsPerHourReportsGenerator
+    )
@@ -0,0 +1,79 @@
+from unittest.mock import Mock
+
+from prmreportsgenerator.missing_transfer_data import (
+    MissingTransferDataError,
+    wait_for_transfer_data,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def test_wait_for_transfer_data_checks_only_files_still_missing_until_they_arrive():
+    clock = FakeClock()
+    find_missing = Mock(side_effect=[["s3://bucket/b.parquet"], []])
+
+    actual = wait_for_transfer_data(
+        ["s3://bucket/a.parquet", "s3://bucket/b.parquet"],
+        find_missing,
+        wait_seconds=600,
+        poll_seconds=60,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    assert actual == []
+    assert find_missing.call_args_list[1].args == (["s3://bucket/b.parquet"],)
+    assert clock.now == 120
+
+
+def test_wait_for_transfer_data_returns_files_still_missing_at_deadline():
+    clock = FakeClock()
+    find_missing = Mock(return_value=["s3://bucket/a.parquet"])
+
+    actual = wait_for_transfer_data(
+        ["s3://bucket/a.parquet"],
+        find_missing,
+        wait_seconds=150,
+        poll_seconds=60,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    assert actual == ["s3://bucket/a.parquet"]
+    assert find_missing.call_count == 3
+    assert clock.now == 150
+
+
+def test_wait_for_transfer_data_never_sleeps_a_negative_time_after_deadline_passes():
+    # the clock passes the deadline between the loop's check and working out the sleep
+    times = iter([0.0, 59.0, 59.0, 61.0])
+    sleep = Mock()
+
+    wait_for_transfer_data(
+        ["s3://bucket/a.parquet"],
+        Mock(return_value=["s3://bucket/a.parquet"]),
+        wait_seconds=60,
+        poll_seconds=60,
+        clock=lambda: next(times, 120.0),
+        sleep=sleep,
+    )
+
+    assert sleep.call_args.args == (0.0,)
+
+
+def test_missing_transfer_data_error_lists_missing_files():
+    error = MissingTransferDataError(["s3://bucket/a.parquet", "s3://bucket/b.parquet"])
+
+    assert str(error) == (
+        "2 transfer data files not found: s3://bucket/a.parquet, s3://bucket/b.parquet"
+    )
+    assert isinstance(error, FileNotFoundError)
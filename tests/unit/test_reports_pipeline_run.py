@@ -0,0 +1,38 @@
+from dataclasses import replace
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from dateutil.tz import UTC
+
+from prmreportsgenerator.metrics.pipeline_metrics import Metric, MetricUnit
+from prmreportsgenerator.reports_pipeline import ReportsPipeline, logger
+from tests.builders.pipeline_config import create_pipeline_config
+
+
+def _a_pipeline(tmp_path) -> ReportsPipeline:
+    config = create_pipeline_config(
+        start_datetime=datetime(2021, 3, 1, tzinfo=UTC),
+        end_datetime=datetime(2021, 3, 2, tzinfo=UTC),
+    )
+    return ReportsPipeline(replace(config, local_data_directory=str(tmp_path)))
+
+
+def test_run_records_error_metric_and_raises_its_error_when_export_fails(tmp_path):
+    exporter = mock.Mock()
+    exporter.export.side_effect = OSError("exporter unavailable")
+
+    with mock.patch(
+        "prmreportsgenerator.reports_pipeline.create_metrics_exporters", return_value=[exporter]
+    ):
+        pipeline = _a_pipeline(tmp_path)
+
+    with mock.patch.object(
+        pipeline, "_produce_report", side_effect=ValueError("report failed")
+    ), mock.patch.object(logger, "warning") as mock_log_warning:
+        with pytest.raises(ValueError, match="report failed"):
+            pipeline.run()
+
+    exported_metrics = exporter.export.call_args.args[0]
+    assert Metric(name="run_errors", value=1, unit=MetricUnit.COUNT) in exported_metrics
+    assert mock_log_warning.call_args.kwargs["extra"]["event"] == "FAILED_TO_EXPORT_METRICS"
@@ -0,0 +1,20 @@
+import pytest
+
+from prmreportsgenerator.reports_pipeline import ReportsPipeline
+
+
+@pytest.mark.parametrize(
+    "number_of_shards, expected",
+    [
+        (1, [["1", "2", "3", "4", "5"]]),
+        (2, [["1", "2", "3"], ["4", "5"]]),
+        (3, [["1", "2"], ["3", "4"], ["5"]]),
+        (8, [["1"], ["2"], ["3"], ["4"], ["5"]]),
+    ],
+)
+def test_shards_split_days_into_contiguous_runs(number_of_shards, expected):
+    assert ReportsPipeline._shards(["1", "2", "3", "4", "5"], number_of_shards) == expected
+
+
+def test_shards_an_empty_window_into_no_shards():
+    assert ReportsPipeline._shards([], 4) == []
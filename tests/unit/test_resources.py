@@ -0,0 +1,119 @@
+from dataclasses import replace
+from unittest import mock
+
+import pyarrow as pa
+import pytest
+
+from prmreportsgenerator.resources import (
+    apply_resource_limits,
+    resource_limits,
+    worker_resource_limits,
+)
+from tests.builders.pipeline_config import create_pipeline_config
+
+
+@pytest.fixture(autouse=True)
+def restore_arrow_thread_pools():
+    cpu_count, io_thread_count = pa.cpu_count(), pa.io_thread_count()
+    yield
+    pa.set_cpu_count(cpu_count)
+    pa.set_io_thread_count(io_thread_count)
+
+
+@pytest.fixture
+def host_with_eight_cpus():
+    with mock.patch("prmreportsgenerator.resources._host_cpu_count", return_value=8):
+        yield
+
+
+def test_caps_cpu_count_at_cgroup_cpu_limit_rounded_up(tmp_path, host_with_eight_cpus):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+    limits = resource_limits(create_pipeline_config(), str(tmp_path))
+
+    assert limits.cpu_count == 2
+    assert limits.cgroup_cpu_limit == 1.5
+
+
+def test_uses_host_cpu_count_without_cgroup_cpu_limit(tmp_path, host_with_eight_cpus):
+    limits = resource_limits(create_pipeline_config(), str(tmp_path))
+
+    assert limits.cpu_count == 8
+    assert limits.io_threads == 32
+
+
+def test_keeps_a_minimum_of_io_threads_for_few_cpus(tmp_path):
+    (tmp_path / "cpu.max").write_text("50000 100000\n")
+
+    limits = resource_limits(create_pipeline_config(), str(tmp_path))
+
+    assert limits.cpu_count == 1
+    assert limits.io_threads == 8
+
+
+def test_configured_counts_override_detected_limits(tmp_path, host_with_eight_cpus):
+    (tmp_path / "cpu.max").write_text("200000 100000\n")
+
+    limits = resource_limits(
+        replace(create_pipeline_config(), cpu_count=4, arrow_io_threads=6), str(tmp_path)
+    )
+
+    assert limits.cpu_count == 4
+    assert limits.io_threads == 6
+
+
+def test_sizes_polars_arrow_and_transfer_reads_consistently(tmp_path):
+    (tmp_path / "cpu.max").write_text("300000 100000\n")
+    env: dict = {}
+
+    config = apply_resource_limits(create_pipeline_config(), env, str(tmp_path))
+
+    assert env["POLARS_MAX_THREADS"] == str(pa.cpu_count())
+    assert pa.io_thread_count() == config.transfer_read_concurrency
+
+
+def test_keeps_configured_polars_threads_and_transfer_read_concurrency(tmp_path):
+    env = {"POLARS_MAX_THREADS": "3"}
+
+    config = apply_resource_limits(
+        replace(
+            create_pipeline_config(), cpu_count=2, arrow_io_threads=10, transfer_read_concurrency=5
+        ),
+        env,
+        str(tmp_path),
+    )
+
+    assert env["POLARS_MAX_THREADS"] == "3"
+    assert pa.cpu_count() == 2
+    assert pa.io_thread_count() == 10
+    assert config.transfer_read_concurrency == 5
+
+
+def test_splits_cpus_and_reads_between_worker_processes(tmp_path, host_with_eight_cpus):
+    config = worker_resource_limits(create_pipeline_config(), 3, str(tmp_path))
+
+    assert config.cpu_count == 2
+    assert config.arrow_io_threads == 10
+    assert config.transfer_read_concurrency == 10
+
+
+def test_gives_each_worker_process_at_least_one_thread(tmp_path):
+    config = worker_resource_limits(
+        replace(
+            create_pipeline_config(), cpu_count=2, arrow_io_threads=2, transfer_read_concurrency=2
+        ),
+        4,
+        str(tmp_path),
+    )
+
+    assert config.cpu_count == 1
+    assert config.arrow_io_threads == 1
+    assert config.transfer_read_concurrency == 1
+
+
+def test_worker_processes_override_inherited_polars_threads(tmp_path):
+    env = {"POLARS_MAX_THREADS": "8"}
+
+    apply_resource_limits(replace(create_pipeline_config(), cpu_count=2), env, str(tmp_path), True)
+
+    assert env["POLARS_MAX_THREADS"] == "2"
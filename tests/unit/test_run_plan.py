@@ -0,0 +1,60 @@
+from unittest import mock
+
+import pytest
+
+from prmreportsgenerator.report_name import ReportName
+from prmreportsgenerator.run_plan import (
+    ExecutionStrategy,
+    choose_execution_strategy,
+    estimate_peak_memory_bytes,
+    memory_budget_bytes,
+)
+
+
+def test_estimate_peak_memory_bytes_scales_input_bytes_by_report():
+    input_bytes = 1000
+
+    assert estimate_peak_memory_bytes(
+        input_bytes, ReportName.TRANSFER_LEVEL_TECHNICAL_FAILURES
+    ) > estimate_peak_memory_bytes(input_bytes, ReportName.TRANSFER_DETAILS_BY_HOUR)
+    assert estimate_peak_memory_bytes(0, ReportName.TRANSFER_DETAILS_BY_HOUR) == 0
+
+
+def test_estimate_peak_memory_bytes_covers_every_report():
+    for report_name in ReportName:
+        assert estimate_peak_memory_bytes(1, report_name) > 1
+
+
+def test_memory_budget_bytes_prefers_configured_budget():
+    with mock.patch("prmreportsgenerator.run_plan.cgroup_memory_limit_bytes", return_value=1000):
+        assert memory_budget_bytes(500) == 500
+
+
+def test_memory_budget_bytes_leaves_headroom_below_cgroup_limit():
+    with mock.patch("prmreportsgenerator.run_plan.cgroup_memory_limit_bytes", return_value=1000):
+        assert memory_budget_bytes(None) == 800
+
+
+def test_memory_budget_bytes_is_none_without_budget_or_cgroup_limit():
+    with mock.patch("prmreportsgenerator.run_plan.cgroup_memory_limit_bytes", return_value=None):
+        assert memory_budget_bytes(None) is None
+
+
+@pytest.mark.parametrize(
+    "object_sizes, budget_bytes, expected",
+    [
+        ([100, 100], None, ExecutionStrategy.IN_MEMORY),
+        ([100, 100], 1400, ExecutionStrategy.IN_MEMORY),
+        ([100, 100, 100], 1400, ExecutionStrategy.STREAMING),
+        ([100, 100, 100], 1399, ExecutionStrategy.SPILL),
+        ([1000], 1400, ExecutionStrategy.SPILL),
+    ],
+)
+def test_choose_execution_strategy_given_object_sizes_and_budget(
+    object_sizes, budget_bytes, expected
+):
+    actual = choose_execution_strategy(
+        object_sizes, ReportName.TRANSFER_DETAILS_BY_HOUR, budget_bytes
+    )
+
+    assert actual == expected
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pyarrow.parquet as pq
+import pytest
+from freezegun import freeze_time
+from pyarrow.parquet import write_table
+
+from prmreportsgenerator.config import CompactionConfig
+from prmreportsgenerator.io.local import LocalDataManager
+from prmreportsgenerator.transfer_data_compactor import TransferDataCompactor
+from tests.builders.common import a_string
+from tests.builders.pa_table import PaTableBuilder
+
+_BUCKET = "transfer-data-bucket"
+_MONTH_DIRECTORY = f"{_BUCKET}/v11/cutoff-14/2020/02"
+
+
+def _a_config(tmp_path, **kwargs) -> CompactionConfig:
+    return CompactionConfig(
+        build_tag=a_string(7),
+        input_transfer_data_bucket=_BUCKET,
+        cutoff_days=14,
+        month=kwargs.get("month", datetime(year=2020, month=2, day=1)),
+        s3_endpoint_url=None,
+        sort_column=kwargs.get("sort_column", "date_requested"),
+        row_group_size=kwargs.get("row_group_size", 10),
+        local_data_directory=str(tmp_path),
+    )
+
+
+def _write_daily_transfers(tmp_path, days):
+    for day in days:
+        date = datetime(year=2020, month=2, day=day)
+        table = (
+            PaTableBuilder()
+            .with_row(date_requested=date + timedelta(hours=12), requesting_practice_ods_code="B")
+            .with_row(date_requested=date + timedelta(hours=1), requesting_practice_ods_code="A")
+            .build()
+        )
+        path = tmp_path / _MONTH_DIRECTORY / f"{day:02d}" / f"2020-02-{day:02d}-transfers.parquet"
+        path.parent.mkdir(parents=True)
+        write_table(table, str(path))
+
+
+def test_compacts_month_of_daily_files_sorted_by_date_requested(tmp_path):
+    _write_daily_transfers(tmp_path, range(29, 0, -1))
+
+    TransferDataCompactor(_a_config(tmp_path)).run()
+
+    compacted_file = pq.ParquetFile(str(tmp_path / _MONTH_DIRECTORY / "2020-02-transfers.parquet"))
+    date_requested = compacted_file.read(columns=["date_requested"])["date_requested"].to_pylist()
+
+    assert compacted_file.metadata.num_rows == 58
+    assert date_requested == sorted(date_requested)
+    assert compacted_file.metadata.num_row_groups == 6
+    assert compacted_file.metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+def test_compacts_month_sorted_by_configured_column(tmp_path):
+    _write_daily_transfers(tmp_path, range(1, 30))
+
+    config = _a_config(tmp_path, sort_column="requesting_practice_ods_code")
+    TransferDataCompactor(config).run()
+
+    compacted_table = pq.read_table(str(tmp_path / _MONTH_DIRECTORY / "2020-02-transfers.parquet"))
+
+    assert compacted_table["requesting_practice_ods_code"].to_pylist() == ["A"] * 29 + ["B"] * 29
+
+
+def test_writes_compaction_metadata_alongside_compacted_file(tmp_path):
+    _write_daily_transfers(tmp_path, range(1, 30))
+
+    config = _a_config(tmp_path)
+    TransferDataCompactor(config).run()
+
+    metadata_path = tmp_path / _MONTH_DIRECTORY / "2020-02-transfers.parquet.metadata.json"
+
+    assert json.loads(metadata_path.read_text()) == {
+        "compacted-days": "29",
+        "sort-column": "date_requested",
+        "reports-generator-version": config.build_tag,
+    }
+
+
+def test_does_not_compact_month_with_missing_daily_file(tmp_path):
+    _write_daily_transfers(tmp_path, [day for day in range(1, 30) if day != 15])
+
+    with pytest.raises(FileNotFoundError):
+        TransferDataCompactor(_a_config(tmp_path)).run()
+
+    assert not (tmp_path / _MONTH_DIRECTORY / "2020-02-transfers.parquet").exists()
+
+
+@freeze_time(datetime(year=2020, month=3, day=10))
+def test_compacts_previous_month_when_no_month_is_configured(tmp_path):
+    _write_daily_transfers(tmp_path, range(1, 30))
+
+    TransferDataCompactor(_a_config(tmp_path, month=None)).run()
+
+    assert (tmp_path / _MONTH_DIRECTORY / "2020-02-transfers.parquet").exists()
+
+
+def test_closes_data_manager_when_compaction_fails(tmp_path):
+    _write_daily_transfers(tmp_path, [1])
+
+    with mock.patch.object(LocalDataManager, "close", autospec=True) as mock_close:
+        with pytest.raises(FileNotFoundError):
+            TransferDataCompactor(_a_config(tmp_path)).run()
+
+    mock_close.assert_called_once()
@@ -0,0 +1,63 @@
+from prmreportsgenerator.utils.cgroup_limits import cgroup_cpu_limit, cgroup_memory_limit_bytes
+
+
+def test_returns_cgroup_v2_memory_limit(tmp_path):
+    (tmp_path / "memory.max").write_text("536870912\n")
+
+    assert cgroup_memory_limit_bytes(str(tmp_path)) == 536870912
+
+
+def test_returns_none_when_cgroup_v2_memory_is_unlimited(tmp_path):
+    (tmp_path / "memory.max").write_text("max\n")
+
+    assert cgroup_memory_limit_bytes(str(tmp_path)) is None
+
+
+def test_returns_cgroup_v1_memory_limit(tmp_path):
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("536870912\n")
+
+    assert cgroup_memory_limit_bytes(str(tmp_path)) == 536870912
+
+
+def test_returns_none_when_cgroup_v1_memory_is_unlimited(tmp_path):
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("9223372036854771712\n")
+
+    assert cgroup_memory_limit_bytes(str(tmp_path)) is None
+
+
+def test_returns_none_without_cgroup_memory_controller(tmp_path):
+    assert cgroup_memory_limit_bytes(str(tmp_path)) is None
+
+
+def test_returns_cgroup_v2_cpu_limit_in_cores(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) == 1.5
+
+
+def test_returns_none_when_cgroup_v2_cpu_is_unlimited(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+
+
+def test_returns_cgroup_v1_cpu_limit_in_cores(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) == 2
+
+
+def test_returns_none_when_cgroup_v1_cpu_is_unlimited(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+
+    assert cgroup_cpu_limit(str(tmp_path)) is None
+
+
+def test_returns_none_without_cgroup_cpu_controller(tmp_path):
+    assert cgroup_cpu_limit(str(tmp_path)) is None
@@ -0,0 +1,39 @@
+import pyarrow as pa
+import pytest
+
+from prmreportsgenerator.utils.partition_table import partition_table
+
+
+def test_partitions_table_by_column_value_in_sorted_order():
+    table = pa.table({"key": ["b", "a", "b", "a", "c"], "value": [1, 2, 3, 4, 5]})
+
+    actual = [(value, partition.to_pydict()) for value, partition in partition_table(table, "key")]
+
+    expected = [
+        ("a", {"key": ["a", "a"], "value": [2, 4]}),
+        ("b", {"key": ["b", "b"], "value": [1, 3]}),
+        ("c", {"key": ["c"], "value": [5]}),
+    ]
+
+    assert actual == expected
+
+
+def test_puts_rows_without_a_value_in_a_last_partition():
+    table = pa.table({"key": [None, "a", None], "value": [1, 2, 3]})
+
+    actual = [(value, partition.num_rows) for value, partition in partition_table(table, "key")]
+
+    assert actual == [("a", 1), (None, 2)]
+
+
+def test_returns_no_partitions_for_empty_table():
+    table = pa.table({"key": pa.array([], pa.string())})
+
+    assert partition_table(table, "key") == []
+
+
+def test_raises_error_when_partition_column_does_not_exist():
+    table = pa.table({"key": ["a"]})
+
+    with pytest.raises(ValueError, match="no such column"):
+        partition_table(table, "missing")
@@ -0,0 +1,48 @@
+import pyarrow as pa
+
+from prmreportsgenerator.utils.unify_tables import conform_table, unify_table_schemas
+
+
+def test_unified_schema_has_every_column_with_promoted_types():
+    schemas = [
+        pa.schema([("id", pa.int32()), ("reason", pa.null())]),
+        pa.schema([("id", pa.int64()), ("reason", pa.string()), ("added", pa.bool_())]),
+    ]
+
+    actual = unify_table_schemas(schemas)
+
+    expected = pa.schema([("id", pa.int64()), ("reason", pa.string()), ("added", pa.bool_())])
+
+    assert actual == expected
+
+
+def test_conform_table_fills_missing_columns_with_nulls():
+    table = pa.table({"id": [1, 2]})
+    schema = pa.schema([("id", pa.int64()), ("added", pa.string())])
+
+    actual, adaptations = conform_table(table, schema)
+
+    assert actual == pa.table({"id": [1, 2], "added": pa.nulls(2, pa.string())})
+    assert adaptations == ["added missing column added"]
+
+
+def test_conform_table_casts_columns_to_schema_type_in_schema_order():
+    table = pa.table({"reason": pa.nulls(2), "id": pa.array([1, 2], pa.int32())})
+    schema = pa.schema([("id", pa.int64()), ("reason", pa.string())])
+
+    actual, adaptations = conform_table(table, schema)
+
+    assert actual == pa.table({"id": [1, 2], "reason": pa.nulls(2, pa.string())})
+    assert adaptations == [
+        "cast column id from int32 to int64",
+        "cast column reason from null to string",
+    ]
+
+
+def test_conform_table_returns_table_unchanged_when_it_matches_schema():
+    table = pa.table({"id": [1, 2], "reason": ["a", None]})
+
+    actual, adaptations = conform_table(table, table.schema)
+
+    assert actual == table
+    assert adaptations == []